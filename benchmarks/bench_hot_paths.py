@@ -0,0 +1,231 @@
+"""Benchmarks of the processing and import hot paths.
+
+Times the paths every update or historical load goes through, on synthetic
+payloads of one day, one month, twelve months and four years:
+
+- ``process_data``: ``OuraDataUpdateCoordinator._process_data``, turning a
+  payload into sensor values and feeding the rolling baselines
+- ``import_statistics``: ``async_import_statistics`` of a whole payload, in
+  external statistics mode, with the recorder calls replaced by no-ops; its
+  items are the statistics rows handed to the recorder
+- ``heartrate_reductions``: the daily heart rate reductions of the statistics
+  import (``_process_daily_reductions``), the largest payload by far
+- ``get_data_fanout``: ``OuraApiClient.async_get_data`` with every request
+  answered from the payload, measuring the fan-out and merging overhead
+- ``get_data_http``: ``OuraApiClient.async_get_data`` over HTTP against the
+  local mock API (``benchmarks.mock_server``), including pagination and
+  JSON decoding on both ends
+
+Each case records its throughput, p50/p99 latency and peak memory, and the
+results are written as JSON. Run from the repository root with the test
+requirements installed:
+
+    python -m benchmarks.bench_hot_paths
+    python -m benchmarks.bench_hot_paths --sizes 1d 1m --compare old.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import AsyncExitStack
+from bisect import bisect_left, bisect_right
+import json
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+
+from custom_components.oura.api import OuraApiClient
+from custom_components.oura.backpressure import get_backpressure
+from custom_components.oura.baselines import BaselineTracker
+from custom_components.oura.const import (
+    CONF_API_BASE_URL,
+    CONF_STATISTICS_MODE,
+    STATISTICS_MODE_EXTERNAL,
+)
+from custom_components.oura.coordinator import OuraDataUpdateCoordinator
+from custom_components.oura.metrics import SOURCE_REDUCERS
+from custom_components.oura.statistics import (
+    _process_daily_reductions,
+    async_import_statistics,
+)
+
+from .harness import async_measure, compare_results, format_table, write_results
+from .mock_server import MockOuraServer
+from .payloads import SIZES, build_payload, count_documents
+from .synthetic import ENDPOINT_SOURCES
+
+CASES = [
+    "process_data",
+    "import_statistics",
+    "heartrate_reductions",
+    "get_data_fanout",
+    "get_data_http",
+]
+
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "hot_paths.json"
+
+def _fake_hass() -> SimpleNamespace:
+    """Return the parts of Home Assistant the import uses, without a recorder."""
+    return SimpleNamespace(data={})
+
+
+def _entry(data: dict[str, Any] | None = None) -> SimpleNamespace:
+    """Return a config entry importing external statistics."""
+    return SimpleNamespace(
+        entry_id="benchmark",
+        title="Benchmark",
+        data=data or {},
+        options={CONF_STATISTICS_MODE: STATISTICS_MODE_EXTERNAL},
+    )
+
+
+def _token_session() -> SimpleNamespace:
+    """Return an OAuth session holding a valid token."""
+
+    async def async_ensure_token_valid() -> None:
+        """Keep the token."""
+
+    return SimpleNamespace(
+        async_ensure_token_valid=async_ensure_token_valid,
+        valid_token=True,
+        token={"access_token": "benchmark"},
+    )
+
+
+async def _async_http_api(stack: AsyncExitStack) -> OuraApiClient:
+    """Return an API client requesting the local mock API."""
+    server = await stack.enter_async_context(MockOuraServer(cache_documents=True))
+    client = OuraApiClient(
+        _fake_hass(), _token_session(), _entry({CONF_API_BASE_URL: server.base_url})
+    )
+    client._client_session = await stack.enter_async_context(ClientSession())
+    return client
+
+
+def _discard_statistics(hass: Any, metadata: Any, statistics: list[Any]) -> None:
+    """Stand in for the recorder import functions."""
+
+
+def _fake_api(payload: dict[str, dict[str, Any]]) -> OuraApiClient:
+    """Return an API client answering every request from the payload."""
+    index = {}
+    for source, source_data in payload.items():
+        documents = source_data["data"]
+        days = [(document.get("day") or document["timestamp"])[:10] for document in documents]
+        index[source] = (days, documents)
+
+    async def async_get(url: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        await asyncio.sleep(0)
+        days, documents = index[ENDPOINT_SOURCES[url.rsplit("/", 1)[1]]]
+        first = (params.get("start_date") or params["start_datetime"])[:10]
+        last = (params.get("end_date") or params["end_datetime"])[:10]
+        return {"data": documents[bisect_left(days, first):bisect_right(days, last)]}
+
+    client = OuraApiClient(_fake_hass(), None, _entry())
+    client._async_get = async_get
+    return client
+
+
+async def _async_run_size(size: str, cases: list[str], stack: AsyncExitStack) -> list[dict[str, Any]]:
+    """Run the selected cases on a payload of one size."""
+    days = SIZES[size]
+    payload = build_payload(days)
+    documents = count_documents(payload)
+    readings = payload["heartrate"]["data"]
+    entry = _entry()
+    state = SimpleNamespace(coordinator=None, hass=None)
+
+    async def setup_coordinator() -> None:
+        state.coordinator = SimpleNamespace(baselines=BaselineTracker())
+
+    async def run_process_data() -> int:
+        OuraDataUpdateCoordinator._process_data(state.coordinator, payload)
+        return documents
+
+    async def setup_hass() -> None:
+        # A new instance per run, so running sums start from scratch
+        state.hass = _fake_hass()
+
+    async def run_import_statistics() -> int:
+        await async_import_statistics(state.hass, payload, entry)
+        return get_backpressure(state.hass).metrics.rows
+
+    async def run_heartrate_reductions() -> int:
+        await _process_daily_reductions(state.hass, readings, SOURCE_REDUCERS["heartrate"], entry)
+        return len(readings)
+
+    client = _fake_api(payload)
+
+    async def run_get_data_fanout() -> int:
+        return count_documents(await client.async_get_data(days_back=days))
+
+    http_client = await _async_http_api(stack) if "get_data_http" in cases else None
+
+    async def run_get_data_http() -> int:
+        return count_documents(await http_client.async_get_data(days_back=days))
+
+    runners = {
+        "process_data": (run_process_data, setup_coordinator),
+        "import_statistics": (run_import_statistics, setup_hass),
+        "heartrate_reductions": (run_heartrate_reductions, setup_hass),
+        "get_data_fanout": (run_get_data_fanout, None),
+        "get_data_http": (run_get_data_http, None),
+    }
+    if http_client is not None:
+        # Fill the server's document cache outside the timed runs
+        await run_get_data_http()
+
+    results = []
+    for case in cases:
+        run, setup = runners[case]
+        results.append(await async_measure(case, size, run, setup))
+    return results
+
+
+async def async_main(sizes: list[str], cases: list[str]) -> list[dict[str, Any]]:
+    """Run the selected cases on every selected payload size."""
+    results = []
+    with patch(
+        "custom_components.oura.statistics.async_import_statistics_ha", _discard_statistics
+    ), patch(
+        "custom_components.oura.statistics.async_add_external_statistics", _discard_statistics
+    ):
+        for size in sizes:
+            async with AsyncExitStack() as stack:
+                results.extend(await _async_run_size(size, cases, stack))
+    return results
+
+
+def main() -> None:
+    """Run the benchmarks, print a table and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", type=Path, help="results file of a previous run")
+    args = parser.parse_args()
+
+    # The import logs every statistic at info and debug level
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(async_main(args.sizes, args.cases))
+    document = write_results(args.output, "hot_paths", results)
+    print(format_table(results))
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(f"\nCompared with {baseline.get('integration_version')} ({args.compare}):")
+        for row in compare_results(baseline, document):
+            print(
+                f"{row['case']:<22} {row['size']:>4}  p50 x{row['p50_ratio']}  "
+                f"memory x{row['memory_ratio']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
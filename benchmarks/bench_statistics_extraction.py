@@ -0,0 +1,160 @@
+"""Micro-benchmark for daily statistics extraction.
+
+Compares the per-document dot notation lookup and string-dispatched
+transforms with the extraction plans compiled from the metric catalog, on
+four years of synthetic daily documents for every data source.
+
+Run from the repository root with the test requirements installed:
+
+    python -m benchmarks.bench_statistics_extraction
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+import random
+import timeit
+from typing import Any
+
+from custom_components.oura.metrics import METRIC_CATALOG, TRANSFORMS
+from custom_components.oura.statistics import EXTRACTION_PLANS, _parse_date_to_timestamp
+
+DAYS = 4 * 365
+REPEAT = 5
+
+
+def _build_documents(days: int) -> dict[str, list[dict[str, Any]]]:
+    """Build synthetic daily documents holding every configured field."""
+    rng = random.Random(0)
+    first = date(2021, 1, 1)
+    documents: dict[str, list[dict[str, Any]]] = {}
+
+    for source_key, extractors in EXTRACTION_PLANS.items():
+        paths = [
+            METRIC_CATALOG[sensor_key]["path"]
+            for sensor_key, _extract in extractors
+            if "path" in METRIC_CATALOG[sensor_key]
+        ]
+        documents[source_key] = []
+        for offset in range(days):
+            document: dict[str, Any] = {"day": (first + timedelta(days=offset)).isoformat()}
+            for path in paths:
+                target = document
+                *parents, leaf = path.split(".")
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[leaf] = rng.randint(1, 30000)
+            documents[source_key].append(document)
+
+    return documents
+
+
+def get_nested_value(data: dict[str, Any], path: str) -> Any:
+    """Get a value from nested dictionary using dot notation, as the importer did.
+    
+    Args:
+        data: Dictionary to extract from
+        path: Dot-separated path (e.g., "contributors.efficiency")
+    
+    Returns:
+        Value at path, or None if not found
+    """
+    keys = path.split(".")
+    value = data
+    
+    for key in keys:
+        if isinstance(value, dict):
+            value = value.get(key)
+            if value is None:
+                return None
+        else:
+            return None
+    
+    return value
+
+
+def apply_transformation(value: Any, transform: str, **kwargs) -> Any:
+    """Apply a transformation by name, as the importer did.
+    
+    Args:
+        value: Value to transform
+        transform: Transformation name
+        **kwargs: Additional arguments for transformation
+    
+    Returns:
+        Transformed value
+    """
+    if transform == "percentage":
+        total = kwargs.get("total", 100)
+        return (value / total) * 100 if total else 0
+    
+    if func := TRANSFORMS.get(transform):
+        return func(value)
+    
+    return value
+
+
+def _extract_legacy(documents: dict[str, list[dict[str, Any]]]) -> int:
+    """Extract values the way the importer did before plans were compiled."""
+    parse = _parse_date_to_timestamp.__wrapped__
+    count = 0
+    for source_key, data_list in documents.items():
+        descriptors = [
+            (sensor_key, METRIC_CATALOG[sensor_key])
+            for sensor_key, _extract in EXTRACTION_PLANS[source_key]
+        ]
+        sensor_data: dict[str, list[dict[str, Any]]] = {
+            sensor_key: [] for sensor_key, _descriptor in descriptors
+        }
+
+        for entry_data in data_list:
+            timestamp = parse(entry_data.get("day"))
+            if not timestamp:
+                continue
+            for sensor_key, descriptor in descriptors:
+                if compute := descriptor.get("compute"):
+                    value = compute(entry_data)
+                else:
+                    value = get_nested_value(entry_data, descriptor["path"])
+                    if value is not None and (transform := descriptor.get("transform")):
+                        value = apply_transformation(value, transform)
+                if value is not None:
+                    sensor_data[sensor_key].append({"timestamp": timestamp, "value": value})
+
+        count += sum(len(points) for points in sensor_data.values())
+    return count
+
+
+def _extract_compiled(documents: dict[str, list[dict[str, Any]]]) -> int:
+    """Extract values column by column with the compiled plans."""
+    count = 0
+    for source_key, data_list in documents.items():
+        dated = [
+            (timestamp, entry_data)
+            for entry_data in data_list
+            if (timestamp := _parse_date_to_timestamp(entry_data.get("day")))
+        ]
+        for _sensor_key, extract in EXTRACTION_PLANS[source_key]:
+            count += len([
+                {"timestamp": timestamp, "value": value}
+                for timestamp, entry_data in dated
+                if (value := extract(entry_data)) is not None
+            ])
+    return count
+
+
+def main() -> None:
+    """Run the benchmark and print the best time of each variant."""
+    documents = _build_documents(DAYS)
+    assert _extract_legacy(documents) == _extract_compiled(documents)
+
+    legacy = min(timeit.repeat(lambda: _extract_legacy(documents), number=1, repeat=REPEAT))
+    _parse_date_to_timestamp.cache_clear()
+    compiled = min(timeit.repeat(lambda: _extract_compiled(documents), number=1, repeat=REPEAT))
+
+    print(f"{DAYS} days x {len(documents)} sources")
+    print(f"legacy:   {legacy * 1000:8.1f} ms")
+    print(f"compiled: {compiled * 1000:8.1f} ms ({legacy / compiled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Measurement and result files shared by the benchmarks.
+
+A case is timed over repeated runs until a minimum duration is reached, then
+run once more under tracemalloc for its peak memory, which is kept out of the
+timed runs because tracing slows allocation down. Results are written as JSON
+together with the integration version and the Python version, so the results
+of two releases can be compared with ``compare_results``.
+"""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Any
+
+RESULTS_VERSION = 1
+
+MANIFEST = Path(__file__).parent.parent / "custom_components" / "oura" / "manifest.json"
+
+
+async def async_measure(
+    name: str,
+    size: str,
+    run: Callable[[], Awaitable[int]],
+    setup: Callable[[], Awaitable[None]] | None = None,
+    min_runs: int = 5,
+    max_runs: int = 200,
+    min_seconds: float = 1.0,
+) -> dict[str, Any]:
+    """Time a benchmark case.
+
+    Args:
+        name: Case name
+        size: Payload size name
+        run: Runs the case once and returns the number of items it processed
+        setup: Prepares every run, outside the timed section
+        min_runs: Minimum number of timed runs
+        max_runs: Maximum number of timed runs
+        min_seconds: Runs are repeated until their total time reaches this
+
+    Returns:
+        Result with the latency percentiles in milliseconds, the throughput
+        in items per second at the median latency, and the peak traced
+        memory in KiB
+    """
+    latencies: list[float] = []
+    items = 0
+    while len(latencies) < max_runs and (
+        len(latencies) < min_runs or sum(latencies) < min_seconds
+    ):
+        if setup is not None:
+            await setup()
+        started = time.perf_counter()
+        items = await run()
+        latencies.append(time.perf_counter() - started)
+
+    if setup is not None:
+        await setup()
+    tracemalloc.start()
+    try:
+        await run()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50 = statistics.median(latencies)
+    return {
+        "case": name,
+        "size": size,
+        "items": items,
+        "runs": len(latencies),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(p50 * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "throughput_per_s": round(items / p50, 1) if p50 else None,
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    """Return a percentile, interpolated between the closest runs."""
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def _integration_version() -> str | None:
+    """Return the integration version from its manifest."""
+    try:
+        return json.loads(MANIFEST.read_text())["version"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_results(path: Path, suite: str, results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Write benchmark results to a JSON file.
+
+    Returns:
+        The written document
+    """
+    document = {
+        "results_version": RESULTS_VERSION,
+        "suite": suite,
+        "integration_version": _integration_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return document
+
+
+def compare_results(baseline: dict[str, Any], current: dict[str, Any]) -> list[dict[str, Any]]:
+    """Compare two result documents case by case.
+
+    Returns:
+        Per case and size, the p50 latency and peak memory of both documents
+        and their ratio (current / baseline); cases missing from either
+        document are skipped
+    """
+    previous = {(result["case"], result["size"]): result for result in baseline["results"]}
+    comparison = []
+    for result in current["results"]:
+        if (before := previous.get((result["case"], result["size"]))) is None:
+            continue
+        comparison.append({
+            "case": result["case"],
+            "size": result["size"],
+            "p50_ms": (before["p50_ms"], result["p50_ms"]),
+            "p50_ratio": round(result["p50_ms"] / before["p50_ms"], 2) if before["p50_ms"] else None,
+            "peak_memory_kib": (before["peak_memory_kib"], result["peak_memory_kib"]),
+            "memory_ratio": (
+                round(result["peak_memory_kib"] / before["peak_memory_kib"], 2)
+                if before["peak_memory_kib"]
+                else None
+            ),
+        })
+    return comparison
+
+
+def format_table(results: list[dict[str, Any]]) -> str:
+    """Return results as a plain text table."""
+    lines = [
+        f"{'case':<22} {'size':>4} {'items':>9} {'runs':>5} {'p50 ms':>10} "
+        f"{'p99 ms':>10} {'items/s':>12} {'peak KiB':>10}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result['case']:<22} {result['size']:>4} {result['items']:>9} {result['runs']:>5} "
+            f"{result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f} "
+            f"{result['throughput_per_s'] or 0:>12.0f} {result['peak_memory_kib']:>10.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,203 @@
+"""Cold import time of the integration.
+
+Home Assistant imports an integration and its sensor platform on every
+start, before any config entry is set up. This benchmark imports both in
+fresh interpreters with ``python -X importtime``, after importing the Home
+Assistant modules the integration builds on, which a running instance has
+already loaded. Everything imported after that is the integration's cost:
+
+- total: own import time of every module the integration loaded, including
+  the standard library and third-party modules it pulled in
+- integration: own import time of the ``custom_components.oura`` modules
+- modules: number of modules loaded
+
+Statistics import, backfill, gap repair and profiling code is only needed
+when such a run starts, so ``DEFERRED_MODULES`` must not be loaded by the
+import at all. The medians of several runs are written as JSON and checked
+against ``BUDGETS``:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 15 --check
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+from typing import Any
+
+from .harness import write_results
+
+PACKAGE = "custom_components.oura"
+ROOT = Path(__file__).parent.parent
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "import_time.json"
+
+# Loaded by Home Assistant before the integration is imported
+PRELOADED = (
+    "aiohttp",
+    "voluptuous",
+    "homeassistant.components.sensor",
+    "homeassistant.config_entries",
+    "homeassistant.const",
+    "homeassistant.core",
+    "homeassistant.exceptions",
+    "homeassistant.helpers.config_entry_oauth2_flow",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.util.dt",
+)
+
+# Imported only when an import, backfill, gap repair or profile runs
+DEFERRED_MODULES = (
+    f"{PACKAGE}.backfill",
+    f"{PACKAGE}.backpressure",
+    f"{PACKAGE}.gaps",
+    f"{PACKAGE}.profiler",
+    f"{PACKAGE}.running_sum",
+    f"{PACKAGE}.statistic_ids",
+    f"{PACKAGE}.statistics",
+    "homeassistant.components.recorder.statistics",
+    "cProfile",
+    "pstats",
+    "tracemalloc",
+)
+
+# Regression limits of the medians: about twice the time measured on a
+# development machine, so that noise does not fail the check, and room for a
+# few more modules. Before the statistics stack was deferred the import took
+# 72 ms and loaded 46 modules.
+BUDGETS: dict[str, float] = {
+    "total_ms": 90,
+    "integration_ms": 75,
+    "modules": 40,
+}
+
+_MARKER = "import time: --- oura ---"
+
+
+def _import_code() -> str:
+    """Return the code a measured interpreter runs."""
+    return "; ".join((
+        "import sys",
+        *(f"import {module}" for module in PRELOADED),
+        f"sys.stderr.write({_MARKER!r} + '\\n')",
+        f"import {PACKAGE}, {PACKAGE}.sensor",
+    ))
+
+
+def parse_importtime(output: str) -> list[tuple[str, int]]:
+    """Return the modules imported after the marker line.
+
+    Args:
+        output: Standard error of ``python -X importtime``
+
+    Returns:
+        Module name and own import time in microseconds, in the order the
+        imports finished
+    """
+    _before, found, after = output.partition(_MARKER)
+    modules = []
+    for line in (after if found else output).splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, _cumulative, name = line[len("import time:"):].split("|", 2)
+        if own.strip().isdigit():
+            modules.append((name.strip(), int(own)))
+    return modules
+
+
+def summarize(modules: list[tuple[str, int]]) -> dict[str, Any]:
+    """Return the import cost of one run.
+
+    Returns:
+        Total and integration import time in ms, the number of modules and
+        the deferred modules that were loaded
+    """
+    names = {name for name, _own in modules}
+    return {
+        "total_ms": sum(own for _name, own in modules) / 1000,
+        "integration_ms": sum(
+            own for name, own in modules if name == PACKAGE or name.startswith(f"{PACKAGE}.")
+        ) / 1000,
+        "modules": len(modules),
+        "deferred_loaded": sorted(names.intersection(DEFERRED_MODULES)),
+    }
+
+
+def measure_import() -> dict[str, Any]:
+    """Import the integration in a fresh interpreter and return its cost."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _import_code()],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if process.returncode:
+        raise RuntimeError(f"Importing {PACKAGE} failed:\n{process.stderr[-2000:]}")
+    return summarize(parse_importtime(process.stderr))
+
+
+def run_benchmark(runs: int) -> dict[str, Any]:
+    """Measure the cold import several times.
+
+    Returns:
+        Medians of the runs, the slowest run's total, and the deferred
+        modules any run loaded
+    """
+    samples = [measure_import() for _run in range(runs)]
+    return {
+        "case": "cold_import",
+        "runs": runs,
+        "total_ms": round(statistics.median(sample["total_ms"] for sample in samples), 2),
+        "max_total_ms": round(max(sample["total_ms"] for sample in samples), 2),
+        "integration_ms": round(
+            statistics.median(sample["integration_ms"] for sample in samples), 2
+        ),
+        "modules": statistics.median_low(sample["modules"] for sample in samples),
+        "deferred_loaded": sorted({
+            name for sample in samples for name in sample["deferred_loaded"]
+        }),
+    }
+
+
+def check_budgets(result: dict[str, Any]) -> list[str]:
+    """Return the budgets a result exceeds and the deferred modules it loaded."""
+    violations = [
+        f"{key} {result[key]} exceeds the budget of {limit}"
+        for key, limit in BUDGETS.items()
+        if result[key] > limit
+    ]
+    violations.extend(
+        f"{name} is loaded on import" for name in result["deferred_loaded"]
+    )
+    return violations
+
+
+def main() -> None:
+    """Run the import time benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--check", action="store_true", help="fail when a budget is exceeded")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.runs)
+    write_results(args.output, "import_time", [result])
+    print(
+        f"total {result['total_ms']:.1f} ms (max {result['max_total_ms']:.1f} ms), "
+        f"integration {result['integration_ms']:.1f} ms, {result['modules']} modules"
+    )
+    print(f"Results written to {args.output}")
+
+    if args.check and (violations := check_budgets(result)):
+        print("\n".join(violations))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+"""Multi-account load test of the update cycle.
+
+Every config entry runs its own coordinator, and every refresh sends 11
+requests at once. This harness starts N entries against the local mock API
+(``benchmarks.mock_server``, run in a subprocess so that serving the requests
+does not load the measured event loop) and runs their refreshes for a few
+cycles with a shortened update interval. Each refresh is the coordinator's
+own ``_async_update_data``: the fetch, the processing into sensor values, the
+series statistics import (with the recorder calls replaced by no-ops) and
+the history store write.
+
+Refreshes are scheduled like Home Assistant's ``DataUpdateCoordinator``:
+the next refresh is due one interval after the previous one finished,
+truncated to the whole second plus a fixed random fraction per coordinator.
+Entries either all start together, as after a restart (``aligned``), or
+spread over one interval (``staggered``). Requests go through one shared
+client session limited to 100 connections per host, like Home Assistant's.
+
+Per number of entries it reports:
+
+- event loop lag: how late a 10 ms probe timer fires (p50, p99, max)
+- refresh clustering: the most refreshes in flight at once and the most
+  refreshes starting within one second
+- request bursts: the most requests in flight at once and the most requests
+  starting within one second, and the request latency seen by the client
+- memory per entry: memory still allocated after one refresh of every entry,
+  and the peak during it, divided by the number of entries
+
+Results are written as JSON and checked against ``THRESHOLDS``, the
+regression limits of the scaling profile in ``docs/SCALING.md``:
+
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --entries 1 10 50 --mode staggered --check
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Iterable
+import gc
+import logging
+import math
+from pathlib import Path
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import ClientSession, TCPConnector
+
+from custom_components.oura.api import OuraApiClient
+from custom_components.oura.baselines import BaselineTracker
+from custom_components.oura.const import CONF_API_BASE_URL, DEFAULT_UPDATE_INTERVAL
+from custom_components.oura.coordinator import OuraDataUpdateCoordinator
+from custom_components.oura.freshness import FreshnessTracker
+from custom_components.oura.history_store import HistoryStore
+from custom_components.oura.transport import HttpTransport, Transport, TransportResponse
+
+from .harness import write_results
+
+DEFAULT_ENTRIES = [1, 10, 25, 50, 100]
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "load_test.json"
+MODES = ["aligned", "staggered"]
+
+# Home Assistant's shared client session
+CONNECTIONS_PER_HOST = 100
+# Home Assistant adds 0.05-0.5 s to every coordinator's refresh time
+RANDOM_FRACTION = (0.05, 0.5)
+PROBE_INTERVAL = 0.01
+
+# Regression limits per number of entries, about twice the aligned results
+# of the scaling profile. A result fails --check when a measurement exceeds
+# the limit of the largest entry count it covers.
+THRESHOLDS: dict[int, dict[str, float]] = {
+    1: {"loop_lag_p99_ms": 20, "refresh_p99_ms": 500, "memory_per_entry_kib": 512, "failed_requests": 0},
+    10: {"loop_lag_p99_ms": 40, "refresh_p99_ms": 1000, "memory_per_entry_kib": 192, "failed_requests": 0},
+    25: {"loop_lag_p99_ms": 60, "refresh_p99_ms": 2500, "memory_per_entry_kib": 96, "failed_requests": 0},
+    50: {"loop_lag_p99_ms": 80, "refresh_p99_ms": 5000, "memory_per_entry_kib": 64, "failed_requests": 0},
+    100: {"loop_lag_p99_ms": 100, "refresh_p99_ms": 10000, "memory_per_entry_kib": 48, "failed_requests": 0},
+}
+
+
+class _TimingTransport:
+    """Transport recording when every request started and finished."""
+
+    def __init__(self, transport: Transport, timings: list[tuple[float, float, bool]]) -> None:
+        """Initialize the transport."""
+        self.transport = transport
+        self.timings = timings
+
+    async def async_get(
+        self, url: str, headers: dict[str, str], params: dict[str, Any] | None = None
+    ) -> TransportResponse:
+        """Return the JSON body of a response and record its timing."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ok = False
+        try:
+            result = await self.transport.async_get(url, headers, params)
+            ok = True
+            return result
+        finally:
+            self.timings.append((started, loop.time(), ok))
+
+
+class _EntryRuntime:
+    """The update path of one config entry, without Home Assistant's scheduler.
+
+    Borrows the coordinator's refresh methods, so the load test runs the
+    integration's own update code.
+    """
+
+    _async_update_data = OuraDataUpdateCoordinator._async_update_data
+    _process_data = OuraDataUpdateCoordinator._process_data
+    _async_import_series = OuraDataUpdateCoordinator._async_import_series
+    _async_store_history = OuraDataUpdateCoordinator._async_store_history
+
+    def __init__(self, hass: Any, api_client: OuraApiClient, entry: Any, interval: float) -> None:
+        """Initialize the runtime."""
+        self.hass = hass
+        self.api_client = api_client
+        self.entry = entry
+        self.update_interval = SimpleNamespace(total_seconds=lambda: interval)
+        self.data: dict[str, Any] | None = None
+        self._series_cursors: dict = {}
+        self.baselines = BaselineTracker()
+        self.history = HistoryStore(hass, entry)
+        self.freshness = FreshnessTracker()
+        self.fraction = random.Random(entry.entry_id).uniform(*RANDOM_FRACTION)
+
+    async def async_refresh(self) -> None:
+        """Refresh like DataUpdateCoordinator, keeping the data."""
+        self.data = await self._async_update_data()
+        self.freshness.written(time.time())
+
+
+def _fake_hass(config_dir: str) -> SimpleNamespace:
+    """Return the parts of Home Assistant the update path uses."""
+    loop = asyncio.get_running_loop()
+    return SimpleNamespace(
+        data={},
+        config=SimpleNamespace(path=lambda *parts: str(Path(config_dir, *parts))),
+        async_add_executor_job=lambda target, *args: loop.run_in_executor(None, target, *args),
+    )
+
+
+def _token_session(access_token: str) -> SimpleNamespace:
+    """Return an OAuth session holding a valid token."""
+
+    async def async_ensure_token_valid() -> None:
+        """Keep the token."""
+
+    return SimpleNamespace(
+        async_ensure_token_valid=async_ensure_token_valid,
+        valid_token=True,
+        token={"access_token": access_token},
+    )
+
+
+def _runtimes(
+    count: int,
+    hass: Any,
+    base_url: str,
+    client_session: ClientSession,
+    interval: float,
+    timings: list[tuple[float, float, bool]],
+) -> list[_EntryRuntime]:
+    """Return the runtimes of a number of entries, one account each."""
+    runtimes = []
+    for index in range(count):
+        entry = SimpleNamespace(
+            entry_id=f"load_{index}",
+            title=f"Load {index}",
+            data={CONF_API_BASE_URL: base_url},
+            options={},
+        )
+        client = OuraApiClient(hass, _token_session(f"load-token-{index}"), entry)
+        client.transport = _TimingTransport(HttpTransport(client_session), timings)
+        runtimes.append(_EntryRuntime(hass, client, entry, interval))
+    return runtimes
+
+
+def next_refresh(finished: float, interval: float, fraction: float) -> float:
+    """Return the loop time of a coordinator's next refresh.
+
+    Like Home Assistant, the time the previous refresh finished is truncated
+    to the whole second before the interval and the coordinator's fraction
+    are added.
+    """
+    return math.floor(finished) + fraction + interval
+
+
+def peak_overlap(spans: Iterable[tuple[float, float]]) -> int:
+    """Return the largest number of spans in progress at the same time."""
+    spans = list(spans)
+    # A span ending when another starts does not overlap it
+    events = sorted([(start, 1) for start, _end in spans] + [(end, -1) for _start, end in spans])
+    peak = current = 0
+    for _time, change in events:
+        current += change
+        peak = max(peak, current)
+    return peak
+
+
+def peak_rate(starts: Iterable[float], window: float = 1.0) -> int:
+    """Return the largest number of starts within any window."""
+    starts = sorted(starts)
+    peak = first = 0
+    for last, started in enumerate(starts):
+        while started - starts[first] >= window:
+            first += 1
+        peak = max(peak, last - first + 1)
+    return peak
+
+
+def _percentile_ms(values: list[float], percent: int) -> float | None:
+    """Return a percentile of durations in seconds, in milliseconds."""
+    if not values:
+        return None
+    if len(values) < 2:
+        return round(values[0] * 1000, 2)
+    return round(statistics.quantiles(values, n=100, method="inclusive")[percent - 1] * 1000, 2)
+
+
+async def _async_probe_lag(lags: list[float], stop: asyncio.Event) -> None:
+    """Sample how late a timer fires until stopped."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _async_run_entry(
+    runtime: _EntryRuntime,
+    start: float,
+    cycles: int,
+    interval: float,
+    refreshes: list[tuple[float, float]],
+) -> None:
+    """Run the refresh cycles of one entry."""
+    loop = asyncio.get_running_loop()
+    due = start
+    for _cycle in range(cycles):
+        await asyncio.sleep(max(0.0, due - loop.time()))
+        started = loop.time()
+        await runtime.async_refresh()
+        finished = loop.time()
+        refreshes.append((started, finished))
+        due = next_refresh(finished, interval, runtime.fraction)
+
+
+async def _async_measure_memory(
+    count: int, hass: Any, base_url: str, client_session: ClientSession, interval: float
+) -> tuple[float, float]:
+    """Return the retained and peak memory per entry in KiB after one refresh."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        runtimes = _runtimes(count, hass, base_url, client_session, interval, [])
+        await asyncio.gather(*(runtime.async_refresh() for runtime in runtimes))
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del runtimes
+    return round(current / 1024 / count, 1), round(peak / 1024 / count, 1)
+
+
+async def async_load(
+    count: int,
+    base_url: str,
+    config_dir: str,
+    cycles: int = 3,
+    interval: float = 5.0,
+    mode: str = "aligned",
+) -> dict[str, Any]:
+    """Run the refresh cycles of a number of entries and measure them.
+
+    Args:
+        count: Number of config entries
+        base_url: Base URL of the stand-in API
+        config_dir: Configuration directory the history stores write to
+        cycles: Refreshes per entry
+        interval: Update interval in seconds
+        mode: "aligned" to start every entry at once, "staggered" to spread
+            the starts over one interval
+
+    Returns:
+        Measurements of the run
+    """
+    loop = asyncio.get_running_loop()
+    hass = _fake_hass(config_dir)
+    connector = TCPConnector(limit_per_host=CONNECTIONS_PER_HOST)
+    async with ClientSession(connector=connector) as client_session:
+        memory_per_entry, peak_memory_per_entry = await _async_measure_memory(
+            count, hass, base_url, client_session, interval
+        )
+
+        timings: list[tuple[float, float, bool]] = []
+        refreshes: list[tuple[float, float]] = []
+        lags: list[float] = []
+        runtimes = _runtimes(count, hass, base_url, client_session, interval, timings)
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_async_probe_lag(lags, stop))
+        begin = loop.time() + PROBE_INTERVAL * 10
+        spread = interval if mode == "staggered" else 0.0
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _async_run_entry(
+                runtime, begin + spread * index / count, cycles, interval, refreshes
+            )
+            for index, runtime in enumerate(runtimes)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    refresh_durations = [finished - started for started, finished in refreshes]
+    request_durations = [finished - started for started, finished, _ok in timings]
+    return {
+        "case": f"load_{mode}",
+        "size": f"{count}e",
+        "entries": count,
+        "mode": mode,
+        "cycles": cycles,
+        "interval_s": interval,
+        "elapsed_s": round(elapsed, 2),
+        "refreshes": len(refreshes),
+        "requests": len(timings),
+        "failed_requests": sum(1 for *_span, ok in timings if not ok),
+        "loop_lag_p50_ms": _percentile_ms(lags, 50),
+        "loop_lag_p99_ms": _percentile_ms(lags, 99),
+        "loop_lag_max_ms": round(max(lags, default=0.0) * 1000, 2),
+        "refresh_p50_ms": _percentile_ms(refresh_durations, 50),
+        "refresh_p99_ms": _percentile_ms(refresh_durations, 99),
+        "refresh_peak_in_flight": peak_overlap(refreshes),
+        "refresh_peak_per_s": peak_rate(started for started, _finished in refreshes),
+        "request_p50_ms": _percentile_ms(request_durations, 50),
+        "request_p99_ms": _percentile_ms(request_durations, 99),
+        "request_peak_in_flight": peak_overlap((started, finished) for started, finished, _ok in timings),
+        "request_peak_per_s": peak_rate(started for started, _finished, _ok in timings),
+        "memory_per_entry_kib": memory_per_entry,
+        "peak_memory_per_entry_kib": peak_memory_per_entry,
+    }
+
+
+def check_thresholds(results: list[dict[str, Any]]) -> list[str]:
+    """Return the measurements exceeding the regression thresholds.
+
+    Each result is checked against the thresholds of the largest entry count
+    it covers; results with fewer entries than any threshold are skipped.
+    """
+    violations = []
+    for result in results:
+        covered = [count for count in THRESHOLDS if count <= result["entries"]]
+        if not covered:
+            continue
+        for key, limit in THRESHOLDS[max(covered)].items():
+            if (value := result.get(key)) is not None and value > limit:
+                violations.append(
+                    f"{result['case']} {result['size']}: {key} {value} exceeds {limit}"
+                )
+    return violations
+
+
+def format_load_table(results: list[dict[str, Any]]) -> str:
+    """Return load test results as a plain text table."""
+    lines = [
+        f"{'case':<16} {'size':>5} {'lag p50':>8} {'lag p99':>8} {'lag max':>8} "
+        f"{'refr p99':>9} {'refr pk':>7} {'req pk':>7} {'req/s pk':>8} "
+        f"{'req p99':>8} {'KiB/entry':>9} {'failed':>6}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result['case']:<16} {result['size']:>5} {result['loop_lag_p50_ms']:>8.2f} "
+            f"{result['loop_lag_p99_ms']:>8.2f} {result['loop_lag_max_ms']:>8.2f} "
+            f"{result['refresh_p99_ms']:>9.1f} {result['refresh_peak_in_flight']:>7} "
+            f"{result['request_peak_in_flight']:>7} {result['request_peak_per_s']:>8} "
+            f"{result['request_p99_ms']:>8.1f} {result['memory_per_entry_kib']:>9.1f} "
+            f"{result['failed_requests']:>6}"
+        )
+    return "\n".join(lines)
+
+
+async def _async_start_server(latency: float, jitter: float) -> tuple[asyncio.subprocess.Process, str]:
+    """Start the mock API in a subprocess and return it with its base URL."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-u", "-m", "benchmarks.mock_server",
+        "--port", "0", "--latency", str(latency), "--jitter", str(jitter),
+        stdout=asyncio.subprocess.PIPE,
+    )
+    line = (await asyncio.wait_for(process.stdout.readline(), 30)).decode().strip()
+    if " at " not in line:
+        process.terminate()
+        raise RuntimeError(f"Mock API failed to start: {line}")
+    return process, line.rsplit(" at ", 1)[1]
+
+
+def _discard_statistics(hass: Any, metadata: Any, statistics: list[Any]) -> None:
+    """Stand in for the recorder import functions."""
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run the load test for every requested number of entries."""
+    logging.basicConfig(level=logging.ERROR)
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        process, base_url = await _async_start_server(args.latency, args.jitter)
+
+    results = []
+    try:
+        with (
+            patch("custom_components.oura.statistics.async_import_statistics_ha", _discard_statistics),
+            patch("custom_components.oura.statistics.async_add_external_statistics", _discard_statistics),
+            tempfile.TemporaryDirectory() as config_dir,
+        ):
+            for count in args.entries:
+                result = await async_load(
+                    count, base_url, config_dir, args.cycles, args.interval, args.mode
+                )
+                results.append(result)
+                print(format_load_table([result]).splitlines()[-1], flush=True)
+    finally:
+        if process is not None:
+            process.terminate()
+            await process.wait()
+
+    write_results(args.output, "load_test", results)
+    print(format_load_table(results))
+    print(f"Results written to {args.output}")
+
+    if args.check and (violations := check_thresholds(results)):
+        print("\n".join(violations))
+        raise SystemExit(1)
+
+
+def main() -> None:
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entries", nargs="+", type=int, default=DEFAULT_ENTRIES)
+    parser.add_argument("--mode", choices=MODES, default="aligned")
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help=f"update interval in seconds (the integration's default is {DEFAULT_UPDATE_INTERVAL} minutes)",
+    )
+    parser.add_argument("--latency", type=float, default=0.15, help="mock API latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--base-url", help="use a running stand-in API instead of starting one")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--check", action="store_true", help="fail when a threshold is exceeded")
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""Local stand-in for the Oura API.
+
+Serves the date-ranged endpoints of the OpenAPI spec with documents from
+``benchmarks.synthetic`` and mimics the behaviour the integration has to cope
+with:
+
+- ``next_token`` pagination
+- the 30-day range limit of the heart rate endpoint (400)
+- 401 for endpoints whose scope the token was not granted
+- 429 with ``Retry-After`` once a token exceeds 5000 requests in 5 minutes
+- configurable latency with jitter
+- webhook subscriptions, verified with a challenge, and event delivery
+
+Run it standalone and point a config entry at it by setting ``api_base_url``
+in the entry data to the printed base URL:
+
+    python -m benchmarks.mock_server --port 8765 --latency 0.2 --jitter 0.1
+
+In tests and benchmarks, start it in the running event loop::
+
+    async with MockOuraServer(page_size=50) as server:
+        ...  # requests to server.base_url
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+import math
+import random
+import time
+from typing import Any
+import uuid
+
+from aiohttp import ClientError, ClientSession, web
+
+from custom_components.oura.const import (
+    API_MAX_RANGE_DAYS,
+    API_RATE_LIMIT_PERIOD,
+    API_RATE_LIMIT_REQUESTS,
+)
+
+from .synthetic import COLLECTION_PREFIX, SyntheticOura
+
+# OAuth scope each endpoint requires, named like the integration's scopes
+ENDPOINT_SCOPES = {
+    "daily_activity": "daily",
+    "daily_readiness": "daily",
+    "daily_resilience": "daily",
+    "daily_sleep": "daily",
+    "rest_mode_period": "daily",
+    "sleep": "daily",
+    "sleep_time": "daily",
+    "daily_stress": "stress",
+    "daily_spo2": "spo2",
+    "daily_cardiovascular_age": "heart_health",
+    "vO2_max": "heart_health",
+    "heartrate": "heartrate",
+    "session": "session",
+    "workout": "workout",
+    "tag": "tag",
+    "enhanced_tag": "tag",
+}
+ALL_SCOPES = frozenset(ENDPOINT_SCOPES.values())
+
+WEBHOOK_PATH = "/v2/webhook/subscription"
+WEBHOOK_LIFETIME = timedelta(days=90)
+
+
+def _error(status: int, message: str, **headers: str) -> web.Response:
+    """Return an error response with a FastAPI style detail."""
+    return web.json_response({"detail": message}, status=status, headers=headers)
+
+
+class MockOuraServer:
+    """aiohttp server answering Oura API requests with synthetic documents."""
+
+    def __init__(
+        self,
+        generator: SyntheticOura | None = None,
+        scopes: frozenset[str] | set[str] = ALL_SCOPES,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit: int = API_RATE_LIMIT_REQUESTS,
+        rate_period: float = API_RATE_LIMIT_PERIOD,
+        page_size: int | None = None,
+        cache_documents: bool = False,
+        client_id: str = "mock_client_id",
+        client_secret: str = "mock_client_secret",
+        seed: int = 0,
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            generator: Document generator; defaults to one seeded with ``seed``
+            scopes: Scopes granted to every token
+            latency: Mean seconds before each response
+            jitter: Maximum deviation from the mean latency, in seconds
+            rate_limit: Requests a token may make per rate period
+            rate_period: Length of the rate limit window in seconds
+            page_size: Documents per page; defaults to the generator's sizes
+            cache_documents: Keep generated days in memory, so repeated
+                requests measure the client rather than the generator
+            client_id: Client ID webhook subscription requests must send
+            client_secret: Client secret webhook subscription requests must send
+            seed: Seed of the default generator and of the latency jitter
+        """
+        self.generator = generator or SyntheticOura(seed)
+        self.scopes = set(scopes)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.page_size = page_size
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.subscriptions: dict[str, dict[str, Any]] = {}
+        # (method, endpoint, query, status) of every request
+        self.requests: list[tuple[str, str, dict[str, str], int]] = []
+        self._random = random.Random(seed)
+        self._calls: dict[str, deque[float]] = {}
+        self._runner: web.AppRunner | None = None
+        self._session: ClientSession | None = None
+        self.origin = ""
+        if cache_documents:
+            documents = self.generator.day_documents
+            cache: dict[tuple[str, date], list[dict[str, Any]]] = {}
+
+            def cached_documents(endpoint: str, day: date) -> list[dict[str, Any]]:
+                if (key := (endpoint, day)) not in cache:
+                    cache[key] = documents(endpoint, day)
+                return cache[key]
+
+            self.generator.day_documents = cached_documents
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_get(f"{COLLECTION_PREFIX}{{endpoint}}", self._handle_collection)
+        self.app.router.add_get(WEBHOOK_PATH, self._handle_list_subscriptions)
+        self.app.router.add_post(WEBHOOK_PATH, self._handle_create_subscription)
+        self.app.router.add_delete(f"{WEBHOOK_PATH}/{{id}}", self._handle_delete_subscription)
+        self.app.router.add_put(f"{WEBHOOK_PATH}/renew/{{id}}", self._handle_renew_subscription)
+
+    @property
+    def base_url(self) -> str:
+        """Return the URL to use in place of API_BASE_URL."""
+        return f"{self.origin}{COLLECTION_PREFIX.rstrip('/')}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.origin = f"http://{host}:{self._runner.addresses[0][1]}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> MockOuraServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    def request_count(self, endpoint: str | None = None, status: int | None = None) -> int:
+        """Return the number of requests, optionally of one endpoint and status."""
+        return sum(
+            1
+            for _method, requested, _query, response_status in self.requests
+            if endpoint in (None, requested) and status in (None, response_status)
+        )
+
+    async def async_deliver_webhook(
+        self,
+        data_type: str,
+        event_type: str = "update",
+        object_id: str | None = None,
+        user_id: str = "mock_user",
+    ) -> int:
+        """Notify the subscriptions of a data type and operation.
+
+        Returns:
+            Number of notifications the callbacks accepted
+        """
+        event = {
+            "event_type": event_type,
+            "data_type": data_type,
+            "object_id": object_id or str(uuid.uuid4()),
+            "event_time": datetime.now(timezone.utc).isoformat(),
+            "user_id": user_id,
+        }
+        delivered = 0
+        for subscription in list(self.subscriptions.values()):
+            if (subscription["data_type"], subscription["event_type"]) != (data_type, event_type):
+                continue
+            try:
+                async with self._client().post(subscription["callback_url"], json=event) as response:
+                    delivered += response.status < 300
+            except ClientError:
+                continue
+        return delivered
+
+    def _client(self) -> ClientSession:
+        """Return the session used for webhook requests."""
+        if self._session is None:
+            self._session = ClientSession()
+        return self._session
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        """Apply latency and record every request."""
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+        try:
+            response = await handler(request)
+        except web.HTTPException as err:
+            response = err
+        endpoint = request.match_info.get("endpoint") or request.path
+        self.requests.append((request.method, endpoint, dict(request.query), response.status))
+        if isinstance(response, web.HTTPException):
+            raise response
+        return response
+
+    def _check_rate_limit(self, token: str) -> web.Response | None:
+        """Count a request against the token's budget, or reject it."""
+        now = time.monotonic()
+        calls = self._calls.setdefault(token, deque())
+        while calls and calls[0] <= now - self.rate_period:
+            calls.popleft()
+        if len(calls) >= self.rate_limit:
+            retry_after = math.ceil(calls[0] + self.rate_period - now)
+            return _error(429, "Too many requests", **{"Retry-After": str(max(1, retry_after))})
+        calls.append(now)
+        return None
+
+    async def _handle_collection(self, request: web.Request) -> web.Response:
+        """Serve one page of a date-ranged collection."""
+        endpoint = request.match_info["endpoint"]
+        if endpoint not in self.generator.models:
+            return _error(404, "Not Found")
+
+        authorization = request.headers.get("Authorization", "")
+        token = authorization.removeprefix("Bearer ").strip()
+        if not authorization.startswith("Bearer ") or not token:
+            return _error(401, "Missing or invalid access token")
+        if (rejected := self._check_rate_limit(token)) is not None:
+            return rejected
+        if ENDPOINT_SCOPES.get(endpoint, "daily") not in self.scopes:
+            return _error(401, f"Access token is missing the required scope for {endpoint}")
+
+        query = request.query
+        try:
+            if self.generator.spec.datetime_range(endpoint):
+                end = _parse_datetime(query.get("end_datetime")) or datetime.now(timezone.utc)
+                start = _parse_datetime(query.get("start_datetime")) or end - timedelta(days=1)
+                limit = API_MAX_RANGE_DAYS.get(endpoint)
+                if limit is not None and end - start > timedelta(days=limit):
+                    return _error(400, f"The time range may not exceed {limit} days")
+            else:
+                end = date.fromisoformat(query["end_date"]) if "end_date" in query else date.today()
+                start = (
+                    date.fromisoformat(query["start_date"])
+                    if "start_date" in query
+                    else end - timedelta(days=1)
+                )
+            if start > end:
+                return _error(400, "Start must not be after end")
+            page = self.generator.get_page(endpoint, start, end, query.get("next_token"), self.page_size)
+        except ValueError as err:
+            return _error(400, str(err))
+        return web.json_response(page)
+
+    def _check_client(self, request: web.Request) -> web.Response | None:
+        """Reject webhook requests without the client credentials."""
+        if (
+            request.headers.get("x-client-id") != self.client_id
+            or request.headers.get("x-client-secret") != self.client_secret
+        ):
+            return _error(403, "Invalid client credentials")
+        return None
+
+    async def _handle_list_subscriptions(self, request: web.Request) -> web.Response:
+        """List the webhook subscriptions."""
+        if (rejected := self._check_client(request)) is not None:
+            return rejected
+        return web.json_response(list(self.subscriptions.values()))
+
+    async def _handle_create_subscription(self, request: web.Request) -> web.Response:
+        """Create a webhook subscription once its callback answers the challenge."""
+        if (rejected := self._check_client(request)) is not None:
+            return rejected
+        try:
+            body = await request.json()
+            callback_url = body["callback_url"]
+            verification_token = body["verification_token"]
+            event_type = body["event_type"]
+            data_type = body["data_type"]
+        except (ValueError, KeyError, TypeError):
+            return _error(422, "callback_url, verification_token, event_type and data_type are required")
+
+        challenge = uuid.uuid4().hex
+        try:
+            async with self._client().get(
+                callback_url,
+                params={"verification_token": verification_token, "challenge": challenge},
+            ) as response:
+                answer = await response.json() if response.status == 200 else {}
+        except (ClientError, ValueError):
+            answer = {}
+        if answer.get("challenge") != challenge:
+            return _error(422, "The callback did not answer the verification challenge")
+
+        subscription = {
+            "id": str(uuid.uuid4()),
+            "callback_url": callback_url,
+            "event_type": event_type,
+            "data_type": data_type,
+            "expiration_time": (datetime.now(timezone.utc) + WEBHOOK_LIFETIME).isoformat(),
+        }
+        self.subscriptions[subscription["id"]] = subscription
+        return web.json_response(subscription, status=201)
+
+    async def _handle_delete_subscription(self, request: web.Request) -> web.Response:
+        """Delete a webhook subscription."""
+        if (rejected := self._check_client(request)) is not None:
+            return rejected
+        if self.subscriptions.pop(request.match_info["id"], None) is None:
+            return _error(403, "Unknown subscription")
+        return web.Response(status=204)
+
+    async def _handle_renew_subscription(self, request: web.Request) -> web.Response:
+        """Extend a webhook subscription's expiration time."""
+        if (rejected := self._check_client(request)) is not None:
+            return rejected
+        if (subscription := self.subscriptions.get(request.match_info["id"])) is None:
+            return _error(403, "Unknown subscription")
+        subscription["expiration_time"] = (datetime.now(timezone.utc) + WEBHOOK_LIFETIME).isoformat()
+        return web.json_response(subscription)
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    """Parse a query timestamp; naive timestamps are UTC."""
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def _async_serve(args: argparse.Namespace) -> None:
+    """Serve until interrupted."""
+    server = MockOuraServer(
+        scopes=set(args.scopes),
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        page_size=args.page_size,
+        seed=args.seed,
+    )
+    print(f"Serving the Oura API at {await server.start(args.host, args.port)}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    """Run the server from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=API_RATE_LIMIT_REQUESTS)
+    parser.add_argument("--page-size", type=int)
+    parser.add_argument("--scopes", nargs="+", default=sorted(ALL_SCOPES))
+    parser.add_argument("--seed", type=int, default=0)
+    try:
+        asyncio.run(_async_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
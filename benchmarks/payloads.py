@@ -0,0 +1,42 @@
+"""Synthetic Oura API payloads for benchmarks.
+
+Payloads have the shape returned by ``OuraApiClient.async_get_data``, built
+from the spec-driven generator in ``benchmarks.synthetic``: one document per
+day for every daily endpoint, heart rate readings every five minutes, and the
+intraday samples and classification strings the series statistics decode.
+A payload of a given size is identical across runs and releases.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+from .synthetic import SyntheticOura
+
+# Named payload sizes in days
+SIZES = {
+    "1d": 1,
+    "1m": 30,
+    "12m": 365,
+    "48m": 4 * 365,
+}
+
+
+def build_payload(days: int, end: date | None = None, seed: int = 0) -> dict[str, dict[str, Any]]:
+    """Build a synthetic payload covering a number of days.
+
+    Args:
+        days: Number of days, ending on ``end``
+        end: Last day; defaults to today
+        seed: Random seed
+
+    Returns:
+        Data keyed by source, each holding a "data" list of documents
+    """
+    end = end or date.today()
+    return SyntheticOura(seed).build_payload(end - timedelta(days=days - 1), end)
+
+
+def count_documents(payload: dict[str, dict[str, Any]]) -> int:
+    """Return the number of documents and readings in a payload."""
+    return sum(len(source_data.get("data") or ()) for source_data in payload.values())
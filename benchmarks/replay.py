@@ -0,0 +1,158 @@
+"""Record Oura API traffic to a cassette and replay it offline.
+
+``record`` runs ``OuraApiClient.async_get_data`` against the API, or any
+stand-in such as ``benchmarks.mock_server``, and writes the responses to a
+cassette (see ``custom_components.oura.transport``). The access token is read
+from the ``OURA_ACCESS_TOKEN`` environment variable and never written:
+
+    OURA_ACCESS_TOKEN=... python -m benchmarks.replay record oura.jsonl.gz --days-back 90 --anonymize
+
+``replay`` repeats every ``async_get_data`` call found in a cassette, whether
+recorded here or by a config entry, and processes its data like the
+coordinator does. Responses come back as fast as possible, or after their
+recorded duration with ``--realtime``. ``--profile`` writes cProfile stats
+for e.g. snakeviz:
+
+    python -m benchmarks.replay replay oura.jsonl.gz --profile replay.prof
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+from datetime import date
+import os
+from pathlib import Path
+import time
+from types import SimpleNamespace
+
+from aiohttp import ClientSession
+
+from custom_components.oura.api import OuraApiClient
+from custom_components.oura.baselines import BaselineTracker
+from custom_components.oura.const import API_BASE_URL, CONF_API_BASE_URL
+from custom_components.oura.coordinator import OuraDataUpdateCoordinator
+from custom_components.oura.transport import (
+    HttpTransport,
+    RecordingTransport,
+    ReplayTransport,
+    read_cassette,
+)
+
+from .payloads import count_documents
+
+TOKEN_VARIABLE = "OURA_ACCESS_TOKEN"
+# async_get_data requests this endpoint exactly once per call
+_MARKER_PATH = "/daily_sleep"
+
+
+def _client(access_token: str, base_url: str = API_BASE_URL) -> OuraApiClient:
+    """Return an API client holding an access token."""
+
+    async def async_ensure_token_valid() -> None:
+        """Keep the token."""
+
+    session = SimpleNamespace(
+        async_ensure_token_valid=async_ensure_token_valid,
+        valid_token=True,
+        token={"access_token": access_token},
+    )
+    entry = SimpleNamespace(entry_id="replay", data={CONF_API_BASE_URL: base_url}, options={})
+    return OuraApiClient(SimpleNamespace(data={}), session, entry)
+
+
+def recorded_calls(interactions: list[dict]) -> list[tuple[int, date]]:
+    """Return the arguments of the async_get_data calls in a recording.
+
+    Args:
+        interactions: Recorded interactions, as returned by read_cassette
+
+    Returns:
+        (days_back, end_date) of every call, in recording order
+    """
+    calls = []
+    for interaction in interactions:
+        params = interaction["params"]
+        if (
+            not interaction["url"].endswith(_MARKER_PATH)
+            or "next_token" in params
+            or not {"start_date", "end_date"} <= set(params)
+        ):
+            continue
+        start, end = date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"])
+        calls.append(((end - start).days, end))
+    return calls
+
+
+async def async_record(args: argparse.Namespace) -> None:
+    """Record one async_get_data call."""
+    access_token = os.environ.get(TOKEN_VARIABLE)
+    if not access_token:
+        raise SystemExit(f"Set {TOKEN_VARIABLE} to an access token")
+    async with ClientSession() as client_session:
+        client = _client(access_token, args.base_url)
+        client.transport = RecordingTransport(
+            HttpTransport(client_session), args.cassette, anonymize=args.anonymize
+        )
+        started = time.perf_counter()
+        data = await client.async_get_data(days_back=args.days_back)
+    print(
+        f"Recorded {count_documents(data)} documents in {time.perf_counter() - started:.2f} s "
+        f"to {args.cassette}"
+    )
+
+
+async def async_replay(args: argparse.Namespace) -> None:
+    """Replay every async_get_data call of a cassette."""
+    header, interactions = read_cassette(args.cassette)
+    transport = ReplayTransport(interactions, args.realtime, header)
+    client = _client("replay")
+    client.transport = transport
+    coordinator = SimpleNamespace(baselines=BaselineTracker())
+    profiler = cProfile.Profile() if args.profile else None
+
+    for days_back, end_date in recorded_calls(interactions):
+        if profiler:
+            profiler.enable()
+        started = time.perf_counter()
+        data = await client.async_get_data(days_back=days_back, end_date=end_date)
+        fetched = time.perf_counter()
+        OuraDataUpdateCoordinator._process_data(coordinator, data)
+        processed = time.perf_counter()
+        if profiler:
+            profiler.disable()
+        print(
+            f"{end_date} days_back={days_back}: {count_documents(data)} documents, "
+            f"fetch {(fetched - started) * 1000:.1f} ms, process {(processed - fetched) * 1000:.1f} ms"
+        )
+
+    print(f"Replayed {transport.replayed} of {len(interactions)} recorded responses")
+    if profiler:
+        profiler.dump_stats(args.profile)
+        print(f"Wrote profile to {args.profile}")
+
+
+def main() -> None:
+    """Record or replay a cassette from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="record async_get_data to a cassette")
+    record.add_argument("cassette", type=Path)
+    record.add_argument("--base-url", default=API_BASE_URL)
+    record.add_argument("--days-back", type=int, default=1)
+    record.add_argument("--anonymize", action="store_true", help="replace identifiers and emails")
+    record.set_defaults(run=async_record)
+
+    replay = commands.add_parser("replay", help="replay the async_get_data calls of a cassette")
+    replay.add_argument("cassette", type=Path)
+    replay.add_argument("--realtime", action="store_true", help="keep the recorded durations")
+    replay.add_argument("--profile", type=Path, help="write cProfile stats to this file")
+    replay.set_defaults(run=async_replay)
+
+    args = parser.parse_args()
+    asyncio.run(args.run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,554 @@
+"""Synthetic Oura API documents generated from the bundled OpenAPI spec.
+
+Every multi-document endpoint of ``docs/oura-openapi-1.27.json`` that takes a
+date range can be generated. Documents are built by walking the endpoint's
+response model, so every field the spec declares is present with a value of
+its declared type, enums are honoured, and ranges given in field descriptions
+(such as "in range [1, 100]") bound the values. Fields the integration reads
+are then made consistent with each other: a night's durations match its
+hypnogram, SampleModel series have the length of the period they cover, and
+heart rate readings come every five minutes around the clock.
+
+Each day is generated from its own seeded random generator, so any day (and
+any page) can be produced on its own and identically across runs. Documents
+are yielded lazily, which keeps memory flat for years of data::
+
+    oura = SyntheticOura(seed=1)
+    for page in oura.iter_pages("heartrate", date(2022, 1, 1), date(2025, 12, 31)):
+        ...
+
+Run as a script to write JSON lines files of pages, one per endpoint:
+
+    python -m benchmarks.synthetic --days 365 --output /tmp/oura
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+from collections.abc import Iterator
+from datetime import date, datetime, time, timedelta, timezone
+import gzip
+import json
+from pathlib import Path
+import random
+import re
+from typing import Any
+import uuid
+
+SPEC_PATH = Path(__file__).parent.parent / "docs" / "oura-openapi-1.27.json"
+
+COLLECTION_PREFIX = "/v2/usercollection/"
+
+# Data source of every endpoint OuraApiClient.async_get_data requests
+ENDPOINT_SOURCES = {
+    "daily_sleep": "sleep",
+    "daily_readiness": "readiness",
+    "daily_activity": "activity",
+    "heartrate": "heartrate",
+    "sleep": "sleep_detail",
+    "daily_stress": "stress",
+    "daily_resilience": "resilience",
+    "daily_spo2": "spo2",
+    "vO2_max": "vo2_max",
+    "daily_cardiovascular_age": "cardiovascular_age",
+    "sleep_time": "sleep_time",
+}
+
+# Documents per day; endpoints not listed have exactly one
+HEARTRATE_INTERVAL = timedelta(minutes=5)
+DOCUMENTS_PER_DAY = {
+    "heartrate": int(timedelta(days=1) / HEARTRATE_INTERVAL),
+}
+# Endpoints recording occasional events, with zero to two documents a day
+SPARSE_ENDPOINTS = ("enhanced_tag", "rest_mode_period", "session", "tag", "workout")
+
+DEFAULT_PAGE_SIZE = 100
+HEARTRATE_PAGE_SIZE = 10000
+
+# Value ranges of fields whose description gives none
+FIELD_RANGES: dict[str, tuple[float, float]] = {
+    "active_calories": (100, 1200),
+    "average_breath": (12, 18),
+    "average_heart_rate": (45, 70),
+    "average_hrv": (20, 100),
+    "average_met_minutes": (1, 3),
+    "bpm": (45, 160),
+    "calories": (50, 800),
+    "distance": (500, 15000),
+    "equivalent_walking_distance": (1000, 15000),
+    "inactivity_alerts": (0, 3),
+    "lowest_heart_rate": (40, 60),
+    "meters_to_target": (0, 8000),
+    "period": (0, 3),
+    "readiness_score_delta": (-5, 5),
+    "recovery_high": (0, 4 * 3600),
+    "restless_periods": (0, 400),
+    "sleep_score_delta": (-5, 5),
+    "steps": (2000, 20000),
+    "stress_high": (0, 4 * 3600),
+    "target_calories": (300, 700),
+    "target_meters": (5000, 12000),
+    "temperature_deviation": (-1, 1),
+    "temperature_trend_deviation": (-1, 1),
+    "total_calories": (1800, 3500),
+    "vo2_max": (30, 55),
+    "average": (92, 99),
+    "age": (18, 80),
+    "weight": (50, 110),
+    "height": (1.5, 2.0),
+}
+_RANGE_SUFFIXES = (
+    ("_met_minutes", (0, 300)),
+    ("_time", (0, 4 * 3600)),
+    ("_duration", (0, 3 * 3600)),
+)
+_DESCRIPTION_RANGE = re.compile(r"\[\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*\]")
+
+# Schemas holding timestamps and days
+_TIMESTAMP_SCHEMAS = ("LocalDateTime", "LocalDateTimeWithMilliseconds", "LocalizedDateTime", "UtcDateTime")
+_DAY_SCHEMAS = ("ISODate",)
+
+# Hypnogram classes: deep, light, REM, awake
+_PHASES = "1234"
+
+
+class OuraSpec:
+    """Response models of the Oura API spec."""
+
+    def __init__(self, path: Path = SPEC_PATH) -> None:
+        """Load the spec."""
+        self.document = json.loads(path.read_text())
+        self.schemas: dict[str, Any] = self.document["components"]["schemas"]
+
+    @staticmethod
+    def ref_name(schema: dict[str, Any]) -> str | None:
+        """Return the name of the schema a $ref points to."""
+        ref = schema.get("$ref")
+        return ref.rsplit("/", 1)[1] if ref else None
+
+    def resolve(self, schema: dict[str, Any]) -> dict[str, Any]:
+        """Return the schema a $ref points to, or the schema itself."""
+        name = self.ref_name(schema)
+        return self.schemas[name] if name else schema
+
+    def endpoints(self) -> dict[str, dict[str, Any]]:
+        """Return the date-ranged multi-document endpoints.
+
+        Returns:
+            Response model of every endpoint's documents, keyed by endpoint
+            name (the path below /v2/usercollection/)
+        """
+        endpoints = {}
+        for path, operations in self.document["paths"].items():
+            if not path.startswith(COLLECTION_PREFIX) or "{" in path:
+                continue
+            operation = operations.get("get") or {}
+            parameters = {parameter["name"] for parameter in operation.get("parameters", ())}
+            if not parameters & {"start_date", "start_datetime"}:
+                continue
+            response = operation["responses"]["200"]["content"]["application/json"]["schema"]
+            endpoints[path[len(COLLECTION_PREFIX):]] = self.resolve(
+                self.resolve(response)["properties"]["data"]["items"]
+            )
+        return endpoints
+
+    def datetime_range(self, endpoint: str) -> bool:
+        """Return whether an endpoint takes start_datetime/end_datetime."""
+        operation = self.document["paths"][f"{COLLECTION_PREFIX}{endpoint}"]["get"]
+        return any(parameter["name"] == "start_datetime" for parameter in operation["parameters"])
+
+    def validate(self, schema: dict[str, Any], value: Any, path: str = "") -> list[str]:
+        """Validate a value against a schema.
+
+        Covers the keywords the spec uses: $ref, anyOf, type, enum, format
+        date, required, properties, items and minLength.
+
+        Returns:
+            Error messages, empty if the value is valid
+        """
+        name = self.ref_name(schema)
+        schema = self.resolve(schema)
+        if "anyOf" in schema:
+            if any(not self.validate(option, value, path) for option in schema["anyOf"]):
+                return []
+            return [f"{path or '<root>'}: {value!r} matches no anyOf option"]
+
+        errors: list[str] = []
+        kind = schema.get("type")
+        checks = {
+            "null": lambda: value is None,
+            "boolean": lambda: isinstance(value, bool),
+            "integer": lambda: isinstance(value, int) and not isinstance(value, bool),
+            "number": lambda: isinstance(value, (int, float)) and not isinstance(value, bool),
+            "string": lambda: isinstance(value, str),
+            "array": lambda: isinstance(value, list),
+            "object": lambda: isinstance(value, dict),
+        }
+        if kind in checks and not checks[kind]():
+            return [f"{path or '<root>'}: {value!r} is not of type {kind}"]
+        if "enum" in schema and value not in schema["enum"]:
+            errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+        if kind == "string":
+            if len(value) < schema.get("minLength", 0):
+                errors.append(f"{path}: {value!r} is shorter than {schema['minLength']}")
+            if schema.get("format") == "date" or name in _DAY_SCHEMAS:
+                errors.extend(_check_iso(date.fromisoformat, value, path))
+            elif name in _TIMESTAMP_SCHEMAS:
+                errors.extend(_check_iso(datetime.fromisoformat, value, path))
+        elif kind == "array":
+            for index, item in enumerate(value):
+                errors.extend(self.validate(schema["items"], item, f"{path}[{index}]"))
+        elif kind == "object":
+            for key in schema.get("required", ()):
+                if key not in value:
+                    errors.append(f"{path}.{key}: required field missing")
+            for key, item in value.items():
+                if key in schema.get("properties", {}):
+                    errors.extend(
+                        self.validate(schema["properties"][key], item, f"{path}.{key}".lstrip("."))
+                    )
+        return errors
+
+
+def _check_iso(parse: Any, value: str, path: str) -> list[str]:
+    """Return an error if a string is not an ISO date or timestamp."""
+    try:
+        parse(value)
+    except ValueError:
+        return [f"{path}: {value!r} is not an ISO {parse.__qualname__.split('.')[0]}"]
+    return []
+
+
+def _encode_token(ordinal: int, offset: int) -> str:
+    """Return the next_token pointing at a document of a day."""
+    return base64.urlsafe_b64encode(f"{ordinal}:{offset}".encode()).decode()
+
+
+def decode_token(token: str) -> tuple[int, int]:
+    """Return the (day ordinal, document offset) a next_token points at.
+
+    Raises:
+        ValueError: The token was not produced by the generator
+    """
+    try:
+        ordinal, offset = base64.urlsafe_b64decode(token.encode()).decode().split(":")
+        return int(ordinal), int(offset)
+    except (ValueError, UnicodeDecodeError) as err:
+        raise ValueError(f"Invalid next_token {token!r}") from err
+
+
+class _Day:
+    """Generation state of one document."""
+
+    def __init__(self, rng: random.Random, day: date) -> None:
+        self.rng = rng
+        self.day = day
+        self.midnight = datetime.combine(day, time(), tzinfo=timezone.utc)
+
+    def timestamp(self) -> str:
+        """Return a random timestamp of the day."""
+        return (self.midnight + timedelta(seconds=self.rng.randrange(86400))).isoformat()
+
+
+class SyntheticOura:
+    """Seeded generator of Oura API documents."""
+
+    def __init__(self, seed: int = 0, spec: OuraSpec | None = None, null_rate: float = 0.0) -> None:
+        """Initialize the generator.
+
+        Args:
+            seed: Random seed; the same seed yields the same documents
+            spec: Parsed spec; defaults to the bundled spec
+            null_rate: Probability of a nullable field being null
+        """
+        self.seed = seed
+        self.spec = spec or OuraSpec()
+        self.null_rate = null_rate
+        self.models = self.spec.endpoints()
+
+    def iter_documents(
+        self,
+        endpoint: str,
+        start: date | datetime,
+        end: date | datetime,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the documents of a range, day by day.
+
+        Args:
+            endpoint: Endpoint name, such as "daily_sleep" or "heartrate"
+            start: First day, or first instant for heartrate
+            end: Last day (inclusive), or last instant for heartrate
+        """
+        for ordinal in range(_day(start).toordinal(), _day(end).toordinal() + 1):
+            for document in self.day_documents(endpoint, date.fromordinal(ordinal)):
+                if endpoint == "heartrate" and not _within(document["timestamp"], start, end):
+                    continue
+                yield document
+
+    def iter_pages(
+        self,
+        endpoint: str,
+        start: date | datetime,
+        end: date | datetime,
+        page_size: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the response pages of a range, following next_token."""
+        token = None
+        while True:
+            page = self.get_page(endpoint, start, end, token, page_size)
+            yield page
+            if (token := page["next_token"]) is None:
+                return
+
+    def get_page(
+        self,
+        endpoint: str,
+        start: date | datetime,
+        end: date | datetime,
+        next_token: str | None = None,
+        page_size: int | None = None,
+    ) -> dict[str, Any]:
+        """Return one response page, as the API would.
+
+        Pages are generated independently: the token encodes the day and
+        document the page starts at.
+
+        Raises:
+            ValueError: The next_token is invalid
+        """
+        page_size = page_size or (HEARTRATE_PAGE_SIZE if endpoint == "heartrate" else DEFAULT_PAGE_SIZE)
+        ordinal, offset = decode_token(next_token) if next_token else (_day(start).toordinal(), 0)
+        data: list[dict[str, Any]] = []
+
+        for day_ordinal in range(ordinal, _day(end).toordinal() + 1):
+            documents = self.day_documents(endpoint, date.fromordinal(day_ordinal))
+            for index in range(offset if day_ordinal == ordinal else 0, len(documents)):
+                if len(data) == page_size:
+                    return {"data": data, "next_token": _encode_token(day_ordinal, index)}
+                document = documents[index]
+                if endpoint != "heartrate" or _within(document["timestamp"], start, end):
+                    data.append(document)
+        return {"data": data, "next_token": None}
+
+    def day_documents(self, endpoint: str, day: date) -> list[dict[str, Any]]:
+        """Return the documents of one day of an endpoint."""
+        state = _Day(random.Random(f"{self.seed}:{endpoint}:{day.isoformat()}"), day)
+        if endpoint == "heartrate":
+            return self._heartrate(state)
+
+        model = self.models[endpoint]
+        count = state.rng.randint(0, 2) if endpoint in SPARSE_ENDPOINTS else DOCUMENTS_PER_DAY.get(endpoint, 1)
+        documents = []
+        for _ in range(count):
+            document = self._value(model, "", state)
+            if refine := getattr(self, f"_refine_{endpoint.lower()}", None):
+                refine(document, state)
+            documents.append(document)
+        return documents
+
+    def build_payload(self, start: date, end: date) -> dict[str, dict[str, Any]]:
+        """Return the data async_get_data would return for a range.
+
+        Returns:
+            Documents of every endpoint the integration requests, keyed by
+            its data source
+        """
+        return {
+            source: {"data": list(self.iter_documents(endpoint, start, end))}
+            for endpoint, source in ENDPOINT_SOURCES.items()
+        }
+
+    def _value(self, schema: dict[str, Any], name: str, state: _Day, description: str = "") -> Any:
+        """Generate a value for a schema."""
+        rng = state.rng
+        description = schema.get("description") or description
+        if ref := self.spec.ref_name(schema):
+            if ref == "SampleModel":
+                return self._sample(state, state.midnight, 300, 12, *FIELD_RANGES["bpm"])
+            if ref in _TIMESTAMP_SCHEMAS:
+                return state.timestamp()
+            if ref in _DAY_SCHEMAS:
+                return state.day.isoformat()
+            return self._value(self.spec.resolve(schema), name, state, description)
+
+        if options := schema.get("anyOf"):
+            values = [option for option in options if option.get("type") != "null"]
+            if len(values) < len(options) and rng.random() < self.null_rate:
+                return None
+            return self._value(rng.choice(values), name, state, description)
+
+        if "enum" in schema:
+            return rng.choice(schema["enum"])
+
+        kind = schema.get("type")
+        if kind == "object":
+            return {
+                key: self._value(property_schema, key, state)
+                for key, property_schema in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            return [self._value(schema["items"], name, state) for _ in range(rng.randint(0, 3))]
+        if kind in ("integer", "number"):
+            low, high = _value_range(name, description)
+            if kind == "integer":
+                return rng.randint(int(low), int(high))
+            return round(rng.uniform(low, high), 2)
+        if kind == "boolean":
+            return rng.random() < 0.05
+        if kind == "string":
+            if schema.get("format") == "date" or name == "day":
+                return state.day.isoformat()
+            if name == "id":
+                return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            return f"{name or 'value'}_{rng.randrange(16 ** 6):06x}"
+        return None
+
+    def _sample(
+        self,
+        state: _Day,
+        start: datetime,
+        interval: int,
+        count: int,
+        low: float,
+        high: float,
+    ) -> dict[str, Any]:
+        """Return a SampleModel drifting between two bounds."""
+        rng = state.rng
+        value = rng.uniform(low, high)
+        items: list[float | None] = []
+        for _ in range(count):
+            value = min(high, max(low, value + rng.gauss(0, (high - low) / 20)))
+            # The ring drops a sample now and then
+            items.append(None if rng.random() < 0.02 else round(value, 1))
+        return {"interval": interval, "items": items, "timestamp": start.isoformat(timespec="milliseconds")}
+
+    def _heartrate(self, state: _Day) -> list[dict[str, Any]]:
+        """Return a day of heart rate readings every five minutes."""
+        rng = state.rng
+        low, high = FIELD_RANGES["bpm"]
+        bpm = rng.uniform(55, 75)
+        readings = []
+        for index in range(DOCUMENTS_PER_DAY["heartrate"]):
+            moment = state.midnight + HEARTRATE_INTERVAL * index
+            asleep = moment.hour < 7 or moment.hour >= 23
+            bpm = min(high, max(low, bpm + rng.gauss(0, 3) + ((52 if asleep else 72) - bpm) * 0.1))
+            readings.append({
+                "bpm": round(bpm),
+                "source": "sleep" if asleep else rng.choice(("awake", "awake", "awake", "rest")),
+                "timestamp": moment.isoformat(),
+            })
+        return readings
+
+    def _refine_sleep(self, document: dict[str, Any], state: _Day) -> None:
+        """Make a night's timing, hypnogram, durations and samples agree."""
+        rng = state.rng
+        bedtime = state.midnight - timedelta(minutes=rng.randrange(0, 150, 5))
+        epochs = rng.randrange(78, 114)  # 6.5 to 9.5 hours of 5-minute epochs
+        phases = _runs(rng, _PHASES, epochs, weights=(2, 5, 2, 1))
+        time_in_bed = epochs * 300
+        durations = {phase: phases.count(phase) * 300 for phase in _PHASES}
+        total = time_in_bed - durations["4"]
+        document.update({
+            "type": "long_sleep",
+            "day": state.day.isoformat(),
+            "bedtime_start": bedtime.isoformat(),
+            "bedtime_end": (bedtime + timedelta(seconds=time_in_bed)).isoformat(),
+            "time_in_bed": time_in_bed,
+            "total_sleep_duration": total,
+            "deep_sleep_duration": durations["1"],
+            "light_sleep_duration": durations["2"],
+            "rem_sleep_duration": durations["3"],
+            "awake_time": durations["4"],
+            "latency": rng.randrange(300, 1800, 30),
+            "efficiency": round(total / time_in_bed * 100),
+            "sleep_phase_5_min": phases,
+            "movement_30_sec": _runs(rng, "1234", epochs * 10, weights=(8, 2, 1, 1)),
+            "heart_rate": self._sample(state, bedtime, 300, epochs, 42, 70),
+            "hrv": self._sample(state, bedtime, 300, epochs, 15, 110),
+            "low_battery_alert": rng.random() < 0.02,
+        })
+
+    def _refine_daily_activity(self, document: dict[str, Any], state: _Day) -> None:
+        """Give the activity day its 5-minute classes and minute MET samples."""
+        start = state.midnight + timedelta(hours=4)
+        document.update({
+            "timestamp": start.isoformat(),
+            "class_5_min": _runs(state.rng, "012345", 288, weights=(1, 6, 6, 4, 2, 1)),
+            "met": self._sample(state, start, 60, 1440, 0.9, 8.0),
+        })
+
+    def _refine_sleep_time(self, document: dict[str, Any], state: _Day) -> None:
+        """Place the optimal bedtime around midnight."""
+        rng = state.rng
+        start = rng.randrange(-7200, 0, 900)
+        document["optimal_bedtime"] = {
+            "day_tz": 0,
+            "start_offset": start,
+            "end_offset": start + rng.randrange(1800, 5400, 900),
+        }
+
+
+def _day(value: date | datetime) -> date:
+    """Return the day of a date or timestamp."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _within(timestamp: str, start: date | datetime, end: date | datetime) -> bool:
+    """Return whether a timestamp lies in a datetime range; dates include whole days."""
+    if not isinstance(start, datetime) and not isinstance(end, datetime):
+        return True
+    moment = datetime.fromisoformat(timestamp)
+    if isinstance(start, datetime) and moment < _aware(start):
+        return False
+    return not (isinstance(end, datetime) and moment > _aware(end))
+
+
+def _aware(moment: datetime) -> datetime:
+    """Treat naive timestamps as UTC, like the API."""
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _value_range(name: str, description: str) -> tuple[float, float]:
+    """Return the value range of a numeric field."""
+    if match := _DESCRIPTION_RANGE.search(description):
+        return float(match[1]), float(match[2])
+    if name in FIELD_RANGES:
+        return FIELD_RANGES[name]
+    for suffix, bounds in _RANGE_SUFFIXES:
+        if name.endswith(suffix):
+            return bounds
+    return 0, 100
+
+
+def _runs(rng: random.Random, classes: str, length: int, weights: tuple[int, ...]) -> str:
+    """Return a classification string of runs of weighted random classes."""
+    codes: list[str] = []
+    while len(codes) < length:
+        codes.extend(rng.choices(classes, weights)[0] * rng.randint(1, 6))
+    return "".join(codes[:length])
+
+
+def main() -> None:
+    """Write generated pages of every endpoint to gzipped JSON lines files."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--endpoints", nargs="+")
+    parser.add_argument("--output", type=Path, required=True)
+    args = parser.parse_args()
+
+    oura = SyntheticOura(args.seed)
+    start = args.end - timedelta(days=args.days - 1)
+    args.output.mkdir(parents=True, exist_ok=True)
+    for endpoint in args.endpoints or oura.models:
+        documents = 0
+        with gzip.open(args.output / f"{endpoint}.jsonl.gz", "wt") as file:
+            for page in oura.iter_pages(endpoint, start, args.end):
+                file.write(json.dumps(page) + "\n")
+                documents += len(page["data"])
+        print(f"{endpoint}: {documents} documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,24 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_entry_oauth2_flow, config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
 from .api import OuraApiClient
 from .const import (
     DOMAIN,
     CONF_UPDATE_INTERVAL,
     CONF_HISTORICAL_MONTHS,
+    CONF_CASSETTE,
     DEFAULT_UPDATE_INTERVAL,
     DEFAULT_HISTORICAL_MONTHS,
+    GAP_SCAN_INTERVAL,
 )
 from .coordinator import OuraDataUpdateCoordinator
+from .history_store import HistoryStore
+from .import_index import ImportIndex
+from .services import async_setup_services
+from .transport import async_create_transport
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,6 +34,12 @@ PLATFORMS: list[Platform] = [Platform.SENSOR]
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Oura Ring services."""
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Oura Ring from a config entry."""
     _LOGGER.debug("Setting up Oura Ring entry. Entry data keys: %s", list(entry.data.keys()))
@@ -43,6 +57,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     # Pass the entry to the API client so it can access the token directly
     api_client = OuraApiClient(hass, session, entry)
+    if cassette := entry.data.get(CONF_CASSETTE):
+        # Record or replay API traffic, for reproducing problems offline
+        api_client.transport = await async_create_transport(
+            cassette, api_client.transport, hass.config.path()
+        )
     
     # Get update interval from options, or use default
     update_interval = entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
@@ -75,6 +94,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
+    # Periodically re-import days a failed backfill left missing
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, coordinator.async_scheduled_gap_scan, GAP_SCAN_INTERVAL
+        )
+    )
+    
     # Register update listener for options changes
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
@@ -92,3 +118,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data of a config entry."""
+    await ImportIndex(hass, entry).async_remove()
+    await HistoryStore(hass, entry).async_remove()
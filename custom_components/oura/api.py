@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import logging
+import time
 from typing import Any
+from urllib.parse import urlsplit
 
 from aiohttp import ClientSession, ClientResponseError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
@@ -12,7 +14,10 @@ from homeassistant.helpers.config_entry_oauth2_flow import OAuth2Session
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 
-from .const import API_BASE_URL
+from .const import API_BASE_URL, API_MAX_RANGE_DAYS, CONF_API_BASE_URL
+from .health import ApiHealth
+from .tracing import span
+from .transport import HttpTransport, Transport
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,7 +30,11 @@ class OuraApiClient:
         self.hass = hass
         self.session = session
         self.entry = entry
+        # Overridable for testing against a local stand-in of the API
+        self.base_url = entry.data.get(CONF_API_BASE_URL, API_BASE_URL)
         self._client_session: ClientSession | None = None
+        self._transport: Transport | None = None
+        self.health = ApiHealth()
 
     @property
     def client_session(self) -> ClientSession:
@@ -34,13 +43,27 @@ class OuraApiClient:
             self._client_session = async_get_clientsession(self.hass)
         return self._client_session
 
-    async def async_get_data(self, days_back: int = 1) -> dict[str, Any]:
+    @property
+    def transport(self) -> Transport:
+        """Get the transport sending API requests."""
+        if self._transport is None:
+            self._transport = HttpTransport(self.client_session)
+        return self._transport
+
+    @transport.setter
+    def transport(self, transport: Transport) -> None:
+        """Send API requests through another transport, e.g. to record or replay them."""
+        self._transport = transport
+
+    async def async_get_data(self, days_back: int = 1, end_date: date | None = None) -> dict[str, Any]:
         """Get data from Oura API.
         
         Args:
             days_back: Number of days of historical data to fetch (default: 1)
+            end_date: Last day to fetch (default: today), e.g. the day a
+                replayed cassette was recorded on
         """
-        end_date = datetime.now().date()
+        end_date = end_date or datetime.now().date()
         start_date = end_date - timedelta(days=days_back)
         
         sleep_data, readiness_data, activity_data, heartrate_data, sleep_detail_data, stress_data, resilience_data, spo2_data, vo2_max_data, cardiovascular_age_data, sleep_time_data = await asyncio.gather(
@@ -132,9 +155,47 @@ class OuraApiClient:
             "sleep_time": sleep_time_data if not isinstance(sleep_time_data, Exception) else {},
         }
 
+    async def async_get_range(
+        self,
+        source: str,
+        start_date: datetime.date,
+        end_date: datetime.date,
+    ) -> dict[str, Any]:
+        """Get one data source for a date range.
+
+        Unlike async_get_data, a failed request raises instead of returning
+        empty data, so callers can tell a failure from a range without data.
+        The heart rate range must not exceed its limit in API_MAX_RANGE_DAYS.
+
+        Args:
+            source: Data source key, as returned by async_get_data
+            start_date: First day of the range
+            end_date: Last day of the range
+        """
+        if source == "heartrate":
+            params = {
+                "start_datetime": f"{start_date.isoformat()}T00:00:00",
+                "end_datetime": f"{end_date.isoformat()}T23:59:59",
+            }
+            return await self._async_get(f"{self.base_url}/heartrate", params)
+
+        fetchers = {
+            "sleep": self._async_get_sleep,
+            "readiness": self._async_get_readiness,
+            "activity": self._async_get_activity,
+            "sleep_detail": self._async_get_sleep_detail,
+            "stress": self._async_get_stress,
+            "resilience": self._async_get_resilience,
+            "spo2": self._async_get_spo2,
+            "vo2_max": self._async_get_vo2_max,
+            "cardiovascular_age": self._async_get_cardiovascular_age,
+            "sleep_time": self._async_get_sleep_time,
+        }
+        return await fetchers[source](start_date, end_date)
+
     async def _async_get_sleep(self, start_date: datetime.date, end_date: datetime.date) -> dict[str, Any]:
         """Get sleep data."""
-        url = f"{API_BASE_URL}/daily_sleep"
+        url = f"{self.base_url}/daily_sleep"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -143,7 +204,7 @@ class OuraApiClient:
 
     async def _async_get_readiness(self, start_date: datetime.date, end_date: datetime.date) -> dict[str, Any]:
         """Get readiness data."""
-        url = f"{API_BASE_URL}/daily_readiness"
+        url = f"{self.base_url}/daily_readiness"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -152,7 +213,7 @@ class OuraApiClient:
 
     async def _async_get_activity(self, start_date: datetime.date, end_date: datetime.date) -> dict[str, Any]:
         """Get activity data."""
-        url = f"{API_BASE_URL}/daily_activity"
+        url = f"{self.base_url}/daily_activity"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -165,18 +226,19 @@ class OuraApiClient:
         Note: The heartrate endpoint has a maximum range of 30 days.
         For historical data requests, we'll batch the requests.
         """
-        url = f"{API_BASE_URL}/heartrate"
+        url = f"{self.base_url}/heartrate"
+        max_days = API_MAX_RANGE_DAYS["heartrate"]
         
         # Calculate the number of days in the range
         days_range = (end_date - start_date).days
         
-        # If range is > 30 days, batch the requests
-        if days_range > 30:
+        # If the range covers more than max_days days, batch the requests
+        if days_range >= max_days:
             all_data = []
             current_start = start_date
             
-            while current_start < end_date:
-                current_end = min(current_start + timedelta(days=30), end_date)
+            while current_start <= end_date:
+                current_end = min(current_start + timedelta(days=max_days - 1), end_date)
                 params = {
                     "start_datetime": f"{current_start.isoformat()}T00:00:00",
                     "end_datetime": f"{current_end.isoformat()}T23:59:59",
@@ -211,7 +273,7 @@ class OuraApiClient:
 
     async def _async_get_sleep_detail(self, start_date: datetime.date, end_date: datetime.date) -> dict[str, Any]:
         """Get detailed sleep data including HRV."""
-        url = f"{API_BASE_URL}/sleep"
+        url = f"{self.base_url}/sleep"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -220,7 +282,7 @@ class OuraApiClient:
 
     async def _async_get_stress(self, start_date: datetime.date, end_date: datetime.date) -> dict[str, Any]:
         """Get daily stress data."""
-        url = f"{API_BASE_URL}/daily_stress"
+        url = f"{self.base_url}/daily_stress"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -233,7 +295,7 @@ class OuraApiClient:
         Note: This endpoint may return 401 if the user hasn't authorized the required scope
         or if their ring/subscription doesn't support this feature.
         """
-        url = f"{API_BASE_URL}/daily_resilience"
+        url = f"{self.base_url}/daily_resilience"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -251,7 +313,7 @@ class OuraApiClient:
         Note: This endpoint may return 401 if the user hasn't authorized the spo2Daily scope
         or if their ring doesn't support SpO2 (only Gen3 and Ring 4).
         """
-        url = f"{API_BASE_URL}/daily_spo2"
+        url = f"{self.base_url}/daily_spo2"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -269,7 +331,7 @@ class OuraApiClient:
         Note: This endpoint may return 401 if the user hasn't authorized the required scope
         or if their ring/subscription doesn't support this feature.
         """
-        url = f"{API_BASE_URL}/vO2_max"
+        url = f"{self.base_url}/vO2_max"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -287,7 +349,7 @@ class OuraApiClient:
         Note: This endpoint may return 401 if the user hasn't authorized the required scope
         or if their ring/subscription doesn't support this feature.
         """
-        url = f"{API_BASE_URL}/daily_cardiovascular_age"
+        url = f"{self.base_url}/daily_cardiovascular_age"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -301,7 +363,7 @@ class OuraApiClient:
 
     async def _async_get_sleep_time(self, start_date: datetime.date, end_date: datetime.date) -> dict[str, Any]:
         """Get optimal sleep time recommendations."""
-        url = f"{API_BASE_URL}/sleep_time"
+        url = f"{self.base_url}/sleep_time"
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -309,10 +371,23 @@ class OuraApiClient:
         return await self._async_get(url, params)
 
     async def _async_get(self, url: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
-        """Make GET request to Oura API."""
+        """Make GET request to Oura API, following next_token pagination.
+        
+        The documents of every page are merged into the first response.
+        """
+        result = await self._async_get_page(url, params)
+        while (next_token := result.get("next_token")) and isinstance(result.get("data"), list):
+            page = await self._async_get_page(url, {**(params or {}), "next_token": next_token})
+            result["data"].extend(page.get("data") or [])
+            result["next_token"] = page.get("next_token")
+        return result
+
+    async def _async_get_page(self, url: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Make one GET request to Oura API."""
         try:
             # Ensure token is valid and get the token data
-            await self.session.async_ensure_token_valid()
+            with span("oauth.token"):
+                await self.session.async_ensure_token_valid()
             
             # Access the token directly from the session
             if not self.session.valid_token or not self.session.token:
@@ -333,9 +408,24 @@ class OuraApiClient:
                 "Authorization": f"Bearer {token['access_token']}",
             }
             
-            async with self.client_session.get(url, headers=headers, params=params) as response:
-                response.raise_for_status()
-                return await response.json()
+            path = urlsplit(url).path
+            endpoint = path.rsplit("/", 1)[-1]
+            with span("http.request", **{"url.path": path}) as request_span:
+                started = time.monotonic()
+                try:
+                    response = await self.transport.async_get(url, headers, params)
+                except Exception as err:
+                    self.health.record_request(endpoint, time.monotonic() - started, error=err)
+                    raise
+                result = response.body
+                documents = 0
+                if isinstance(result, dict) and isinstance(result.get("data"), list):
+                    documents = len(result["data"])
+                    request_span.set_attribute("documents", documents)
+                self.health.record_request(
+                    endpoint, time.monotonic() - started, response.size, documents
+                )
+                return result
         except ClientResponseError as err:
             if err.status != 401:  # 401 handled gracefully by callers for optional features
                 _LOGGER.error("Error fetching data from %s: %s", url, err)
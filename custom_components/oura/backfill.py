@@ -0,0 +1,231 @@
+"""On-demand backfill of a date range.
+
+The historical load only runs at setup, for the configured number of months,
+and changing that option reloads the entry. A backfill imports any date range
+of selected endpoints while the integration keeps running. The range is
+planned into the fewest requests each endpoint's range limit allows; a dry run
+only reports the plan and its expected duration. Otherwise requests run in the
+background with bounded concurrency. Their documents are imported one range
+at a time through the regular statistics import and the history store, the
+ranges of each endpoint in chronological order whatever order their requests
+finish in, and progress is reported with ``oura_backfill_progress`` events.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+import logging
+import math
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .api import OuraApiClient
+from .const import (
+    API_MAX_RANGE_DAYS,
+    API_RATE_LIMIT_PERIOD,
+    API_RATE_LIMIT_REQUESTS,
+    API_REQUEST_ESTIMATE_SECONDS,
+    EVENT_BACKFILL_PROGRESS,
+)
+from .history_store import HistoryStore
+from .import_index import ImportIndex, merge_gaps
+from .statistics import async_import_statistics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def plan_backfill(
+    sources: list[str],
+    start: date,
+    end: date,
+) -> list[tuple[str, date, date]]:
+    """Split a date range into requests per endpoint.
+
+    Returns:
+        (source, first day, last day) of every request
+    """
+    days = list(range(start.toordinal(), end.toordinal() + 1))
+    return [
+        (source, date.fromordinal(first), date.fromordinal(last))
+        for source in sources
+        for first, last in merge_gaps(days, API_MAX_RANGE_DAYS.get(source))
+    ]
+
+
+def estimate_duration(requests: int, concurrency: int) -> float:
+    """Return the expected seconds to run requests under the API rate limit.
+
+    Requests take API_REQUEST_ESTIMATE_SECONDS each, ``concurrency`` at a
+    time; every full rate-limit allowance beyond the first costs a period.
+    """
+    latency_bound = math.ceil(requests / concurrency) * API_REQUEST_ESTIMATE_SECONDS
+    rate_bound = (math.ceil(requests / API_RATE_LIMIT_REQUESTS) - 1) * API_RATE_LIMIT_PERIOD
+    return max(latency_bound, rate_bound, 0.0)
+
+
+class Backfill:
+    """Run on-demand backfills for one config entry, one at a time."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: OuraApiClient,
+        entry: ConfigEntry,
+        import_index: ImportIndex,
+        history: HistoryStore,
+    ) -> None:
+        """Initialize the backfill runner."""
+        self.hass = hass
+        self.api_client = api_client
+        self.entry = entry
+        self._import_index = import_index
+        self._history = history
+        self._task: asyncio.Task | None = None
+        entry.async_on_unload(self._async_cancel)
+
+    @property
+    def running(self) -> bool:
+        """Return whether a backfill is running."""
+        return self._task is not None and not self._task.done()
+
+    async def async_wait(self) -> None:
+        """Wait for the running backfill, if any, to finish."""
+        if self.running:
+            await asyncio.shield(self._task)
+
+    def async_start(
+        self,
+        sources: list[str],
+        start: date,
+        end: date,
+        concurrency: int,
+        dry_run: bool = False,
+    ) -> dict[str, Any]:
+        """Plan a backfill and start it in the background unless dry_run.
+
+        Args:
+            sources: Endpoints (data sources) to fetch
+            start: First day
+            end: Last day
+            concurrency: Maximum number of concurrent requests
+            dry_run: Only report the plan
+
+        Returns:
+            The plan: number of days and requests, requests per endpoint, and
+            the expected duration in seconds
+        """
+        plan = plan_backfill(sources, start, end)
+        requests_by_endpoint: dict[str, int] = {}
+        for source, _first, _last in plan:
+            requests_by_endpoint[source] = requests_by_endpoint.get(source, 0) + 1
+
+        summary = {
+            "dry_run": dry_run,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "days": end.toordinal() - start.toordinal() + 1,
+            "requests": len(plan),
+            "requests_by_endpoint": requests_by_endpoint,
+            "concurrency": concurrency,
+            "estimated_seconds": round(estimate_duration(len(plan), concurrency), 1),
+        }
+        if not dry_run:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(plan, concurrency),
+                f"{self.entry.title} backfill",
+            )
+        return summary
+
+    async def _async_run(self, plan: list[tuple[str, date, date]], concurrency: int) -> None:
+        """Fetch and import every planned range."""
+        semaphore = asyncio.Semaphore(concurrency)
+        import_lock = asyncio.Lock()
+        progress = {"completed": 0, "failed": 0, "documents": 0}
+        started = time.monotonic()
+        await self._import_index.async_load()
+
+        # Running sums only append cheaply in order, so every range waits for
+        # the previous range of its endpoint to be imported
+        imported = [asyncio.Event() for _request in plan]
+        previous: list[asyncio.Event | None] = []
+        last_of_source: dict[str, asyncio.Event] = {}
+        for (source, _first, _last), done in zip(plan, imported):
+            previous.append(last_of_source.get(source))
+            last_of_source[source] = done
+
+        async def async_fetch(index: int, source: str, first: date, last: date) -> None:
+            async with semaphore:
+                try:
+                    result = await self.api_client.async_get_range(source, first, last)
+                except Exception as err:
+                    _LOGGER.warning(
+                        "Backfill of %s data for %s to %s failed: %s", source, first, last, err
+                    )
+                    result = None
+
+            try:
+                if previous[index] is not None:
+                    await previous[index].wait()
+                if result is None:
+                    progress["failed"] += 1
+                elif documents := result.get("data"):
+                    # Imports run one range at a time
+                    async with import_lock:
+                        data = {source: {"data": documents}}
+                        await async_import_statistics(
+                            self.hass, data, self.entry, None, self._import_index
+                        )
+                        await self._history.async_add(data)
+                    progress["documents"] += len(documents)
+            finally:
+                imported[index].set()
+
+            progress["completed"] += 1
+            self._fire_progress("running", len(plan), progress, source, first, last)
+
+        await asyncio.gather(
+            *(async_fetch(index, *request) for index, request in enumerate(plan))
+        )
+        _LOGGER.info(
+            "Backfill finished: %d requests (%d failed), %d documents in %.0fs",
+            len(plan),
+            progress["failed"],
+            progress["documents"],
+            time.monotonic() - started,
+        )
+        self._fire_progress("done", len(plan), progress)
+
+    @callback
+    def _fire_progress(
+        self,
+        status: str,
+        total: int,
+        progress: dict[str, int],
+        source: str | None = None,
+        first: date | None = None,
+        last: date | None = None,
+    ) -> None:
+        """Fire a progress event."""
+        self.hass.bus.async_fire(
+            EVENT_BACKFILL_PROGRESS,
+            {
+                "entry_id": self.entry.entry_id,
+                "status": status,
+                "total": total,
+                **progress,
+                **(
+                    {"endpoint": source, "start": first.isoformat(), "end": last.isoformat()}
+                    if source
+                    else {}
+                ),
+            },
+        )
+
+    @callback
+    def _async_cancel(self) -> None:
+        """Cancel a running backfill when the entry unloads."""
+        if self.running:
+            self._task.cancel()
@@ -0,0 +1,140 @@
+"""Chunked statistics submission with recorder backpressure.
+
+A multi-year backfill produces thousands of statistics rows per sensor. Handing
+them to the recorder in a single call queues one huge job per sensor and delays
+every other recorder write. Rows are instead submitted in bounded chunks, and
+submission pauses whenever the recorder queue grows beyond a high-water mark
+until it drains back to a low-water mark.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DOMAIN,
+    RECORDER_DRAIN_POLL_INTERVAL,
+    RECORDER_DRAIN_TIMEOUT,
+    RECORDER_QUEUE_HIGH_WATER,
+    RECORDER_QUEUE_LOW_WATER,
+    STATISTICS_IMPORT_CHUNK_SIZE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_BACKPRESSURE = f"{DOMAIN}_recorder_backpressure"
+
+
+class ImportMetrics:
+    """Counters describing statistics submissions to the recorder."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.chunks = 0
+        self.rows = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.last_queue_depth = 0
+        self.max_queue_depth = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dictionary."""
+        return {
+            "chunks": self.chunks,
+            "rows": self.rows,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "last_queue_depth": self.last_queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+class RecorderBackpressure:
+    """Submit statistics to the recorder in chunks, waiting for it to drain."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        chunk_size: int = STATISTICS_IMPORT_CHUNK_SIZE,
+        high_water: int = RECORDER_QUEUE_HIGH_WATER,
+        low_water: int = RECORDER_QUEUE_LOW_WATER,
+    ) -> None:
+        """Initialize the submitter."""
+        self.hass = hass
+        self.chunk_size = chunk_size
+        self.high_water = high_water
+        self.low_water = low_water
+        self.metrics = ImportMetrics()
+
+    async def async_submit(
+        self,
+        import_func: Callable[[HomeAssistant, Any, list[Any]], None],
+        metadata: Any,
+        statistics: list[Any],
+    ) -> None:
+        """Submit statistics in chunks.
+
+        Args:
+            import_func: Recorder import function (async_import_statistics or
+                async_add_external_statistics)
+            metadata: Statistic metadata shared by all chunks
+            statistics: Statistic rows to import
+        """
+        for start in range(0, len(statistics), self.chunk_size):
+            await self.async_wait_for_capacity()
+            chunk = statistics[start:start + self.chunk_size]
+            import_func(self.hass, metadata, chunk)
+            self.metrics.chunks += 1
+            self.metrics.rows += len(chunk)
+
+    async def async_wait_for_capacity(self) -> None:
+        """Wait until the recorder queue is below the high-water mark.
+
+        Once the high-water mark is exceeded, waits until the queue drains to
+        the low-water mark (or the drain timeout elapses) before returning.
+        """
+        depth = self._queue_depth()
+        if depth <= self.high_water:
+            return
+
+        self.metrics.waits += 1
+        started = time.monotonic()
+        deadline = started + RECORDER_DRAIN_TIMEOUT
+        while depth > self.low_water:
+            if time.monotonic() >= deadline:
+                _LOGGER.warning(
+                    "Recorder queue still at %d after %ds, continuing statistics import",
+                    depth,
+                    RECORDER_DRAIN_TIMEOUT,
+                )
+                break
+            await asyncio.sleep(RECORDER_DRAIN_POLL_INTERVAL)
+            depth = self._queue_depth()
+        self.metrics.wait_seconds += time.monotonic() - started
+
+    def _queue_depth(self) -> int:
+        """Return the current recorder queue depth."""
+        try:
+            depth = get_instance(self.hass).backlog
+        except (KeyError, AttributeError):
+            # Recorder not running (e.g. during tests)
+            depth = 0
+        self.metrics.last_queue_depth = depth
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, depth)
+        return depth
+
+
+def get_backpressure(hass: HomeAssistant) -> RecorderBackpressure:
+    """Return the shared backpressure submitter.
+
+    The recorder queue is shared by all config entries, so a single submitter
+    (and set of metrics) is kept per Home Assistant instance.
+    """
+    if (backpressure := hass.data.get(DATA_BACKPRESSURE)) is None:
+        backpressure = hass.data[DATA_BACKPRESSURE] = RecorderBackpressure(hass)
+    return backpressure
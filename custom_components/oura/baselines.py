@@ -0,0 +1,236 @@
+"""Rolling baselines of daily metrics and the deviation of the current day.
+
+Baselines are kept in memory and updated in O(1) per value: each window holds
+the values of the days before the current day together with their running sum
+and sum of squares, and an exponentially weighted moving average (EWMA) is
+carried along. The historical load seeds the windows with every fetched day,
+and regular updates then add each new day, so the baseline and z-score
+sensors never query the recorder.
+
+The current day is kept out of its own baseline. Its value may still change
+while Oura syncs, and comparing it with a baseline that includes it would damp
+the z-score.
+"""
+from __future__ import annotations
+
+from collections import deque
+from datetime import date
+import logging
+import math
+from typing import Any, Final
+
+from .const import SENSOR_TYPES
+from .metrics import MAIN_SLEEP_TYPE, SOURCE_EXTRACTORS, daily_documents
+
+_LOGGER = logging.getLogger(__name__)
+
+# Metrics with baselines, window lengths in days, and the window z-scores use
+BASELINE_METRICS: Final = ("average_sleep_hrv", "lowest_heart_rate", "sleep_score")
+BASELINE_WINDOWS: Final = (7, 30)
+Z_SCORE_WINDOW: Final = 30
+
+# Days a window needs before it reports a baseline
+BASELINE_MIN_DAYS: Final = 3
+
+
+class RollingWindow:
+    """Mean, variance and EWMA of the days before the current day."""
+
+    __slots__ = ("days", "alpha", "_values", "_shift", "_sum", "_sum_sq", "_ewma", "_current")
+
+    def __init__(self, days: int, alpha: float | None = None) -> None:
+        """Initialize the window.
+
+        Args:
+            days: Number of days before the current day the window covers
+            alpha: EWMA smoothing factor; defaults to 2 / (days + 1)
+        """
+        self.days = days
+        self.alpha = alpha if alpha is not None else 2 / (days + 1)
+        self._values: deque[tuple[int, float]] = deque()
+        # Sums are taken relative to the first value to limit cancellation
+        self._shift = 0.0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._ewma: float | None = None
+        self._current: tuple[int, float] | None = None
+
+    def add(self, ordinal: int, value: float) -> None:
+        """Add or replace the value of a day.
+
+        A value for the current day replaces it. A later day moves the current
+        day into the window and drops days that fall out of it. Values for
+        days before the current day are ignored.
+        """
+        if self._current is not None:
+            current_ordinal, current_value = self._current
+            if ordinal < current_ordinal:
+                return
+            if ordinal > current_ordinal:
+                self._push(current_ordinal, current_value)
+        self._current = (ordinal, value)
+
+        while self._values and self._values[0][0] < ordinal - self.days:
+            _, old = self._values.popleft()
+            delta = old - self._shift
+            self._sum -= delta
+            self._sum_sq -= delta * delta
+        if not self._values:
+            self._sum = self._sum_sq = 0.0
+
+    def _push(self, ordinal: int, value: float) -> None:
+        """Append a completed day to the window."""
+        if not self._values:
+            self._shift = value
+        delta = value - self._shift
+        self._values.append((ordinal, value))
+        self._sum += delta
+        self._sum_sq += delta * delta
+        self._ewma = value if self._ewma is None else self._ewma + self.alpha * (value - self._ewma)
+
+    @property
+    def count(self) -> int:
+        """Return the number of days in the window."""
+        return len(self._values)
+
+    @property
+    def current(self) -> float | None:
+        """Return the value of the current day."""
+        return self._current[1] if self._current else None
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the window."""
+        if not self._values:
+            return None
+        return self._shift + self._sum / len(self._values)
+
+    @property
+    def variance(self) -> float | None:
+        """Return the sample variance of the window."""
+        count = len(self._values)
+        if count < 2:
+            return None
+        return max(0.0, (self._sum_sq - self._sum * self._sum / count) / (count - 1))
+
+    @property
+    def std(self) -> float | None:
+        """Return the sample standard deviation of the window."""
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
+
+    @property
+    def ewma(self) -> float | None:
+        """Return the EWMA of all days before the current day."""
+        return self._ewma
+
+    def z_score(self) -> float | None:
+        """Return how many standard deviations the current day is from the mean."""
+        std = self.std
+        if self._current is None or not std:
+            return None
+        return (self._current[1] - self.mean) / std
+
+
+def _baseline_sensor_types() -> dict[str, dict[str, Any]]:
+    """Derive the baseline and z-score sensors from their metrics' sensors."""
+    sensor_types = {}
+    for metric in BASELINE_METRICS:
+        sensor = SENSOR_TYPES[metric]
+        for days in BASELINE_WINDOWS:
+            sensor_types[f"{metric}_baseline_{days}d"] = {
+                **sensor,
+                "name": f"{sensor['name']} {days}-Day Baseline",
+                "icon": "mdi:chart-bell-curve-cumulative",
+                "device_class": None,
+                "state_class": "measurement",
+                "metric": metric,
+                "window": days,
+            }
+        sensor_types[f"{metric}_z_score"] = {
+            **sensor,
+            "name": f"{sensor['name']} Z-Score",
+            "icon": "mdi:sigma",
+            "unit": None,
+            "device_class": None,
+            "state_class": "measurement",
+            "metric": metric,
+            "window": Z_SCORE_WINDOW,
+        }
+    return sensor_types
+
+
+# Baseline sensors keyed like SENSOR_TYPES, with their metric and window
+BASELINE_SENSOR_TYPES: Final = _baseline_sensor_types()
+
+# Document extractor of every baseline metric
+_EXTRACTORS: Final = {
+    metric: (source, extract)
+    for source, extractors in SOURCE_EXTRACTORS.items()
+    for metric, extract in extractors
+    if metric in BASELINE_METRICS
+}
+
+
+class BaselineTracker:
+    """Rolling baselines of the baseline metrics for one config entry."""
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self._windows: dict[tuple[str, int], RollingWindow] = {
+            (metric, days): RollingWindow(days)
+            for metric in BASELINE_METRICS
+            for days in dict.fromkeys((*BASELINE_WINDOWS, Z_SCORE_WINDOW))
+        }
+
+    def add_documents(self, data: dict[str, Any]) -> None:
+        """Feed the daily values of API documents, in day order.
+
+        Args:
+            data: Data from Oura API keyed by source
+        """
+        for metric, (source, extract) in _EXTRACTORS.items():
+            windows = [window for (key, _), window in self._windows.items() if key == metric]
+            for document in daily_documents((data.get(source) or {}).get("data") or ()):
+                # Naps are not comparable to the night's sleep, even on days
+                # without one
+                if document.get("type", MAIN_SLEEP_TYPE) != MAIN_SLEEP_TYPE:
+                    continue
+                if (value := extract(document)) is None:
+                    continue
+                day = document["day"]
+                try:
+                    ordinal = date.fromisoformat(day[:10]).toordinal()
+                except ValueError:
+                    _LOGGER.debug("Ignoring %s value with invalid day %s", metric, day)
+                    continue
+                for window in windows:
+                    window.add(ordinal, value)
+
+    def values(self) -> dict[str, float]:
+        """Return the state of every baseline sensor that has one."""
+        values: dict[str, float] = {}
+        for sensor_key, sensor in BASELINE_SENSOR_TYPES.items():
+            window = self._windows[(sensor["metric"], sensor["window"])]
+            if window.count < BASELINE_MIN_DAYS:
+                continue
+            if sensor_key.endswith("_z_score"):
+                if (z_score := window.z_score()) is not None:
+                    values[sensor_key] = round(z_score, 2)
+            else:
+                values[sensor_key] = round(window.mean, 1)
+        return values
+
+    def attributes(self, sensor_key: str) -> dict[str, Any]:
+        """Return the state attributes of a baseline sensor."""
+        sensor = BASELINE_SENSOR_TYPES[sensor_key]
+        window = self._windows[(sensor["metric"], sensor["window"])]
+        std = window.std
+        ewma = window.ewma
+        return {
+            "window_days": window.days,
+            "days": window.count,
+            "mean": None if window.mean is None else round(window.mean, 1),
+            "standard_deviation": None if std is None else round(std, 2),
+            "ewma": None if ewma is None else round(ewma, 1),
+        }
@@ -14,12 +14,17 @@ from .const import (
     OAUTH2_SCOPES,
     CONF_UPDATE_INTERVAL,
     CONF_HISTORICAL_MONTHS,
+    CONF_STATISTICS_MODE,
+    CONF_TRACE_EXPORT,
     DEFAULT_UPDATE_INTERVAL,
     DEFAULT_HISTORICAL_MONTHS,
+    DEFAULT_STATISTICS_MODE,
+    DEFAULT_TRACE_EXPORT,
     MIN_UPDATE_INTERVAL,
     MAX_UPDATE_INTERVAL,
     MIN_HISTORICAL_MONTHS,
     MAX_HISTORICAL_MONTHS,
+    STATISTICS_MODES,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -100,6 +105,18 @@ class OuraOptionsFlowHandler(config_entries.OptionsFlow):
                         vol.Coerce(int),
                         vol.Range(min=MIN_HISTORICAL_MONTHS, max=MAX_HISTORICAL_MONTHS),
                     ),
+                    vol.Optional(
+                        CONF_STATISTICS_MODE,
+                        default=self.config_entry.options.get(
+                            CONF_STATISTICS_MODE, DEFAULT_STATISTICS_MODE
+                        ),
+                    ): vol.In(STATISTICS_MODES),
+                    vol.Optional(
+                        CONF_TRACE_EXPORT,
+                        default=self.config_entry.options.get(
+                            CONF_TRACE_EXPORT, DEFAULT_TRACE_EXPORT
+                        ),
+                    ): bool,
                 }
             ),
         )
@@ -10,6 +10,12 @@ ATTRIBUTION: Final = "Data provided by Oura Ring"
 # Configuration
 CONF_UPDATE_INTERVAL: Final = "update_interval"
 CONF_HISTORICAL_MONTHS: Final = "historical_months"
+CONF_STATISTICS_MODE: Final = "statistics_mode"
+CONF_TRACE_EXPORT: Final = "trace_export"
+# Entry data key overriding API_BASE_URL (e.g. for a local mock of the API)
+CONF_API_BASE_URL: Final = "api_base_url"
+# Entry data key recording API responses to, or replaying them from, a cassette
+CONF_CASSETTE: Final = "cassette"
 
 # OAuth2 Constants
 OAUTH2_AUTHORIZE: Final = "https://cloud.ouraring.com/oauth/authorize"
@@ -38,6 +44,57 @@ MAX_UPDATE_INTERVAL: Final = 60  # maximum 1 hour
 DEFAULT_HISTORICAL_MONTHS: Final = 3  # Fetch 3 months by default (90 days)
 MIN_HISTORICAL_MONTHS: Final = 1  # Minimum 1 month
 MAX_HISTORICAL_MONTHS: Final = 48  # Maximum 48 months (4 years)
+QUERY_MAX_DAYS: Final = MAX_HISTORICAL_MONTHS * 30  # longest date range the query service returns
+
+# Statistics mode: import daily history under the sensor entities, or as
+# external statistics (oura:<metric>) independent of entity states
+STATISTICS_MODE_ENTITY: Final = "entity"
+STATISTICS_MODE_EXTERNAL: Final = "external"
+STATISTICS_MODES: Final = [STATISTICS_MODE_ENTITY, STATISTICS_MODE_EXTERNAL]
+DEFAULT_STATISTICS_MODE: Final = STATISTICS_MODE_ENTITY
+
+# Maximum number of days one API request may span, per data source
+# (sources without an entry accept any range)
+API_MAX_RANGE_DAYS: Final = {"heartrate": 30}
+
+# Oura API rate limit, and the typical duration of one request used for estimates
+API_RATE_LIMIT_REQUESTS: Final = 5000
+API_RATE_LIMIT_PERIOD: Final = 300  # seconds
+API_REQUEST_ESTIMATE_SECONDS: Final = 1.5
+
+# On-demand backfill
+DEFAULT_BACKFILL_CONCURRENCY: Final = 2
+MAX_BACKFILL_CONCURRENCY: Final = 8
+BACKFILL_MAX_DAYS: Final = 366  # longest date range one backfill call imports
+EVENT_BACKFILL_PROGRESS: Final = f"{DOMAIN}_backfill_progress"
+
+# Gap repair: re-fetch days missing from the imported statistics
+GAP_SCAN_INTERVAL: Final = timedelta(hours=24)
+GAP_SCAN_SETTLE_DAYS: Final = 2  # recent days Oura may still be syncing
+
+# Statistics import backpressure
+STATISTICS_IMPORT_CHUNK_SIZE: Final = 500  # statistics rows per recorder job
+RECORDER_QUEUE_HIGH_WATER: Final = 100  # pause submitting above this backlog
+RECORDER_QUEUE_LOW_WATER: Final = 20  # resume once the backlog drains to this
+RECORDER_DRAIN_POLL_INTERVAL: Final = 0.2  # seconds between backlog checks
+RECORDER_DRAIN_TIMEOUT: Final = 60  # maximum seconds to wait for one drain
+
+# Refresh cycle tracing
+DEFAULT_TRACE_EXPORT: Final = False
+TRACE_HISTORY: Final = 20  # recent and slowest cycles kept for diagnostics
+TRACE_EXPORT_MAX_BYTES: Final = 10 * 1024 * 1024  # rotate the trace file at this size
+
+# API health ring buffers
+HEALTH_REQUEST_BUFFER_SIZE: Final = 500  # requests kept per endpoint, ~40 h at the default interval
+HEALTH_CYCLE_BUFFER_SIZE: Final = 288  # refresh cycles kept, one day at the default interval
+FRESHNESS_BUFFER_SIZE: Final = 100  # new-document samples kept per endpoint
+
+# On-demand profiling
+PROFILE_TARGET_REFRESH: Final = "refresh"
+PROFILE_TARGET_BACKFILL: Final = "backfill"
+PROFILE_MAX_BACKFILL_DAYS: Final = 31  # longest backfill window the profile service runs
+PROFILE_TOP_ENTRIES: Final = 15  # functions and allocation sites in the service response
+PROFILE_ALLOCATION_SITES: Final = 100  # allocation sites written to the allocations file
 
 # Sensor types
 SENSOR_TYPES: Final = {
@@ -55,6 +112,9 @@ SENSOR_TYPES: Final = {
     "deep_sleep_percentage": {"name": "Deep Sleep Percentage", "icon": "mdi:percent", "unit": "%", "device_class": None, "state_class": "measurement", "entity_category": EntityCategory.DIAGNOSTIC},
     "rem_sleep_percentage": {"name": "REM Sleep Percentage", "icon": "mdi:percent", "unit": "%", "device_class": None, "state_class": "measurement", "entity_category": EntityCategory.DIAGNOSTIC},
     "time_in_bed": {"name": "Time in Bed", "icon": "mdi:bed-clock", "unit": "h", "device_class": "duration", "state_class": "total", "entity_category": None},
+    "sleep_stage_transitions": {"name": "Sleep Stage Transitions", "icon": "mdi:chart-timeline-variant", "unit": None, "device_class": None, "state_class": "measurement", "entity_category": None},
+    "wake_bouts": {"name": "Wake Bouts", "icon": "mdi:eye-outline", "unit": None, "device_class": None, "state_class": "measurement", "entity_category": None},
+    "restless_periods": {"name": "Restless Periods", "icon": "mdi:bed-empty", "unit": None, "device_class": None, "state_class": "measurement", "entity_category": None},
     "low_battery_alert": {"name": "Low Battery Alert", "icon": "mdi:battery-alert", "unit": None, "device_class": None, "state_class": None, "entity_category": EntityCategory.DIAGNOSTIC},
     
     # Readiness sensors
@@ -79,8 +139,9 @@ SENSOR_TYPES: Final = {
     "min_heart_rate": {"name": "Minimum Heart Rate", "icon": "mdi:heart-minus", "unit": "bpm", "device_class": None, "state_class": "measurement", "entity_category": EntityCategory.DIAGNOSTIC},
     "max_heart_rate": {"name": "Maximum Heart Rate", "icon": "mdi:heart-plus", "unit": "bpm", "device_class": None, "state_class": "measurement", "entity_category": EntityCategory.DIAGNOSTIC},
     
-    # HRV sensors (from detailed sleep endpoint)
+    # HRV and sleeping heart rate sensors (from detailed sleep endpoint)
     "average_sleep_hrv": {"name": "Average Sleep HRV", "icon": "mdi:heart-pulse", "unit": "ms", "device_class": None, "state_class": "measurement", "entity_category": None},
+    "lowest_heart_rate": {"name": "Lowest Sleeping Heart Rate", "icon": "mdi:heart-minus", "unit": "bpm", "device_class": None, "state_class": "measurement", "entity_category": None},
     
     # Stress sensors
     "stress_high_duration": {"name": "Stress High Duration", "icon": "mdi:account-question", "unit": "min", "device_class": "duration", "state_class": "total", "entity_category": None},
@@ -0,0 +1,45 @@
+"""Diagnostics support for Oura Ring."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {"access_token", "refresh_token", "client_id", "client_secret", "email"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    diagnostics: dict[str, Any] = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+    }
+
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if coordinator is None:
+        return diagnostics
+
+    diagnostics["coordinator"] = {
+        "last_update_success": coordinator.last_update_success,
+        "update_interval_seconds": coordinator.update_interval.total_seconds(),
+        "historical_data_loaded": coordinator.historical_data_loaded,
+        "sensors_with_values": len(coordinator.data or {}),
+    }
+    diagnostics["tracing"] = coordinator.tracer.as_dict()
+    diagnostics["api_health"] = coordinator.api_client.health.as_dict()
+    diagnostics["freshness"] = coordinator.freshness.as_dict()
+
+    # Shared by all entries; only created once statistics were imported
+    from .backpressure import DATA_BACKPRESSURE
+
+    backpressure = hass.data.get(DATA_BACKPRESSURE)
+    diagnostics["statistics_import"] = backpressure.metrics.as_dict() if backpressure else None
+    return diagnostics
@@ -0,0 +1,202 @@
+"""Freshness lag of new Oura documents, from their time to the entities.
+
+For every endpoint the newest document time is tracked: ``bedtime_end`` for
+sleep periods, ``timestamp`` for daily scores and heart rate samples, and the
+start of the local day for documents that only have a ``day``. When a refresh
+returns a document newer than any seen before, three intervals are recorded:
+
+- lag: from the document time to the refresh that first returned it, which
+  covers the ring syncing, Oura processing the data and the wait for our poll
+- poll wait: from the previous successful fetch of the endpoint to this one,
+  an upper bound of how much of the lag is the polling interval
+- write lag: from the fetch to the entities being written
+
+Samples are kept in fixed-size ring buffers, and their distribution is shown
+in the config entry's diagnostics. Documents the first fetch returns, such as
+those of the historical load, only set the starting point.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import FRESHNESS_BUFFER_SIZE
+from .health import RingBuffer, percentile
+
+_LOGGER = logging.getLogger(__name__)
+
+# Document fields holding its time, in order of preference
+_TIME_FIELDS = ("bedtime_end", "timestamp")
+
+
+def document_time(document: dict[str, Any]) -> datetime | None:
+    """Return the time a document describes, timezone-aware.
+
+    Returns:
+        The time, or None if the document has no parsable time or day
+    """
+    for field in (*_TIME_FIELDS, "day"):
+        if isinstance(value := document.get(field), str):
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                continue
+            # Naive times and bare days are in Home Assistant's time zone
+            if field == "day":
+                return dt_util.start_of_local_day(parsed.date())
+            return dt_util.as_local(parsed)
+    return None
+
+
+def _distribution(values: list[float]) -> dict[str, float | None]:
+    """Return the percentiles of a list of seconds."""
+    return {
+        "p50": _round(percentile(values, 50)),
+        "p95": _round(percentile(values, 95)),
+        "max": _round(max(values, default=None)),
+    }
+
+
+def _round(value: float | None) -> float | None:
+    """Round seconds for display."""
+    return None if value is None else round(value, 1)
+
+
+def _isoformat(timestamp: float | None) -> str | None:
+    """Return a POSIX timestamp as an ISO 8601 string."""
+    if timestamp is None:
+        return None
+    return dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).isoformat()
+
+
+class EndpointFreshness:
+    """Freshness samples of one endpoint."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize the buffers."""
+        self.newest: datetime | None = None
+        self.last_fetch: float | None = None
+        self.lag = RingBuffer(size)
+        self.poll_wait = RingBuffer(size)
+        self.write_lag = RingBuffer(size)
+        # The newest sample: document time, first seen and written, as POSIX times
+        self.last_sample: dict[str, float | None] | None = None
+        self.pending = False
+
+    def observe(self, documents: list[Any], seen: float) -> bool:
+        """Record a successful fetch of the endpoint.
+
+        Args:
+            documents: Documents the fetch returned
+            seen: When the fetch returned, POSIX time
+
+        Returns:
+            Whether the fetch returned a new document
+        """
+        times = [
+            parsed for document in documents
+            if isinstance(document, dict) and (parsed := document_time(document)) is not None
+        ]
+        newest = max(times, default=None)
+        previous_fetch, self.last_fetch = self.last_fetch, seen
+        if newest is None or (self.newest is not None and newest <= self.newest):
+            return False
+
+        first = self.newest is None
+        self.newest = newest
+        if first or previous_fetch is None:
+            return False
+
+        document_timestamp = newest.timestamp()
+        self.lag.append(max(seen - document_timestamp, 0.0))
+        self.poll_wait.append(seen - previous_fetch)
+        self.last_sample = {"document": document_timestamp, "seen": seen, "written": None}
+        self.pending = True
+        return True
+
+    def written(self, now: float) -> None:
+        """Record that the entities were written after the newest sample."""
+        if not self.pending:
+            return
+        self.pending = False
+        self.write_lag.append(now - self.last_sample["seen"])
+        self.last_sample["written"] = now
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the distribution of the samples."""
+        sample = self.last_sample or {}
+        lags = self.lag.values()
+        waits = self.poll_wait.values()
+        return {
+            "samples": len(lags),
+            "newest_document": self.newest.isoformat() if self.newest else None,
+            "lag_s": _distribution(lags),
+            "poll_wait_s": _distribution(waits),
+            # Lag at the previous fetch, which didn't return the document yet:
+            # a lower bound of the delay before Oura served it
+            "lag_before_poll_s": _distribution(
+                [max(lag - wait, 0.0) for lag, wait in zip(lags, waits)]
+            ),
+            "write_lag_s": _distribution(self.write_lag.values()),
+            "last_sample": {
+                "document": _isoformat(sample.get("document")),
+                "seen": _isoformat(sample.get("seen")),
+                "written": _isoformat(sample.get("written")),
+            } if sample else None,
+        }
+
+
+class FreshnessTracker:
+    """Freshness lag of every endpoint of one config entry."""
+
+    def __init__(self, size: int = FRESHNESS_BUFFER_SIZE) -> None:
+        """Initialize the tracker.
+
+        Args:
+            size: Samples kept per endpoint
+        """
+        self._size = size
+        self.endpoints: dict[str, EndpointFreshness] = {}
+
+    def observe(self, data: dict[str, Any], seen: float) -> None:
+        """Record the documents of a refresh.
+
+        Endpoints that failed, whose result holds no document list, are
+        skipped, so their next successful fetch measures the full wait.
+
+        Args:
+            data: Data by endpoint, as returned by async_get_data
+            seen: When the data was fetched, POSIX time
+        """
+        for source, result in data.items():
+            if not isinstance(result, dict) or not isinstance(result.get("data"), list):
+                continue
+            if (endpoint := self.endpoints.get(source)) is None:
+                endpoint = self.endpoints[source] = EndpointFreshness(self._size)
+            if endpoint.observe(result["data"], seen):
+                _LOGGER.debug(
+                    "New %s data from %s, %.0f s old",
+                    source,
+                    endpoint.newest.isoformat(),
+                    endpoint.lag.last(),
+                )
+
+    def written(self, now: float) -> None:
+        """Record that the entities were written.
+
+        Args:
+            now: POSIX time
+        """
+        for endpoint in self.endpoints.values():
+            endpoint.written(now)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the freshness of every endpoint for diagnostics."""
+        return {
+            source: endpoint.as_dict()
+            for source, endpoint in sorted(self.endpoints.items())
+            if endpoint.newest is not None
+        }
@@ -0,0 +1,155 @@
+"""Repair days missing from the imported daily statistics.
+
+A backfill that fails partway through (for example one heart rate window of a
+multi-month load) leaves days that are never imported, because regular
+updates only fetch the current day. The gap scanner reads the import index for
+every data source, finds the days none of the source's statistics has
+imported, and merges them into as few API requests as the endpoint's range
+limit allows. Only those ranges are fetched and imported; days that come back
+without data are remembered so they are not fetched again.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .api import OuraApiClient
+from .const import (
+    API_MAX_RANGE_DAYS,
+    CONF_HISTORICAL_MONTHS,
+    DEFAULT_HISTORICAL_MONTHS,
+    GAP_SCAN_SETTLE_DAYS,
+)
+from .history_store import HistoryStore
+from .import_index import ImportIndex, merge_gaps
+from .metrics import DAILY_METRICS
+from .statistics import async_import_statistics, resolve_statistic_id
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GapScanner:
+    """Find and re-import days missing from one config entry's statistics."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: OuraApiClient,
+        entry: ConfigEntry,
+        import_index: ImportIndex,
+        history: HistoryStore | None = None,
+    ) -> None:
+        """Initialize the scanner."""
+        self.hass = hass
+        self.api_client = api_client
+        self.entry = entry
+        self._import_index = import_index
+        self._history = history
+        self._lock = asyncio.Lock()
+
+    async def async_scheduled_scan(self, _now: datetime | None = None) -> None:
+        """Run a scan from the schedule, logging instead of raising errors."""
+        try:
+            await self.async_scan()
+        except Exception as err:
+            _LOGGER.warning("Gap repair failed, will retry on the next scan: %s", err)
+
+    async def async_scan(self, days: int | None = None) -> dict[str, Any]:
+        """Fetch and import the days missing from the statistics.
+
+        Args:
+            days: Number of days to scan back from the last settled day;
+                defaults to the configured historical range
+
+        Returns:
+            Summary with the number of requested ranges, repaired and empty
+            days, and failed ranges
+        """
+        if days is None:
+            months = self.entry.options.get(CONF_HISTORICAL_MONTHS, DEFAULT_HISTORICAL_MONTHS)
+            days = months * 30
+
+        last = date.today().toordinal() - GAP_SCAN_SETTLE_DAYS
+        first = last - days + 1
+        summary = {"ranges": 0, "repaired_days": 0, "empty_days": 0, "failed_ranges": 0}
+
+        async with self._lock:
+            await self._import_index.async_load()
+            for source, sensor_keys in DAILY_METRICS.items():
+                statistic_ids = [
+                    resolve_statistic_id(self.hass, self.entry, sensor_key)
+                    for sensor_key in sensor_keys
+                ]
+                missing = self._import_index.find_gaps(source, statistic_ids, first, last)
+                if missing:
+                    await self._async_repair_source(source, statistic_ids, missing, summary)
+
+        if summary["ranges"]:
+            _LOGGER.info(
+                "Gap repair fetched %d ranges: %d days repaired, %d without data, %d ranges failed",
+                summary["ranges"],
+                summary["repaired_days"],
+                summary["empty_days"],
+                summary["failed_ranges"],
+            )
+        return summary
+
+    async def _async_repair_source(
+        self,
+        source: str,
+        statistic_ids: list[str],
+        missing: list[int],
+        summary: dict[str, int],
+    ) -> None:
+        """Fetch the ranges covering a source's missing days and import them."""
+        documents: list[dict[str, Any]] = []
+        fetched: list[int] = []
+
+        for range_first, range_last in merge_gaps(missing, API_MAX_RANGE_DAYS.get(source)):
+            summary["ranges"] += 1
+            try:
+                result = await self.api_client.async_get_range(
+                    source, date.fromordinal(range_first), date.fromordinal(range_last)
+                )
+            except Exception as err:
+                summary["failed_ranges"] += 1
+                _LOGGER.warning(
+                    "Failed to fetch %s data for %s to %s: %s",
+                    source,
+                    date.fromordinal(range_first),
+                    date.fromordinal(range_last),
+                    err,
+                )
+                continue
+            documents.extend(result.get("data") or [])
+            fetched.extend(day for day in missing if range_first <= day <= range_last)
+
+        if not fetched:
+            return
+
+        if documents:
+            await async_import_statistics(
+                self.hass, {source: {"data": documents}}, self.entry, None, self._import_index
+            )
+            if self._history is not None:
+                await self._history.async_add({source: {"data": documents}})
+
+        # Days still missing after a successful fetch have no data
+        still_missing = set(
+            self._import_index.find_gaps(source, statistic_ids, fetched[0], fetched[-1])
+        )
+        empty = [day for day in fetched if day in still_missing]
+        self._import_index.mark_empty(source, empty)
+        summary["repaired_days"] += len(fetched) - len(empty)
+        summary["empty_days"] += len(empty)
+        _LOGGER.debug(
+            "Repaired %d missing %s days (%d without data)",
+            len(fetched) - len(empty),
+            source,
+            len(empty),
+        )
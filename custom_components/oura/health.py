@@ -0,0 +1,287 @@
+"""Rolling health metrics of the API requests and refresh cycles.
+
+Every API request is recorded per endpoint with its latency, response size,
+number of documents and error class, and every refresh with its duration.
+Samples are kept in fixed-size ring buffers, so memory stays constant however
+long Home Assistant runs, and histograms and percentiles are computed from
+the buffers only when diagnostics or the health sensors ask for them.
+"""
+from __future__ import annotations
+
+import asyncio
+from array import array
+from bisect import bisect_left
+from collections import Counter
+import math
+import time
+from typing import Any, Callable, Final
+
+from aiohttp import ClientConnectionError, ClientResponseError
+from homeassistant.helpers.entity import EntityCategory
+
+from .const import HEALTH_CYCLE_BUFFER_SIZE, HEALTH_REQUEST_BUFFER_SIZE
+
+# Upper bounds of the histogram buckets; a last bucket holds larger values
+LATENCY_BUCKETS_MS: Final = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SIZE_BUCKETS_BYTES: Final = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+DOCUMENT_BUCKETS: Final = (0, 1, 10, 100, 1000, 10000)
+
+HOUR: Final = 3600
+
+# Health sensors keyed like SENSOR_TYPES
+HEALTH_SENSOR_TYPES: Final = {
+    "last_refresh_duration": {
+        "name": "Last Refresh Duration",
+        "icon": "mdi:timer-outline",
+        "unit": "s",
+        "device_class": "duration",
+        "state_class": "measurement",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+    "api_requests_per_hour": {
+        "name": "API Requests per Hour",
+        "icon": "mdi:api",
+        "unit": "requests/h",
+        "device_class": None,
+        "state_class": "measurement",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+    "api_errors_per_hour": {
+        "name": "API Errors per Hour",
+        "icon": "mdi:api-off",
+        "unit": "errors/h",
+        "device_class": None,
+        "state_class": "measurement",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+    "api_latency_p95": {
+        "name": "API Latency p95",
+        "icon": "mdi:timer-sand",
+        "unit": "ms",
+        "device_class": "duration",
+        "state_class": "measurement",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+}
+
+
+class RingBuffer:
+    """Fixed number of the most recent float samples."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize the buffer."""
+        self._values = array("d", bytes(8 * size))
+        self._size = size
+        self._next = 0
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        """Add a sample, replacing the oldest one when full."""
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self._size
+        self.count = min(self.count + 1, self._size)
+
+    def values(self) -> list[float]:
+        """Return the samples from oldest to newest."""
+        if self.count < self._size:
+            return self._values[:self.count].tolist()
+        return (self._values[self._next:] + self._values[:self._next]).tolist()
+
+    def last(self) -> float | None:
+        """Return the newest sample."""
+        return self._values[self._next - 1] if self.count else None
+
+
+def histogram(values: list[float], bounds: tuple[float, ...]) -> dict[str, int]:
+    """Return the number of values per bucket, labelled by upper bound."""
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        counts[bisect_left(bounds, value)] += 1
+    labels = [f"<={bound:g}" for bound in bounds] + [f">{bounds[-1]:g}"]
+    return dict(zip(labels, counts))
+
+
+def percentile(values: list[float], percent: float) -> float | None:
+    """Return a percentile by the nearest-rank method."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def error_class(err: BaseException) -> str:
+    """Return a short, stable name for the class of a request error."""
+    if isinstance(err, ClientResponseError):
+        return f"http_{err.status}"
+    if isinstance(err, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(err, ClientConnectionError):
+        return "connection"
+    return type(err).__name__
+
+
+class EndpointHealth:
+    """Ring buffers of the requests to one endpoint."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize the buffers."""
+        self.timestamps = RingBuffer(size)
+        self.latencies_ms = RingBuffer(size)
+        self.sizes = RingBuffer(size)
+        self.documents = RingBuffer(size)
+        # Error class per sample, None for a success, aligned with the buffers
+        self._errors: list[str | None] = [None] * size
+        self._size = size
+        self._next = 0
+        self.total = 0
+
+    def record(
+        self, timestamp: float, latency_ms: float, size: int, documents: int, error: str | None
+    ) -> None:
+        """Add a request."""
+        self.timestamps.append(timestamp)
+        self.latencies_ms.append(latency_ms)
+        self.sizes.append(size)
+        self.documents.append(documents)
+        self._errors[self._next] = error
+        self._next = (self._next + 1) % self._size
+        self.total += 1
+
+    def errors(self) -> list[str | None]:
+        """Return the error classes from oldest to newest."""
+        count = self.timestamps.count
+        if count < self._size:
+            return self._errors[:count]
+        return self._errors[self._next:] + self._errors[:self._next]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return histograms of the buffered requests."""
+        latencies = self.latencies_ms.values()
+        errors = self.errors()
+        successes = [index for index, error in enumerate(errors) if error is None]
+        sizes = self.sizes.values()
+        documents = self.documents.values()
+        return {
+            "requests": self.total,
+            "buffered": len(latencies),
+            "errors": dict(Counter(error for error in errors if error is not None)),
+            "latency_ms": {
+                "p50": _round(percentile(latencies, 50)),
+                "p95": _round(percentile(latencies, 95)),
+                "max": _round(max(latencies, default=None)),
+                "histogram": histogram(latencies, LATENCY_BUCKETS_MS),
+            },
+            "response_bytes": {
+                "p50": _round(percentile([sizes[index] for index in successes], 50)),
+                "max": _round(max((sizes[index] for index in successes), default=None)),
+                "histogram": histogram([sizes[index] for index in successes], SIZE_BUCKETS_BYTES),
+            },
+            "documents": {
+                "max": _round(max((documents[index] for index in successes), default=None)),
+                "histogram": histogram([documents[index] for index in successes], DOCUMENT_BUCKETS),
+            },
+        }
+
+
+def _round(value: float | None) -> float | None:
+    """Round a metric for display."""
+    return None if value is None else round(value, 1)
+
+
+class ApiHealth:
+    """Health metrics of one config entry's API client."""
+
+    def __init__(
+        self,
+        size: int = HEALTH_REQUEST_BUFFER_SIZE,
+        cycle_size: int = HEALTH_CYCLE_BUFFER_SIZE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the metrics.
+
+        Args:
+            size: Requests kept per endpoint
+            cycle_size: Refresh cycles kept
+            clock: Wall clock in seconds
+        """
+        self._size = size
+        self._clock = clock
+        self.endpoints: dict[str, EndpointHealth] = {}
+        self.cycle_timestamps = RingBuffer(cycle_size)
+        self.cycle_durations = RingBuffer(cycle_size)
+        self.failed_cycles = 0
+
+    def record_request(
+        self,
+        endpoint: str,
+        latency: float,
+        size: int = 0,
+        documents: int = 0,
+        error: BaseException | None = None,
+    ) -> None:
+        """Record an API request.
+
+        Args:
+            endpoint: Endpoint name, e.g. "daily_sleep"
+            latency: Duration in seconds
+            size: Response body size in bytes
+            documents: Number of documents in the response
+            error: Exception the request failed with
+        """
+        if (health := self.endpoints.get(endpoint)) is None:
+            health = self.endpoints[endpoint] = EndpointHealth(self._size)
+        health.record(
+            self._clock(),
+            latency * 1000,
+            size,
+            documents,
+            None if error is None else error_class(error),
+        )
+
+    def record_cycle(self, duration: float, success: bool = True) -> None:
+        """Record a refresh cycle and its duration in seconds."""
+        self.cycle_timestamps.append(self._clock())
+        self.cycle_durations.append(duration)
+        self.failed_cycles += not success
+
+    def _last_hour(self) -> tuple[list[float], int]:
+        """Return the latencies and the number of errors of the last hour."""
+        since = self._clock() - HOUR
+        latencies: list[float] = []
+        errors = 0
+        for health in self.endpoints.values():
+            timestamps = health.timestamps.values()
+            first = bisect_left(timestamps, since)
+            latencies.extend(health.latencies_ms.values()[first:])
+            errors += sum(error is not None for error in health.errors()[first:])
+        return latencies, errors
+
+    def values(self) -> dict[str, float | None]:
+        """Return the state of every health sensor."""
+        latencies, errors = self._last_hour()
+        duration = self.cycle_durations.last()
+        return {
+            "last_refresh_duration": None if duration is None else round(duration, 2),
+            "api_requests_per_hour": len(latencies),
+            "api_errors_per_hour": errors,
+            "api_latency_p95": _round(percentile(latencies, 95)),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        durations = self.cycle_durations.values()
+        return {
+            "sensors": self.values(),
+            "cycles": {
+                "buffered": len(durations),
+                "failed": self.failed_cycles,
+                "duration_s": {
+                    "p50": _round(percentile(durations, 50)),
+                    "p95": _round(percentile(durations, 95)),
+                    "max": _round(max(durations, default=None)),
+                },
+            },
+            "endpoints": {
+                endpoint: health.as_dict() for endpoint, health in sorted(self.endpoints.items())
+            },
+        }
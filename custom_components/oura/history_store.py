@@ -0,0 +1,316 @@
+"""Local columnar store of daily metric history.
+
+The raw API documents are discarded once they are processed, so any later
+analysis would have to call the API or query the recorder again. The history
+store keeps the daily value of every catalog metric on disk instead, one
+segment file per data source and month::
+
+    .storage/oura_history/<entry_id>/<source>/<YYYY-MM>.seg
+
+A segment is columnar. A header and the JSON list of its columns are followed
+by the sorted day index (int32 date ordinals) and then one float64 column per
+metric, with NaN for days without a value. All values are little-endian and
+every block is 8-byte aligned. Range reads memory-map the segments of the
+requested months and bisect the day index, so only the requested rows of the
+requested columns are decoded.
+
+Segments are written by the historical load and by every poll. Rows are merged
+into the month's segment, and the file is replaced atomically only when its
+content changed.
+"""
+from __future__ import annotations
+
+import asyncio
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from datetime import date
+import json
+import logging
+import math
+import mmap
+import os
+from pathlib import Path
+import shutil
+import struct
+import sys
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import DOMAIN
+from .metrics import DAILY_METRICS, extract_daily_values
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_DIR = f"{DOMAIN}_history"
+SEGMENT_SUFFIX = ".seg"
+
+SEGMENT_MAGIC = b"OURH"
+SEGMENT_VERSION = 1
+# magic, version, number of days, length of the column names
+_HEADER = struct.Struct("<4sHHI")
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _align(size: int) -> int:
+    """Round a size up to the next multiple of 8 bytes."""
+    return (size + 7) & ~7
+
+
+def _to_bytes(values: array) -> bytes:
+    """Return the little-endian bytes of an array."""
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_segment(days: list[int], columns: dict[str, list[float]]) -> bytes:
+    """Encode rows into a segment.
+
+    Args:
+        days: Sorted date ordinals
+        columns: Values per metric, aligned with days (NaN for no value)
+
+    Returns:
+        Segment file content
+    """
+    names = json.dumps(list(columns)).encode()
+    content = bytearray(_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, len(days), len(names)))
+    content += names
+    content += bytes(_align(len(content)) - len(content))
+    content += _to_bytes(array("i", days))
+    content += bytes(_align(len(content)) - len(content))
+    for values in columns.values():
+        content += _to_bytes(array("d", values))
+    return bytes(content)
+
+
+class Segment:
+    """Read-only view of an encoded segment."""
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        """Parse the segment header.
+
+        Raises:
+            ValueError: The buffer is not a segment of a supported version
+        """
+        magic, version, rows, names_length = _HEADER.unpack_from(buffer)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+            raise ValueError("Unsupported history segment")
+
+        names_end = _HEADER.size + names_length
+        self.names: list[str] = json.loads(bytes(buffer[_HEADER.size:names_end]))
+        self.rows = rows
+        self._view = memoryview(buffer)
+        days_start = _align(names_end)
+        self._columns_start = _align(days_start + 4 * rows)
+        self.days = self._decode(days_start, rows, "i")
+
+    def _decode(self, start: int, count: int, typecode: str) -> memoryview | array:
+        """Return ``count`` values at ``start`` without copying where possible."""
+        size = 4 if typecode == "i" else 8
+        view = self._view[start:start + size * count]
+        if _LITTLE_ENDIAN:
+            return view.cast(typecode)
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+        return values
+
+    def release(self) -> None:
+        """Release the views into the underlying buffer."""
+        if isinstance(self.days, memoryview):
+            self.days.release()
+        self._view.release()
+
+    def find(self, first: int, last: int) -> tuple[int, int]:
+        """Return the row slice of the days in [first, last]."""
+        return bisect_left(self.days, first), bisect_right(self.days, last)
+
+    def column(self, name: str, start: int, stop: int) -> list[float | None]:
+        """Return the values of rows [start, stop) of a column."""
+        if name not in self.names:
+            return [None] * (stop - start)
+        offset = self._columns_start + 8 * (self.names.index(name) * self.rows + start)
+        values = self._decode(offset, stop - start, "d")
+        result = [None if math.isnan(value) else value for value in values]
+        if isinstance(values, memoryview):
+            values.release()
+        return result
+
+    def to_rows(self) -> dict[int, dict[str, float]]:
+        """Decode every row, without the missing values."""
+        rows: dict[int, dict[str, float]] = {day: {} for day in self.days}
+        for name in self.names:
+            for day, value in zip(self.days, self.column(name, 0, self.rows)):
+                if value is not None:
+                    rows[day][name] = value
+        return rows
+
+
+def _month_key(ordinal: int) -> str:
+    """Return the segment name of the month containing a day."""
+    day = date.fromordinal(ordinal)
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+class HistoryStore:
+    """Columnar daily history of one config entry."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.path = Path(hass.config.path(STORAGE_DIR, HISTORY_DIR, entry.entry_id))
+        # data source -> sorted month keys of its segments
+        self._months: dict[str, list[str]] = {}
+        self._lock = asyncio.Lock()
+
+    async def async_add(self, data: dict[str, Any]) -> int:
+        """Merge the daily values of API data into the store.
+
+        Args:
+            data: Data from Oura API keyed by source
+
+        Returns:
+            Number of segments written
+        """
+        rows_by_source = {}
+        for source in DAILY_METRICS:
+            documents = (data.get(source) or {}).get("data")
+            if documents and (daily := extract_daily_values(source, documents)):
+                rows_by_source[source] = daily
+
+        if not rows_by_source:
+            return 0
+        async with self._lock:
+            return await self.hass.async_add_executor_job(self._write, rows_by_source)
+
+    async def async_read(
+        self,
+        source: str,
+        start: date,
+        end: date,
+        keys: Iterable[str] | None = None,
+    ) -> dict[str, list[Any]]:
+        """Read a range of days of a data source.
+
+        Args:
+            source: Data source
+            start: First day
+            end: Last day
+            keys: Metrics to read; defaults to all metrics of the source
+
+        Returns:
+            Columns keyed by metric plus "day" with the ISO days that have
+            values, None marking missing values
+        """
+        return await self.hass.async_add_executor_job(
+            self.read, source, start.toordinal(), end.toordinal(), keys
+        )
+
+    async def async_remove(self) -> None:
+        """Remove the stored history."""
+        async with self._lock:
+            await self.hass.async_add_executor_job(shutil.rmtree, self.path, True)
+            self._months.clear()
+
+    def months(self, source: str) -> list[str]:
+        """Return the sorted month keys of a source's segments."""
+        if (months := self._months.get(source)) is None:
+            directory = self.path / source
+            months = self._months[source] = sorted(
+                file.stem for file in directory.glob(f"*{SEGMENT_SUFFIX}")
+            ) if directory.is_dir() else []
+        return months
+
+    def read(
+        self,
+        source: str,
+        first: int,
+        last: int,
+        keys: Iterable[str] | None = None,
+    ) -> dict[str, list[Any]]:
+        """Read a range of days from the segments (blocking)."""
+        keys = list(keys if keys is not None else DAILY_METRICS.get(source, ()))
+        result: dict[str, list[Any]] = {"day": [], **{key: [] for key in keys}}
+
+        months = self.months(source)
+        for month in months[
+            bisect_left(months, _month_key(first)):bisect_right(months, _month_key(last))
+        ]:
+            with open(self.path / source / f"{month}{SEGMENT_SUFFIX}", "rb") as file, \
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                try:
+                    segment = Segment(buffer)
+                except (ValueError, struct.error):
+                    _LOGGER.warning("Ignoring unreadable history segment %s/%s", source, month)
+                    continue
+                try:
+                    start, stop = segment.find(first, last)
+                    result["day"].extend(
+                        date.fromordinal(segment.days[row]).isoformat()
+                        for row in range(start, stop)
+                    )
+                    for key in keys:
+                        result[key].extend(segment.column(key, start, stop))
+                finally:
+                    # The map can only be closed once no views into it remain
+                    segment.release()
+
+        return result
+
+    def _write(self, rows_by_source: dict[str, dict[str, dict[str, Any]]]) -> int:
+        """Merge rows into the segments of their months (blocking)."""
+        written = 0
+        for source, daily in rows_by_source.items():
+            by_month: dict[str, dict[int, dict[str, Any]]] = {}
+            for day, values in daily.items():
+                try:
+                    ordinal = date.fromisoformat(day).toordinal()
+                except ValueError:
+                    continue
+                by_month.setdefault(_month_key(ordinal), {})[ordinal] = values
+
+            for month, rows in by_month.items():
+                if self._merge_segment(source, month, rows):
+                    written += 1
+        return written
+
+    def _merge_segment(self, source: str, month: str, rows: dict[int, dict[str, Any]]) -> bool:
+        """Merge rows into one segment, rewriting it only if it changed."""
+        path = self.path / source / f"{month}{SEGMENT_SUFFIX}"
+        existing = b""
+        merged: dict[int, dict[str, Any]] = {}
+        if path.exists():
+            existing = path.read_bytes()
+            try:
+                merged = Segment(existing).to_rows()
+            except (ValueError, struct.error):
+                _LOGGER.warning("Replacing unreadable history segment %s/%s", source, month)
+
+        for day, values in rows.items():
+            merged.setdefault(day, {}).update(values)
+
+        days = sorted(merged)
+        names = list(dict.fromkeys(
+            [*DAILY_METRICS.get(source, ()), *(name for values in merged.values() for name in values)]
+        ))
+        content = encode_segment(days, {
+            name: [float(merged[day].get(name, math.nan)) for day in days] for name in names
+        })
+        if content == existing:
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_bytes(content)
+        os.replace(temporary, path)
+
+        months = self.months(source)
+        if month not in months:
+            months.insert(bisect_left(months, month), month)
+        return True
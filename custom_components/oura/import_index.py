@@ -0,0 +1,253 @@
+"""Persisted index of the days already imported as daily statistics.
+
+Every historical load re-imports all days it fetches, so overlapping imports
+(reloads, re-runs after errors) cause recorder upserts for days that are
+already stored. The index keeps, per statistic, one 32-bit content hash per
+day in a contiguous array starting at the first imported day (0 meaning not
+imported). Points whose day is indexed with the same hash are dropped before
+any StatisticData is built.
+
+The index also drives gap repair: days that no statistic of a data source has
+imported are gaps, except days a repair already fetched and found empty.
+"""
+from __future__ import annotations
+
+from array import array
+import base64
+from collections.abc import Iterable
+import logging
+import sys
+from typing import Any
+import zlib
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.import_index"
+
+# Seconds to coalesce index updates before writing them to disk
+SAVE_DELAY = 10
+
+
+def merge_gaps(days: list[int], max_days: int | None = None) -> list[tuple[int, int]]:
+    """Cover missing days with the fewest date ranges.
+
+    Each range starts at the first day not covered yet and extends to the
+    last missing day that keeps it within ``max_days``. Imported days inside
+    a range are fetched again but skipped by the import index.
+
+    Args:
+        days: Sorted ordinals of missing days
+        max_days: Maximum number of days per range, or None for no limit
+
+    Returns:
+        Inclusive (first, last) ordinal ranges
+    """
+    ranges: list[tuple[int, int]] = []
+    for day in days:
+        if ranges and (max_days is None or day - ranges[-1][0] < max_days):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def _point_hash(point: dict[str, Any]) -> int:
+    """Return the non-zero content hash of a daily data point."""
+    content = repr((point["value"], point.get("min"), point.get("max"))).encode()
+    return zlib.crc32(content) or 1
+
+
+def _encode(hashes: array) -> str:
+    """Encode a hash array as little-endian base64."""
+    if sys.byteorder == "big":
+        hashes = array("I", hashes)
+        hashes.byteswap()
+    return base64.b64encode(hashes.tobytes()).decode("ascii")
+
+
+def _decode(value: str) -> array:
+    """Decode a hash array from little-endian base64."""
+    hashes = array("I")
+    hashes.frombytes(base64.b64decode(value))
+    if sys.byteorder == "big":
+        hashes.byteswap()
+    return hashes
+
+
+class ImportIndex:
+    """Day-level index of imported daily statistics for one config entry."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the index."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}"
+        )
+        # statistic_id -> (ordinal of the first indexed day, hash per day)
+        self._days: dict[str, tuple[int, array]] = {}
+        # data source -> ordinals of days fetched without any data
+        self._empty: dict[str, set[int]] = {}
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the index from storage once."""
+        if self._loaded:
+            return
+
+        stored = await self._store.async_load() or {}
+        for statistic_id, item in stored.get("statistics", {}).items():
+            self._days[statistic_id] = (item["first"], _decode(item["hashes"]))
+        for source, ranges in stored.get("empty", {}).items():
+            self._empty[source] = {
+                ordinal for first, last in ranges for ordinal in range(first, last + 1)
+            }
+        self._loaded = True
+
+    async def async_remove(self) -> None:
+        """Remove the index from storage."""
+        self._days.clear()
+        self._empty.clear()
+        await self._store.async_remove()
+
+    def filter_changed(
+        self,
+        statistic_id: str,
+        data_points: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Drop data points whose day is already imported with the same content.
+
+        Args:
+            statistic_id: Statistic the points are imported under
+            data_points: Daily points with "timestamp" and "value"
+
+        Returns:
+            Points that are new or changed since they were last imported
+        """
+        if (indexed := self._days.get(statistic_id)) is None:
+            return data_points
+
+        first, hashes = indexed
+        changed = []
+        for point in data_points:
+            offset = point["timestamp"].toordinal() - first
+            if not 0 <= offset < len(hashes) or hashes[offset] != _point_hash(point):
+                changed.append(point)
+        return changed
+
+    def mark_imported(self, statistic_id: str, data_points: list[dict[str, Any]]) -> None:
+        """Record data points as imported and schedule saving the index."""
+        if not data_points:
+            return
+
+        ordinals = [point["timestamp"].toordinal() for point in data_points]
+        first, hashes = self._days.get(statistic_id, (min(ordinals), array("I")))
+
+        if (lowest := min(ordinals)) < first:
+            hashes = array("I", bytes(4 * (first - lowest))) + hashes
+            first = lowest
+        if (missing := max(ordinals) - first + 1 - len(hashes)) > 0:
+            hashes.frombytes(bytes(4 * missing))
+
+        for ordinal, point in zip(ordinals, data_points):
+            hashes[ordinal - first] = _point_hash(point)
+
+        self._days[statistic_id] = (first, hashes)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def rekey(self, old_statistic_id: str, new_statistic_id: str) -> None:
+        """Move the imported days of a statistic that was renamed.
+
+        Days indexed under both IDs keep the hash of the new one.
+        """
+        if (indexed := self._days.pop(old_statistic_id, None)) is None:
+            return
+
+        if (existing := self._days.get(new_statistic_id)) is not None:
+            first = min(indexed[0], existing[0])
+            last = max(start + len(hashes) for start, hashes in (indexed, existing))
+            merged = array("I", bytes(4 * (last - first)))
+            for start, hashes in (indexed, existing):
+                for offset, value in enumerate(hashes):
+                    if value:
+                        merged[start - first + offset] = value
+            indexed = (first, merged)
+
+        self._days[new_statistic_id] = indexed
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def find_gaps(
+        self,
+        source: str,
+        statistic_ids: Iterable[str],
+        first: int,
+        last: int,
+    ) -> list[int]:
+        """Return the days of a data source that were never imported.
+
+        Args:
+            source: Data source the statistics are read from
+            statistic_ids: Daily statistics of the data source
+            first: Ordinal of the first day to scan
+            last: Ordinal of the last day to scan
+
+        Returns:
+            Sorted ordinals of days no statistic has imported and that are
+            not known to be empty
+        """
+        covered = bytearray(last - first + 1)
+        for statistic_id in statistic_ids:
+            if (indexed := self._days.get(statistic_id)) is None:
+                continue
+            start, hashes = indexed
+            for ordinal in range(max(first, start), min(last, start + len(hashes) - 1) + 1):
+                if hashes[ordinal - start]:
+                    covered[ordinal - first] = 1
+
+        empty = self._empty.get(source, ())
+        return [
+            ordinal
+            for ordinal in range(first, last + 1)
+            if not covered[ordinal - first] and ordinal not in empty
+        ]
+
+    def exclude_empty(self, source: str, ordinals: Iterable[int]) -> list[int]:
+        """Return the days not known to be without data for a data source."""
+        empty = self._empty.get(source, ())
+        return [ordinal for ordinal in ordinals if ordinal not in empty]
+
+    def mark_empty(self, source: str, ordinals: Iterable[int]) -> None:
+        """Record days a data source returned no data for."""
+        days = self._empty.setdefault(source, set())
+        size = len(days)
+        days.update(ordinals)
+        if len(days) != size:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the index in its stored form."""
+        return {
+            "statistics": {
+                statistic_id: {"first": first, "hashes": _encode(hashes)}
+                for statistic_id, (first, hashes) in self._days.items()
+            },
+            "empty": {
+                source: _to_ranges(days) for source, days in self._empty.items() if days
+            },
+        }
+
+
+def _to_ranges(ordinals: Iterable[int]) -> list[list[int]]:
+    """Collapse day ordinals into sorted [first, last] runs."""
+    ranges: list[list[int]] = []
+    for ordinal in sorted(ordinals):
+        if ranges and ordinal == ranges[-1][1] + 1:
+            ranges[-1][1] = ordinal
+        else:
+            ranges.append([ordinal, ordinal])
+    return ranges
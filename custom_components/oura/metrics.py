@@ -0,0 +1,517 @@
+"""Declarative catalog of the metrics read from Oura API documents.
+
+Every metric is described once: the data source it comes from, where its value
+lives in a document (or how it is computed), how it is transformed and how it
+is recorded as a long-term statistic. The catalog is compiled once at import
+into per-source extractors, which the coordinator uses for live sensor values
+and the statistics importer uses for daily statistics, so both always read the
+same fields.
+
+Names and units of metrics backed by a sensor entity come from SENSOR_TYPES;
+only metrics without an entity (intraday series) declare their own.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import logging
+from statistics import fmean
+from typing import TYPE_CHECKING, Any, Callable, Final
+
+from .const import (
+    CONF_STATISTICS_MODE,
+    DEFAULT_STATISTICS_MODE,
+    SENSOR_TYPES,
+    STATISTICS_MODE_EXTERNAL,
+)
+from .samples import (
+    ACTIVITY_HIGH,
+    ACTIVITY_INACTIVE,
+    ACTIVITY_LOW,
+    ACTIVITY_MEDIUM,
+    MOVEMENT_ACTIVE,
+    MOVEMENT_RESTLESS,
+    MOVEMENT_TOSSING,
+    PHASE_AWAKE,
+    count_restless_periods,
+    count_transitions,
+    count_wake_bouts,
+    decode_classes,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+# How a metric is recorded as a long-term statistic
+STATISTIC_MEAN: Final = "mean"
+STATISTIC_SUM: Final = "sum"
+
+# Number of most recent heart rate readings aggregated for live sensor values
+LIVE_HEART_RATE_WINDOW: Final = 10
+
+# Sleep period type of the main sleep of a day; naps and rests have others
+MAIN_SLEEP_TYPE: Final = "long_sleep"
+
+Extractor = Callable[[dict[str, Any]], Any]
+
+# Transformations referenced by name from catalog entries
+TRANSFORMS: Final[dict[str, Callable[[Any], Any]]] = {
+    "seconds_to_hours": lambda value: value / 3600,
+    "seconds_to_minutes": lambda value: value / 60,
+}
+
+# Reductions of a window of readings (e.g. heart rate) to one value
+REDUCERS: Final[dict[str, Callable[[list[Any]], Any]]] = {
+    "mean": fmean,
+    "min": min,
+    "max": max,
+}
+
+
+def compute_percentage(
+    entry: dict[str, Any],
+    numerator_key: str,
+    denominator_key: str,
+) -> float | None:
+    """Compute a percentage from two entry fields.
+
+    Args:
+        entry: Data entry
+        numerator_key: Key for numerator value
+        denominator_key: Key for denominator value
+
+    Returns:
+        Percentage value rounded to 1 decimal, or None if can't compute
+    """
+    numerator = entry.get(numerator_key)
+    denominator = entry.get(denominator_key)
+
+    if numerator is None or not denominator:
+        return None
+
+    return round((numerator / denominator) * 100, 1)
+
+
+def _percentage(numerator_key: str, denominator_key: str) -> Extractor:
+    """Return an extractor computing one field as a percentage of another."""
+    return lambda entry: compute_percentage(entry, numerator_key, denominator_key)
+
+
+def _epoch_summary(key: str, summarize: Callable[[bytes], int]) -> Extractor:
+    """Return an extractor decoding a classification string and summarizing it."""
+    def compute(entry: dict[str, Any]) -> int | None:
+        codes = decode_classes(entry.get(key))
+        return None if codes is None else summarize(codes)
+
+    return compute
+
+
+def _optimal_bedtime(offset_key: str) -> Extractor:
+    """Return an extractor for an optimal bedtime boundary as a UTC datetime.
+
+    Offsets are seconds from local midnight of the document's day, and
+    ``day_tz`` is the local offset from UTC in seconds.
+    """
+    def compute(entry: dict[str, Any]) -> datetime | None:
+        optimal_bedtime = entry.get("optimal_bedtime")
+        day_str = entry.get("day")
+        if not optimal_bedtime or not day_str:
+            return None
+
+        offset = optimal_bedtime.get(offset_key)
+        if offset is None:
+            return None
+
+        try:
+            day = datetime.strptime(day_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        except ValueError as err:
+            _LOGGER.warning("Error calculating sleep time: %s", err)
+            return None
+
+        return day + timedelta(seconds=offset - optimal_bedtime.get("day_tz", 0))
+
+    return compute
+
+
+# Metric descriptors, in sensor order within each source. Keys:
+#   source: API data source the metric is read from
+#   path: dot notation path in a document, or
+#   compute: function computing the value from a document, or
+#   reduce: name of the reduction applied to "path" over several documents
+#   transform: optional transformation name from TRANSFORMS
+#   default: live value used when the document lacks the field
+#   statistic: STATISTIC_MEAN, STATISTIC_SUM or None (live value only)
+#   series: intraday series options, imported as hourly external statistics
+METRIC_CATALOG: Final[dict[str, dict[str, Any]]] = {
+    # Daily sleep
+    "sleep_score": {"source": "sleep", "path": "score", "statistic": STATISTIC_MEAN},
+    "sleep_efficiency": {"source": "sleep", "path": "contributors.efficiency", "statistic": STATISTIC_MEAN},
+    "restfulness": {"source": "sleep", "path": "contributors.restfulness", "statistic": STATISTIC_MEAN},
+    "sleep_timing": {"source": "sleep", "path": "contributors.timing", "statistic": STATISTIC_MEAN},
+
+    # Sleep periods
+    "total_sleep_duration": {"source": "sleep_detail", "path": "total_sleep_duration", "transform": "seconds_to_hours", "statistic": STATISTIC_MEAN},
+    "deep_sleep_duration": {"source": "sleep_detail", "path": "deep_sleep_duration", "transform": "seconds_to_hours", "statistic": STATISTIC_MEAN},
+    "rem_sleep_duration": {"source": "sleep_detail", "path": "rem_sleep_duration", "transform": "seconds_to_hours", "statistic": STATISTIC_MEAN},
+    "light_sleep_duration": {"source": "sleep_detail", "path": "light_sleep_duration", "transform": "seconds_to_hours", "statistic": STATISTIC_MEAN},
+    "awake_time": {"source": "sleep_detail", "path": "awake_time", "transform": "seconds_to_hours", "statistic": STATISTIC_MEAN},
+    "sleep_latency": {"source": "sleep_detail", "path": "latency", "transform": "seconds_to_minutes", "statistic": STATISTIC_MEAN},
+    "time_in_bed": {"source": "sleep_detail", "path": "time_in_bed", "transform": "seconds_to_hours", "statistic": STATISTIC_MEAN},
+    "deep_sleep_percentage": {"source": "sleep_detail", "compute": _percentage("deep_sleep_duration", "total_sleep_duration"), "statistic": STATISTIC_MEAN},
+    "rem_sleep_percentage": {"source": "sleep_detail", "compute": _percentage("rem_sleep_duration", "total_sleep_duration"), "statistic": STATISTIC_MEAN},
+    "average_sleep_hrv": {"source": "sleep_detail", "path": "average_hrv", "statistic": STATISTIC_MEAN},
+    "lowest_heart_rate": {"source": "sleep_detail", "path": "lowest_heart_rate", "statistic": STATISTIC_MEAN},
+    "sleep_stage_transitions": {"source": "sleep_detail", "compute": _epoch_summary("sleep_phase_5_min", count_transitions), "statistic": STATISTIC_MEAN},
+    "wake_bouts": {"source": "sleep_detail", "compute": _epoch_summary("sleep_phase_5_min", count_wake_bouts), "statistic": STATISTIC_MEAN},
+    "restless_periods": {"source": "sleep_detail", "compute": _epoch_summary("movement_30_sec", count_restless_periods), "statistic": STATISTIC_MEAN},
+    "low_battery_alert": {"source": "sleep_detail", "path": "low_battery_alert", "default": False, "statistic": None},
+    "sleep_hrv": {
+        "source": "sleep_detail",
+        "name": "Sleep HRV",
+        "unit": "ms",
+        "statistic": STATISTIC_MEAN,
+        "series": {"api_path": "hrv"},
+    },
+    "sleep_heart_rate": {
+        "source": "sleep_detail",
+        "name": "Sleep Heart Rate",
+        "unit": "bpm",
+        "statistic": STATISTIC_MEAN,
+        "series": {"api_path": "heart_rate"},
+    },
+    "sleep_awake_time": {
+        "source": "sleep_detail",
+        "name": "Sleep Awake Time",
+        "unit": "min",
+        "statistic": STATISTIC_MEAN,
+        "series": {
+            "api_path": "sleep_phase_5_min",
+            "start_path": "bedtime_start",
+            "epoch_seconds": 300,
+            "codes": bytes((PHASE_AWAKE,)),
+            "measure": "minutes",
+        },
+    },
+    "sleep_restlessness": {
+        "source": "sleep_detail",
+        "name": "Sleep Restlessness",
+        "unit": "%",
+        "statistic": STATISTIC_MEAN,
+        "series": {
+            "api_path": "movement_30_sec",
+            "start_path": "bedtime_start",
+            "epoch_seconds": 30,
+            "codes": bytes((MOVEMENT_RESTLESS, MOVEMENT_TOSSING, MOVEMENT_ACTIVE)),
+            "measure": "percentage",
+        },
+    },
+
+    # Readiness
+    "readiness_score": {"source": "readiness", "path": "score", "statistic": STATISTIC_MEAN},
+    "temperature_deviation": {"source": "readiness", "path": "temperature_deviation", "statistic": STATISTIC_MEAN},
+    "resting_heart_rate": {"source": "readiness", "path": "contributors.resting_heart_rate", "statistic": STATISTIC_MEAN},
+    "hrv_balance": {"source": "readiness", "path": "contributors.hrv_balance", "statistic": STATISTIC_MEAN},
+
+    # Activity
+    "activity_score": {"source": "activity", "path": "score", "statistic": STATISTIC_MEAN},
+    "steps": {"source": "activity", "path": "steps", "statistic": STATISTIC_SUM},
+    "active_calories": {"source": "activity", "path": "active_calories", "statistic": STATISTIC_SUM},
+    "total_calories": {"source": "activity", "path": "total_calories", "statistic": STATISTIC_SUM},
+    "target_calories": {"source": "activity", "path": "target_calories", "statistic": STATISTIC_MEAN},
+    "met_min_high": {"source": "activity", "path": "high_activity_met_minutes", "statistic": STATISTIC_SUM},
+    "met_min_medium": {"source": "activity", "path": "medium_activity_met_minutes", "statistic": STATISTIC_SUM},
+    "met_min_low": {"source": "activity", "path": "low_activity_met_minutes", "statistic": STATISTIC_SUM},
+    "activity_met": {
+        "source": "activity",
+        "name": "Activity MET",
+        "unit": "MET",
+        "statistic": STATISTIC_MEAN,
+        "series": {"api_path": "met"},
+    },
+    "active_time": {
+        "source": "activity",
+        "name": "Active Time",
+        "unit": "min",
+        "statistic": STATISTIC_MEAN,
+        "series": {
+            "api_path": "class_5_min",
+            "start_path": "timestamp",
+            "epoch_seconds": 300,
+            "codes": bytes((ACTIVITY_LOW, ACTIVITY_MEDIUM, ACTIVITY_HIGH)),
+            "measure": "minutes",
+        },
+    },
+    "sedentary_time": {
+        "source": "activity",
+        "name": "Sedentary Time",
+        "unit": "min",
+        "statistic": STATISTIC_MEAN,
+        "series": {
+            "api_path": "class_5_min",
+            "start_path": "timestamp",
+            "epoch_seconds": 300,
+            "codes": bytes((ACTIVITY_INACTIVE,)),
+            "measure": "minutes",
+        },
+    },
+
+    # Heart rate readings: live values use the latest readings, statistics
+    # reduce each day's readings
+    "current_heart_rate": {"source": "heartrate", "path": "bpm", "statistic": None},
+    "heart_rate_timestamp": {"source": "heartrate", "path": "timestamp", "statistic": None},
+    "average_heart_rate": {"source": "heartrate", "path": "bpm", "reduce": "mean", "statistic": STATISTIC_MEAN},
+    "min_heart_rate": {"source": "heartrate", "path": "bpm", "reduce": "min", "statistic": STATISTIC_MEAN},
+    "max_heart_rate": {"source": "heartrate", "path": "bpm", "reduce": "max", "statistic": STATISTIC_MEAN},
+
+    # Stress
+    "stress_high_duration": {"source": "stress", "path": "stress_high", "transform": "seconds_to_minutes", "statistic": STATISTIC_MEAN},
+    "recovery_high_duration": {"source": "stress", "path": "recovery_high", "transform": "seconds_to_minutes", "statistic": STATISTIC_MEAN},
+    "stress_day_summary": {"source": "stress", "path": "day_summary", "statistic": None},
+
+    # Resilience
+    "resilience_level": {"source": "resilience", "path": "level", "statistic": None},
+    "sleep_recovery_score": {"source": "resilience", "path": "contributors.sleep_recovery", "statistic": STATISTIC_MEAN},
+    "daytime_recovery_score": {"source": "resilience", "path": "contributors.daytime_recovery", "statistic": STATISTIC_MEAN},
+    "stress_resilience_score": {"source": "resilience", "path": "contributors.stress", "statistic": STATISTIC_MEAN},
+
+    # SpO2
+    "spo2_average": {"source": "spo2", "path": "spo2_percentage.average", "statistic": STATISTIC_MEAN},
+    "breathing_disturbance_index": {"source": "spo2", "path": "breathing_disturbance_index", "statistic": STATISTIC_MEAN},
+
+    # Fitness
+    "vo2_max": {"source": "vo2_max", "path": "vo2_max", "statistic": STATISTIC_MEAN},
+    "cardiovascular_age": {"source": "cardiovascular_age", "path": "vascular_age", "statistic": STATISTIC_MEAN},
+
+    # Sleep time recommendations
+    "optimal_bedtime_start": {"source": "sleep_time", "compute": _optimal_bedtime("start_offset"), "statistic": None},
+    "optimal_bedtime_end": {"source": "sleep_time", "compute": _optimal_bedtime("end_offset"), "statistic": None},
+}
+
+
+def compile_path(path: str) -> Extractor:
+    """Compile a dot notation path into an accessor function.
+
+    The path is split once here instead of on every lookup.
+
+    Args:
+        path: Dot-separated path (e.g., "contributors.efficiency")
+
+    Returns:
+        Function returning the value at path, or None if not found
+    """
+    keys = tuple(path.split("."))
+
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda data: data.get(key)
+
+    def accessor(data: dict[str, Any]) -> Any:
+        value = data
+        for key in keys:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    return accessor
+
+
+def _compile_extractor(descriptor: dict[str, Any]) -> Extractor:
+    """Compile a document-level descriptor into an extractor."""
+    if compute := descriptor.get("compute"):
+        return compute
+
+    accessor = compile_path(descriptor["path"])
+    transform = TRANSFORMS.get(descriptor.get("transform"))
+    if transform is None:
+        return accessor
+
+    def extract(data: dict[str, Any]) -> Any:
+        value = accessor(data)
+        return None if value is None else transform(value)
+
+    return extract
+
+
+def _compile_catalog() -> tuple[
+    dict[str, tuple[tuple[str, Extractor], ...]],
+    dict[str, tuple[tuple[str, Extractor, Callable[[list[Any]], Any]], ...]],
+    dict[str, tuple[dict[str, Any], ...]],
+]:
+    """Group catalog entries by source and compile them.
+
+    Returns:
+        Document extractors, window reducers and series options, each keyed
+        by data source
+    """
+    extractors: dict[str, list[tuple[str, Extractor]]] = {}
+    reducers: dict[str, list[tuple[str, Extractor, Callable[[list[Any]], Any]]]] = {}
+    series: dict[str, list[dict[str, Any]]] = {}
+
+    for key, descriptor in METRIC_CATALOG.items():
+        source = descriptor["source"]
+        if "series" in descriptor:
+            series.setdefault(source, []).append({"sensor_key": key, **descriptor["series"]})
+        elif reduce := descriptor.get("reduce"):
+            reducers.setdefault(source, []).append(
+                (key, compile_path(descriptor["path"]), REDUCERS[reduce])
+            )
+        else:
+            extractors.setdefault(source, []).append((key, _compile_extractor(descriptor)))
+
+    return (
+        {source: tuple(items) for source, items in extractors.items()},
+        {source: tuple(items) for source, items in reducers.items()},
+        {source: tuple(items) for source, items in series.items()},
+    )
+
+
+# Catalog compiled once at import
+SOURCE_EXTRACTORS, SOURCE_REDUCERS, SOURCE_SERIES = _compile_catalog()
+
+# Data sources in catalog order
+METRIC_SOURCES: Final = tuple(dict.fromkeys(
+    descriptor["source"] for descriptor in METRIC_CATALOG.values()
+))
+
+# Metrics recorded with one value per day, by data source
+DAILY_METRICS: Final = {
+    source: keys
+    for source in METRIC_SOURCES
+    if (keys := tuple(
+        key
+        for key, descriptor in METRIC_CATALOG.items()
+        if descriptor["source"] == source
+        and descriptor["statistic"]
+        and "series" not in descriptor
+    ))
+}
+
+# Live values used when a source's latest document lacks the field
+_DEFAULTS: Final = {
+    key: descriptor["default"]
+    for key, descriptor in METRIC_CATALOG.items()
+    if "default" in descriptor
+}
+
+
+def uses_external_statistics(entry: ConfigEntry) -> bool:
+    """Return whether the entry imports all history as external statistics."""
+    mode = entry.options.get(CONF_STATISTICS_MODE, DEFAULT_STATISTICS_MODE)
+    return mode == STATISTICS_MODE_EXTERNAL
+
+
+def metric_name(key: str) -> str:
+    """Return the display name of a metric."""
+    if sensor := SENSOR_TYPES.get(key):
+        return sensor["name"]
+    return METRIC_CATALOG[key]["name"]
+
+
+def metric_unit(key: str) -> str | None:
+    """Return the unit of a metric, matching its sensor entity if it has one."""
+    if sensor := SENSOR_TYPES.get(key):
+        return sensor.get("unit")
+    return METRIC_CATALOG[key].get("unit")
+
+
+def daily_documents(documents: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return one document per day, in day order of first appearance.
+
+    A day can have several sleep periods, such as a nap and the night's
+    sleep. The day's last main sleep is kept, or its last document if it has
+    no main sleep. Documents without a day are left out.
+
+    Args:
+        documents: Documents from the Oura API
+
+    Returns:
+        The document of every day
+    """
+    days: dict[str, dict[str, Any]] = {}
+    for document in documents:
+        if not (day := document.get("day")):
+            continue
+        current = days.get(day[:10])
+        if (
+            current is None
+            or document.get("type") == MAIN_SLEEP_TYPE
+            or current.get("type") != MAIN_SLEEP_TYPE
+        ):
+            days[day[:10]] = document
+    return list(days.values())
+
+
+def extract_current_values(data: dict[str, Any]) -> dict[str, Any]:
+    """Compute live sensor values from the latest document of every source.
+
+    Each source's latest document is visited once with the compiled
+    extractors; reduced metrics use the last LIVE_HEART_RATE_WINDOW documents.
+
+    Args:
+        data: Data from Oura API keyed by source
+
+    Returns:
+        Sensor values keyed by metric, without missing values
+    """
+    values: dict[str, Any] = {}
+
+    for source in METRIC_SOURCES:
+        documents = (data.get(source) or {}).get("data")
+        if not documents:
+            continue
+
+        latest = documents[-1]
+        for key, extract in SOURCE_EXTRACTORS.get(source, ()):
+            value = extract(latest)
+            if value is None:
+                value = _DEFAULTS.get(key)
+            if value is not None:
+                values[key] = value
+
+        if reducers := SOURCE_REDUCERS.get(source):
+            window = documents[-LIVE_HEART_RATE_WINDOW:]
+            for key, accessor, reduce in reducers:
+                readings = [value for document in window if (value := accessor(document))]
+                if readings:
+                    values[key] = reduce(readings)
+
+    return values
+
+
+def extract_daily_values(source: str, documents: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Compute the daily metric values of a source's documents.
+
+    Documents are attributed to their "day"; readings with a timestamp
+    instead (heart rate) are grouped by the day of their timestamp and
+    reduced. A day with several documents uses the one daily_documents keeps.
+
+    Args:
+        source: Data source of the documents
+        documents: Documents from the Oura API
+
+    Returns:
+        Metric values keyed by ISO day, then by metric
+    """
+    daily_keys = DAILY_METRICS.get(source, ())
+    days: dict[str, dict[str, Any]] = {}
+
+    dated = daily_documents(documents)
+    for key, extract in SOURCE_EXTRACTORS.get(source, ()):
+        if key not in daily_keys:
+            continue
+        for document in dated:
+            if (value := extract(document)) is not None:
+                days.setdefault(document["day"][:10], {})[key] = value
+
+    for key, accessor, reduce in SOURCE_REDUCERS.get(source, ()):
+        readings: dict[str, list[Any]] = {}
+        for document in documents:
+            timestamp = document.get("timestamp")
+            if timestamp and (value := accessor(document)):
+                readings.setdefault(timestamp[:10], []).append(value)
+        for day, values in readings.items():
+            days.setdefault(day, {})[key] = reduce(values)
+
+    return days
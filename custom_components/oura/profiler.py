@@ -0,0 +1,221 @@
+"""On-demand profiling of a refresh or a short backfill.
+
+The ``profile`` service runs one refresh of a config entry, or a backfill of a
+few days, under cProfile and tracemalloc. cProfile records every call on the
+event loop thread while the run lasts, so work of other integrations that
+interleaves with it shows up too. tracemalloc records the allocations made
+during the run that are still alive when it ends, and the peak. Results are
+written to the configuration directory::
+
+    <config>/oura_profiles/<entry_id>-<target>-<time>.prof              pstats, e.g. for snakeviz
+    <config>/oura_profiles/<entry_id>-<target>-<time>-allocations.txt   top allocation sites
+
+and summarized in the service response. cProfile and tracemalloc are
+process-wide, so only one profile runs at a time.
+"""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+import cProfile
+import logging
+from pathlib import Path
+import pstats
+import time
+import tracemalloc
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, PROFILE_ALLOCATION_SITES, PROFILE_TOP_ENTRIES
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PROFILER = f"{DOMAIN}_profiler"
+PROFILE_DIR = f"{DOMAIN}_profiles"
+
+
+def _short_path(filename: str) -> str:
+    """Return the last two components of a source path."""
+    return "/".join(Path(filename).parts[-2:])
+
+
+def top_functions(stats: pstats.Stats, top: int) -> list[dict[str, Any]]:
+    """Return the functions with the largest cumulative time.
+
+    Args:
+        stats: Profile statistics
+        top: Number of functions
+
+    Returns:
+        Function, number of calls, and own and cumulative time in ms
+    """
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": f"{_short_path(filename)}:{line}({name})",
+            "calls": calls,
+            "own_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_primitive, calls, own, cumulative, _callers) in rows[:top]
+    ]
+
+
+def top_allocations(
+    snapshot: tracemalloc.Snapshot, baseline: tracemalloc.Snapshot, top: int
+) -> list[tracemalloc.StatisticDiff]:
+    """Return the source lines that allocated the most memory since a baseline.
+
+    Allocations of tracemalloc itself are left out.
+    """
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    differences = snapshot.filter_traces(ignore).compare_to(baseline.filter_traces(ignore), "lineno")
+    grown = [difference for difference in differences if difference.size_diff > 0]
+    grown.sort(key=lambda difference: difference.size_diff, reverse=True)
+    return grown[:top]
+
+
+def _write_results(
+    directory: Path,
+    stem: str,
+    profile: cProfile.Profile,
+    allocations: list[tracemalloc.StatisticDiff],
+) -> tuple[Path, Path]:
+    """Write the profile and the allocation sites."""
+    directory.mkdir(parents=True, exist_ok=True)
+    stats_path = directory / f"{stem}.prof"
+    allocations_path = directory / f"{stem}-allocations.txt"
+    profile.dump_stats(stats_path)
+    allocations_path.write_text(
+        "".join(f"{allocation}\n" for allocation in allocations), encoding="utf-8"
+    )
+    return stats_path, allocations_path
+
+
+def _summarize_results(
+    directory: Path,
+    stem: str,
+    profile: cProfile.Profile,
+    baseline: tracemalloc.Snapshot,
+    top: int,
+) -> dict[str, Any]:
+    """Compare the allocations with the baseline, write and summarize the results.
+
+    Runs in the executor: on a large heap the snapshot, its comparison and
+    the stats summary take long enough to stall the event loop.
+
+    Returns:
+        Written files, and the top functions and allocation sites
+    """
+    snapshot = tracemalloc.take_snapshot()
+    allocations = top_allocations(snapshot, baseline, max(top, PROFILE_ALLOCATION_SITES))
+    stats_path, allocations_path = _write_results(directory, stem, profile, allocations)
+    return {
+        "stats_file": str(stats_path),
+        "allocations_file": str(allocations_path),
+        "top_functions": top_functions(pstats.Stats(profile), top),
+        "top_allocations": [
+            {
+                "site": f"{_short_path(frame.filename)}:{frame.lineno}",
+                "size_kib": round(allocation.size_diff / 1024, 1),
+                "count": allocation.count_diff,
+            }
+            for allocation in allocations[:top]
+            for frame in allocation.traceback[:1]
+        ],
+    }
+
+
+class Profiler:
+    """Runs one profile at a time for all config entries."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profiler."""
+        self.hass = hass
+        self.running = False
+
+    async def async_profile(
+        self,
+        entry_id: str,
+        target: str,
+        run: Callable[[], Awaitable[Any]],
+        top: int = PROFILE_TOP_ENTRIES,
+    ) -> dict[str, Any]:
+        """Run a coroutine under cProfile and tracemalloc and write the results.
+
+        An exception raised by the run is reported in the summary, so a
+        failing refresh can be profiled too.
+
+        Args:
+            entry_id: Config entry the run belongs to, used in the file names
+            target: What is profiled, e.g. "refresh"
+            run: Returns the coroutine to profile
+            top: Number of functions and allocation sites in the summary
+
+        Returns:
+            Duration, error, memory, written files, and the top functions and
+            allocation sites
+        """
+        self.running = True
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            baseline = await self.hass.async_add_executor_job(tracemalloc.take_snapshot)
+            traced_before, _peak = tracemalloc.get_traced_memory()
+            profile = cProfile.Profile()
+            error = None
+            started = time.perf_counter()
+            try:
+                profile.enable()
+                try:
+                    await run()
+                finally:
+                    profile.disable()
+            except Exception as err:
+                error = f"{type(err).__name__}: {err}"
+                _LOGGER.warning("Profiled %s of %s failed: %s", target, entry_id, error)
+            duration = time.perf_counter() - started
+            traced_after, peak = tracemalloc.get_traced_memory()
+
+            stem = f"{entry_id}-{target}-{time.strftime('%Y%m%dT%H%M%S')}"
+            results = await self.hass.async_add_executor_job(
+                _summarize_results,
+                Path(self.hass.config.path(PROFILE_DIR)),
+                stem,
+                profile,
+                baseline,
+                top,
+            )
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+            self.running = False
+        _LOGGER.info("Wrote profile of %s of %s to %s", target, entry_id, results["stats_file"])
+
+        return {
+            "entry_id": entry_id,
+            "target": target,
+            "duration_s": round(duration, 3),
+            "error": error,
+            "stats_file": results["stats_file"],
+            "allocations_file": results["allocations_file"],
+            "memory": {
+                "retained_kib": round((traced_after - traced_before) / 1024, 1),
+                "peak_kib": round((peak - traced_before) / 1024, 1),
+            },
+            "top_functions": results["top_functions"],
+            "top_allocations": results["top_allocations"],
+        }
+
+
+def get_profiler(hass: HomeAssistant) -> Profiler:
+    """Return the shared profiler.
+
+    cProfile and tracemalloc are process-wide, so a single profiler is kept
+    per Home Assistant instance.
+    """
+    if (profiler := hass.data.get(DATA_PROFILER)) is None:
+        profiler = hass.data[DATA_PROFILER] = Profiler(hass)
+    return profiler
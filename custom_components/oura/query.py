@@ -0,0 +1,176 @@
+"""Query daily metric history for arbitrary date ranges.
+
+Queries are served from the local history store. Days of the range the store
+does not have are fetched from the API once, merged into the store, and days
+the API has no data for are remembered in the import index so they are not
+requested again. Values can be downsampled to weekly or monthly buckets, or
+reduced to one value for the whole range.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+import logging
+from statistics import fmean
+from typing import Any, Callable, Final
+
+from .api import OuraApiClient
+from .const import API_MAX_RANGE_DAYS, GAP_SCAN_SETTLE_DAYS
+from .history_store import HistoryStore
+from .import_index import ImportIndex, merge_gaps
+from .metrics import METRIC_CATALOG, REDUCERS, metric_name, metric_unit
+
+_LOGGER = logging.getLogger(__name__)
+
+# Reductions of the values in a bucket
+AGGREGATES: Final[dict[str, Callable[[list[float]], float]]] = {
+    **REDUCERS,
+    "sum": sum,
+    "count": len,
+}
+
+# Start of the bucket a day belongs to
+BUCKETS: Final[dict[str, Callable[[date], date | None]]] = {
+    "day": lambda day: day,
+    "week": lambda day: day - timedelta(days=day.weekday()),
+    "month": lambda day: day.replace(day=1),
+    "all": lambda day: None,
+}
+
+
+def downsample(
+    days: list[str],
+    values: list[float | None],
+    bucket: str = "day",
+    aggregate: str = "mean",
+) -> list[dict[str, Any]]:
+    """Group daily values into buckets and aggregate each bucket.
+
+    Args:
+        days: ISO days, sorted
+        values: Value of each day, None for missing values
+        bucket: "day", "week" (from Monday), "month" or "all"
+        aggregate: Name of the reduction from AGGREGATES
+
+    Returns:
+        Points with the ISO "start" of their bucket and the aggregated
+        "value", without empty buckets
+    """
+    bucket_start = BUCKETS[bucket]
+    reduce = AGGREGATES[aggregate]
+    groups: dict[date | None, tuple[str, list[float]]] = {}
+
+    for day, value in zip(days, values):
+        if value is None:
+            continue
+        key = bucket_start(date.fromisoformat(day))
+        groups.setdefault(key, (day if key is None else key.isoformat(), []))[1].append(value)
+
+    return [{"start": start, "value": reduce(group)} for start, group in groups.values()]
+
+
+async def async_query(
+    api_client: OuraApiClient,
+    history: HistoryStore,
+    import_index: ImportIndex,
+    metric: str,
+    start: date,
+    end: date,
+    bucket: str = "day",
+    aggregate: str = "mean",
+    fetch_missing: bool = True,
+) -> dict[str, Any]:
+    """Return a metric's values for a date range.
+
+    Args:
+        api_client: API client used for days missing from the history
+        history: Local history store
+        import_index: Index remembering days without data
+        metric: Daily metric key
+        start: First day
+        end: Last day
+        bucket: Downsampling bucket
+        aggregate: Reduction applied to every bucket
+        fetch_missing: Whether to fetch days missing from the history
+
+    Returns:
+        The metric's name, unit, points and the number of fetched days
+    """
+    source = METRIC_CATALOG[metric]["source"]
+    fetched_days = 0
+
+    if fetch_missing:
+        await import_index.async_load()
+        stored = await history.async_read(source, start, end, ())
+        stored_days = {date.fromisoformat(day).toordinal() for day in stored["day"]}
+        last = min(end, date.today()).toordinal()
+        missing = import_index.exclude_empty(source, [
+            ordinal for ordinal in range(start.toordinal(), last + 1)
+            if ordinal not in stored_days
+        ])
+        if missing:
+            fetched_days = await _async_fetch_missing(
+                api_client, history, import_index, source, missing
+            )
+
+    columns = await history.async_read(source, start, end, (metric,))
+    return {
+        "metric": metric,
+        "name": metric_name(metric),
+        "unit": metric_unit(metric),
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "bucket": bucket,
+        "aggregate": aggregate,
+        "points": downsample(columns["day"], columns[metric], bucket, aggregate),
+        "fetched_days": fetched_days,
+    }
+
+
+async def _async_fetch_missing(
+    api_client: OuraApiClient,
+    history: HistoryStore,
+    import_index: ImportIndex,
+    source: str,
+    missing: list[int],
+) -> int:
+    """Fetch missing days of a source into the history store.
+
+    Returns:
+        Number of missing days covered by successful requests
+    """
+    documents: list[dict[str, Any]] = []
+    fetched: list[int] = []
+
+    for first, last in merge_gaps(missing, API_MAX_RANGE_DAYS.get(source)):
+        try:
+            result = await api_client.async_get_range(
+                source, date.fromordinal(first), date.fromordinal(last)
+            )
+        except Exception as err:
+            _LOGGER.warning(
+                "Failed to fetch %s data for %s to %s, returning stored days only: %s",
+                source,
+                date.fromordinal(first),
+                date.fromordinal(last),
+                err,
+            )
+            continue
+        documents.extend(result.get("data") or [])
+        fetched.extend(day for day in missing if first <= day <= last)
+
+    if not fetched:
+        return 0
+
+    if documents:
+        await history.async_add({source: {"data": documents}})
+
+    # Settled days the API returned nothing for are not requested again
+    stored = await history.async_read(
+        source, date.fromordinal(fetched[0]), date.fromordinal(fetched[-1]), ()
+    )
+    stored_days = {date.fromisoformat(day).toordinal() for day in stored["day"]}
+    settled = date.today().toordinal() - GAP_SCAN_SETTLE_DAYS
+    import_index.mark_empty(
+        source, [day for day in fetched if day not in stored_days and day <= settled]
+    )
+    return len(fetched)
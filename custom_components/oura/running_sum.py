@@ -0,0 +1,215 @@
+"""Running-sum engine for cumulative (has_sum) statistics.
+
+Home Assistant expects ``sum`` to be a running total, with ``state`` holding the
+period's own value. Daily totals such as steps are therefore accumulated in
+order on top of the last stored sum. The last stored sum is read from the
+recorder once per statistic and cached, so regular appends need no database
+access. When an import revises days that are already stored, only the rows
+from the first revised day onwards are read and shifted, and rows whose sum
+does not change are not rewritten.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import logging
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import (
+    get_last_statistics,
+    statistics_during_period,
+)
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_RUNNING_SUMS = f"{DOMAIN}_running_sums"
+
+# Windows searched, in order, for the row preceding a revised day
+REBASE_LOOKBACKS = (timedelta(days=2), timedelta(days=32), timedelta(days=366))
+
+
+def rebase(
+    base: float,
+    stored: list[tuple[float, float | None, float | None]],
+    points: list[tuple[float, float]],
+) -> tuple[list[tuple[float, float | None, float]], tuple[float, float] | None]:
+    """Merge new values into stored rows and recompute the running sum.
+
+    New points are accumulated on top of the previous row's sum. Stored rows
+    that are not replaced are shifted by the difference the new points made,
+    so the rebase only relies on stored sums. This keeps it correct for rows
+    compiled by the recorder itself, whose state is a meter reading rather
+    than the period's value.
+
+    Args:
+        base: Running sum of the last row before the first new point
+        stored: Stored (start_ts, state, sum) rows from the first new point on
+        points: New (start_ts, value) points, sorted; later duplicates win
+
+    Returns:
+        The (start_ts, state, sum) rows that must be written, and the last
+        (start_ts, sum) of the merged series
+    """
+    new_values = dict(points)
+    stored_rows = {start: (state, total) for start, state, total in stored if total is not None}
+
+    rows: list[tuple[float, float | None, float]] = []
+    previous = base
+    offset = 0.0
+    for start in sorted(new_values.keys() | stored_rows.keys()):
+        if start in new_values:
+            value = new_values[start]
+            total = previous + value
+            if start in stored_rows:
+                offset = total - stored_rows[start][1]
+            else:
+                offset += value
+            rows.append((start, value, total))
+        else:
+            state, stored_total = stored_rows[start]
+            total = stored_total + offset
+            if offset:
+                rows.append((start, state, total))
+        previous = total
+
+    last = (start, previous) if new_values or stored_rows else None
+    return rows, last
+
+
+class RunningSumEngine:
+    """Accumulate daily values into running sums per statistic."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the engine."""
+        self.hass = hass
+        # statistic_id -> (start_ts, sum) of the last stored row, or None
+        self._last: dict[str, tuple[float, float] | None] = {}
+
+    def evict(self, *statistic_ids: str) -> None:
+        """Forget the cached last rows, e.g. after a statistic was renamed."""
+        for statistic_id in statistic_ids:
+            self._last.pop(statistic_id, None)
+
+    async def async_apply(
+        self,
+        statistic_id: str,
+        points: list[tuple[datetime, float]],
+    ) -> list[dict[str, Any]]:
+        """Return the statistics rows to import for new daily values.
+
+        Args:
+            statistic_id: Statistic the values belong to
+            points: New (start, value) points
+
+        Returns:
+            Rows with "start", "state" and "sum" keys, in order
+        """
+        if not points:
+            return []
+
+        new_points = sorted((start.timestamp(), value) for start, value in points)
+        first = new_points[0][0]
+
+        if statistic_id not in self._last:
+            self._last[statistic_id] = await self._async_read_last(statistic_id)
+        last = self._last[statistic_id]
+
+        if last is None or first > last[0]:
+            # Common case: appending after everything already stored
+            base = last[1] if last else 0.0
+            stored: list[tuple[float, float | None, float | None]] = []
+        else:
+            stored = await self._async_read_rows(statistic_id, first, None)
+            base = await self._async_base_before(statistic_id, first)
+            _LOGGER.debug(
+                "Rebasing %d stored %s rows after revision of %s",
+                len(stored),
+                statistic_id,
+                datetime.fromtimestamp(first, tz=timezone.utc).date(),
+            )
+
+        rows, merged_last = rebase(base, stored, new_points)
+        if merged_last is not None:
+            self._last[statistic_id] = merged_last
+
+        return [
+            {
+                "start": datetime.fromtimestamp(start, tz=timezone.utc),
+                "state": state,
+                "sum": total,
+            }
+            for start, state, total in rows
+        ]
+
+    async def _async_base_before(self, statistic_id: str, first: float) -> float:
+        """Return the stored running sum of the last row before ``first``.
+
+        Widening windows are queried so the usual case (a row on the previous
+        day) reads only a handful of rows.
+        """
+        for lookback in REBASE_LOOKBACKS:
+            previous = await self._async_read_rows(
+                statistic_id, first - lookback.total_seconds(), first
+            )
+            for _start, _state, total in reversed(previous):
+                if total is not None:
+                    return total
+        return 0.0
+
+    async def _async_read_last(self, statistic_id: str) -> tuple[float, float] | None:
+        """Read the last stored (start_ts, sum) for a statistic."""
+        try:
+            recorder = get_instance(self.hass)
+        except KeyError:
+            return None
+
+        result = await recorder.async_add_executor_job(
+            get_last_statistics, self.hass, 1, statistic_id, True, {"sum"}
+        )
+        for row in result.get(statistic_id, []):
+            if row.get("sum") is not None:
+                return _row_start(row), row["sum"]
+        return None
+
+    async def _async_read_rows(
+        self,
+        statistic_id: str,
+        start: float,
+        end: float | None,
+    ) -> list[tuple[float, float | None, float | None]]:
+        """Read stored (start_ts, state, sum) rows in a time range."""
+        try:
+            recorder = get_instance(self.hass)
+        except KeyError:
+            return []
+
+        result = await recorder.async_add_executor_job(
+            statistics_during_period,
+            self.hass,
+            datetime.fromtimestamp(start, tz=timezone.utc),
+            datetime.fromtimestamp(end, tz=timezone.utc) if end is not None else None,
+            {statistic_id},
+            "hour",
+            None,
+            {"state", "sum"},
+        )
+        return [
+            (_row_start(row), row.get("state"), row.get("sum"))
+            for row in result.get(statistic_id, [])
+        ]
+
+
+def _row_start(row: dict[str, Any]) -> float:
+    """Return a statistics row start as a POSIX timestamp."""
+    start = row["start"]
+    return start.timestamp() if isinstance(start, datetime) else float(start)
+
+
+def get_running_sums(hass: HomeAssistant) -> RunningSumEngine:
+    """Return the shared running-sum engine."""
+    if (engine := hass.data.get(DATA_RUNNING_SUMS)) is None:
+        engine = hass.data[DATA_RUNNING_SUMS] = RunningSumEngine(hass)
+    return engine
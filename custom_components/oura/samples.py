@@ -0,0 +1,325 @@
+"""Compact decoding of Oura SampleModel series.
+
+The Oura API returns intraday series (sleep HRV, sleep heart rate, activity MET)
+as a ``SampleModel``: a start timestamp, a sampling interval in seconds and a
+list of items that may contain nulls. These helpers decode the items into a
+compact ``array`` (nulls become NaN) and aggregate them into hour buckets that
+can be imported as long-term statistics.
+
+Per-epoch classification strings (``sleep_phase_5_min``, ``movement_30_sec``)
+are decoded into bytes with one numeric code per epoch and summarized without
+any per-character Python loops.
+"""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timedelta, timezone
+import math
+import re
+from typing import Any, Final, Iterator
+
+HOUR_SECONDS = 3600
+
+
+class SampleSeries:
+    """A decoded SampleModel series backed by a float array."""
+
+    __slots__ = ("start", "interval", "values")
+
+    def __init__(self, start: datetime, interval: float, values: array) -> None:
+        """Initialize the series."""
+        self.start = start
+        self.interval = interval
+        self.values = values
+
+    def __len__(self) -> int:
+        """Return the number of samples (including missing ones)."""
+        return len(self.values)
+
+    @property
+    def end(self) -> datetime:
+        """Return the time just after the last sample."""
+        return self.start + timedelta(seconds=self.interval * len(self.values))
+
+    def latest(self) -> float | None:
+        """Return the most recent non-null sample value."""
+        for value in reversed(self.values):
+            if value == value:  # NaN check
+                return value
+        return None
+
+    def iter_buckets(
+        self,
+        bucket_seconds: int = HOUR_SECONDS,
+        since: datetime | None = None,
+    ) -> Iterator[tuple[datetime, float, float, float, int]]:
+        """Aggregate samples into UTC-aligned buckets.
+
+        Args:
+            bucket_seconds: Bucket width in seconds (must divide one day)
+            since: Skip buckets starting before this time
+
+        Yields:
+            Tuples of (bucket_start, mean, min, max, sample_count) for every
+            bucket holding at least one non-null sample
+        """
+        values = self.values
+        for bucket_start, index, stop in _iter_bucket_ranges(
+            self.start, self.interval, len(values), bucket_seconds, since
+        ):
+            present = [value for value in values[index:stop] if value == value]
+            if present:
+                yield (
+                    bucket_start,
+                    sum(present) / len(present),
+                    min(present),
+                    max(present),
+                    len(present),
+                )
+
+
+class EpochSeries:
+    """A per-epoch classification string decoded to one byte per epoch.
+
+    Oura encodes hypnograms and movement as digit strings ("4423321...").
+    The digits are translated to their numeric values in a single C-level
+    pass and kept as immutable bytes, so counting and slicing never copy.
+    """
+
+    __slots__ = ("start", "interval", "codes")
+
+    def __init__(self, start: datetime, interval: float, codes: bytes) -> None:
+        """Initialize the series."""
+        self.start = start
+        self.interval = interval
+        self.codes = codes
+
+    def __len__(self) -> int:
+        """Return the number of epochs."""
+        return len(self.codes)
+
+    def iter_buckets(
+        self,
+        match: bytes,
+        bucket_seconds: int = HOUR_SECONDS,
+        since: datetime | None = None,
+    ) -> Iterator[tuple[datetime, int, int]]:
+        """Count epochs matching the given codes per UTC-aligned bucket.
+
+        Args:
+            match: Codes to count (e.g. bytes((4,)) for awake)
+            bucket_seconds: Bucket width in seconds (must divide one day)
+            since: Skip buckets starting before this time
+
+        Yields:
+            Tuples of (bucket_start, matching_epochs, total_epochs)
+        """
+        codes = self.codes
+        for bucket_start, index, stop in _iter_bucket_ranges(
+            self.start, self.interval, len(codes), bucket_seconds, since
+        ):
+            if stop > index:
+                matched = sum(codes.count(code, index, stop) for code in match)
+                yield bucket_start, matched, stop - index
+
+
+# Translates ASCII digits to their numeric byte values ("4" -> 0x04)
+_DIGIT_TABLE = bytes.maketrans(b"0123456789", bytes(range(10)))
+_RUN_PATTERN = re.compile(rb"(.)\1*", re.DOTALL)
+_AWAKE_PATTERN = re.compile(rb"\x04+")
+_RESTLESS_PATTERN = re.compile(rb"[\x02-\x04]+")
+
+# Hypnogram (sleep_phase_5_min) codes
+PHASE_DEEP: Final = 1
+PHASE_LIGHT: Final = 2
+PHASE_REM: Final = 3
+PHASE_AWAKE: Final = 4
+
+# Movement (movement_30_sec) codes
+MOVEMENT_STILL: Final = 1
+MOVEMENT_RESTLESS: Final = 2
+MOVEMENT_TOSSING: Final = 3
+MOVEMENT_ACTIVE: Final = 4
+
+# Activity (class_5_min) codes
+ACTIVITY_NON_WEAR: Final = 0
+ACTIVITY_REST: Final = 1
+ACTIVITY_INACTIVE: Final = 2
+ACTIVITY_LOW: Final = 3
+ACTIVITY_MEDIUM: Final = 4
+ACTIVITY_HIGH: Final = 5
+
+
+def decode_classes(value: str | None) -> bytes | None:
+    """Decode a digit classification string into one byte per epoch.
+
+    Args:
+        value: Classification string such as "444423323441114"
+
+    Returns:
+        Bytes holding the numeric class of each epoch, or None if invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return value.encode("ascii").translate(_DIGIT_TABLE)
+    except UnicodeEncodeError:
+        return None
+
+
+def decode_epochs(
+    value: str | None,
+    start: str | None,
+    interval: float,
+    since: datetime | None = None,
+) -> EpochSeries | None:
+    """Decode a classification string starting at the given timestamp.
+
+    Args:
+        value: Classification string
+        start: ISO timestamp of the first epoch (e.g. bedtime_start)
+        interval: Epoch length in seconds
+        since: Only decode epochs starting at or after this time
+
+    Returns:
+        Decoded series, or None if the string or timestamp is missing or no
+        epochs remain after ``since``
+    """
+    start_dt = _parse_sample_timestamp(start)
+    if not value or start_dt is None:
+        return None
+
+    skip = _items_before(start_dt, interval, since)
+    if skip >= len(value):
+        return None
+    if skip:
+        value = value[skip:]
+        start_dt += timedelta(seconds=interval * skip)
+
+    codes = decode_classes(value)
+    if codes is None:
+        return None
+    return EpochSeries(start_dt, float(interval), codes)
+
+
+def count_transitions(codes: bytes) -> int:
+    """Count changes between consecutive epoch classes."""
+    if not codes:
+        return 0
+    return sum(1 for _ in _RUN_PATTERN.finditer(codes)) - 1
+
+
+def count_wake_bouts(codes: bytes) -> int:
+    """Count awake runs between sleep onset and final awakening."""
+    first, last = _sleep_bounds(codes)
+    if first is None:
+        return 0
+    return sum(1 for _ in _AWAKE_PATTERN.finditer(codes, first, last))
+
+
+def count_restless_periods(codes: bytes) -> int:
+    """Count runs of restless, tossing-and-turning or active movement."""
+    return sum(1 for _ in _RESTLESS_PATTERN.finditer(codes))
+
+
+def _sleep_bounds(codes: bytes) -> tuple[int | None, int]:
+    """Return the first and one-past-last index of non-awake epochs."""
+    awake = bytes((PHASE_AWAKE,))
+    stripped = codes.lstrip(awake)
+    if not stripped:
+        return None, 0
+    first = len(codes) - len(stripped)
+    last = len(codes.rstrip(awake))
+    return first, last
+
+
+def _items_before(start: datetime, interval: float, since: datetime | None) -> int:
+    """Return how many items of a series start before ``since``."""
+    if since is None or since <= start:
+        return 0
+    return math.ceil((since - start).total_seconds() / interval)
+
+
+def _iter_bucket_ranges(
+    start: datetime,
+    interval: float,
+    count: int,
+    bucket_seconds: int,
+    since: datetime | None,
+) -> Iterator[tuple[datetime, int, int]]:
+    """Yield (bucket_start, first_index, stop_index) for each bucket of a series."""
+    if not count or interval <= 0:
+        return
+
+    origin = start.timestamp()
+    bucket_start = math.floor(origin / bucket_seconds) * bucket_seconds
+    if since is not None:
+        bucket_start = max(
+            bucket_start, math.floor(since.timestamp() / bucket_seconds) * bucket_seconds
+        )
+
+    index = max(0, math.ceil((bucket_start - origin) / interval))
+    while index < count:
+        bucket_end = bucket_start + bucket_seconds
+        stop = min(count, max(index, math.ceil((bucket_end - origin) / interval)))
+        yield datetime.fromtimestamp(bucket_start, tz=timezone.utc), index, stop
+        index = stop
+        bucket_start = bucket_end
+
+
+def decode_sample(
+    sample: dict[str, Any] | None,
+    since: datetime | None = None,
+) -> SampleSeries | None:
+    """Decode a SampleModel dictionary into a SampleSeries.
+
+    Args:
+        sample: SampleModel with "timestamp", "interval" and "items"
+        since: Only decode items recorded at or after this time
+
+    Returns:
+        Decoded series, or None if the sample is missing, malformed or has
+        no items after ``since``
+    """
+    if not sample:
+        return None
+
+    items = sample.get("items")
+    interval = sample.get("interval")
+    start = _parse_sample_timestamp(sample.get("timestamp"))
+    if not items or not interval or start is None:
+        return None
+
+    skip = _items_before(start, interval, since)
+    if skip >= len(items):
+        return None
+    if skip:
+        items = items[skip:]
+        start += timedelta(seconds=interval * skip)
+
+    nan = math.nan
+    try:
+        values = array("f", [nan if item is None else item for item in items])
+    except TypeError:
+        return None
+
+    return SampleSeries(start, float(interval), values)
+
+
+def _parse_sample_timestamp(value: str | None) -> datetime | None:
+    """Parse a SampleModel timestamp to an aware UTC datetime.
+
+    Naive timestamps are assumed to be UTC.
+    """
+    if not value:
+        return None
+
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
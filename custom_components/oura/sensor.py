@@ -9,8 +9,11 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .baselines import BASELINE_SENSOR_TYPES
 from .const import ATTRIBUTION, DOMAIN, SENSOR_TYPES
 from .coordinator import OuraDataUpdateCoordinator
+from .health import HEALTH_SENSOR_TYPES
+from .metrics import METRIC_CATALOG, uses_external_statistics
 
 
 async def async_setup_entry(
@@ -21,10 +24,19 @@ async def async_setup_entry(
     """Set up Oura Ring sensors."""
     coordinator: OuraDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
+    external_statistics = uses_external_statistics(entry)
     entities = [
-        OuraSensor(coordinator, sensor_type, sensor_info)
+        OuraSensor(coordinator, sensor_type, sensor_info, external_statistics)
         for sensor_type, sensor_info in SENSOR_TYPES.items()
     ]
+    entities.extend(
+        OuraBaselineSensor(coordinator, sensor_type, sensor_info)
+        for sensor_type, sensor_info in BASELINE_SENSOR_TYPES.items()
+    )
+    entities.extend(
+        OuraHealthSensor(coordinator, sensor_type, sensor_info)
+        for sensor_type, sensor_info in HEALTH_SENSOR_TYPES.items()
+    )
 
     async_add_entities(entities)
 
@@ -40,6 +52,7 @@ class OuraSensor(CoordinatorEntity[OuraDataUpdateCoordinator], SensorEntity):
         coordinator: OuraDataUpdateCoordinator,
         sensor_type: str,
         sensor_info: dict,
+        external_statistics: bool = False,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -51,6 +64,10 @@ class OuraSensor(CoordinatorEntity[OuraDataUpdateCoordinator], SensorEntity):
         self._attr_native_unit_of_measurement = sensor_info.get("unit")
         self._attr_device_class = sensor_info.get("device_class")
         self._attr_state_class = sensor_info.get("state_class")
+        if external_statistics and METRIC_CATALOG.get(sensor_type, {}).get("statistic"):
+            # History lives in oura:<metric> statistics; don't let the recorder
+            # compile a second, daily-constant series from the entity state
+            self._attr_state_class = None
         self._attr_entity_category = sensor_info.get("entity_category")
         
         # Set options for enum sensors
@@ -87,3 +104,30 @@ class OuraSensor(CoordinatorEntity[OuraDataUpdateCoordinator], SensorEntity):
             and self._sensor_type in self.coordinator.data
             and self.coordinator.data[self._sensor_type] is not None
         )
+
+
+class OuraBaselineSensor(OuraSensor):
+    """Rolling baseline or z-score of a daily metric."""
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the statistics of the baseline window."""
+        return self.coordinator.baselines.attributes(self._sensor_type)
+
+
+class OuraHealthSensor(OuraSensor):
+    """Health metric of the integration's API requests and refreshes."""
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        return self.coordinator.health_values.get(self._sensor_type)
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available.
+
+        Health metrics are tracked even while the API fails, so they don't
+        depend on the coordinator's data.
+        """
+        return self.native_value is not None
@@ -0,0 +1,250 @@
+"""Services of the Oura Ring integration."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError, Unauthorized, UnknownUser
+import homeassistant.helpers.config_validation as cv
+
+from .const import (
+    BACKFILL_MAX_DAYS,
+    DEFAULT_BACKFILL_CONCURRENCY,
+    DOMAIN,
+    MAX_BACKFILL_CONCURRENCY,
+    MAX_HISTORICAL_MONTHS,
+    PROFILE_MAX_BACKFILL_DAYS,
+    PROFILE_TARGET_BACKFILL,
+    PROFILE_TARGET_REFRESH,
+    PROFILE_TOP_ENTRIES,
+    QUERY_MAX_DAYS,
+)
+from .metrics import DAILY_METRICS
+from .query import AGGREGATES, BUCKETS, async_query
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_AGGREGATE = "aggregate"
+ATTR_BUCKET = "bucket"
+ATTR_CONCURRENCY = "concurrency"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_DAYS = "days"
+ATTR_DRY_RUN = "dry_run"
+ATTR_END = "end"
+ATTR_ENDPOINTS = "endpoints"
+ATTR_FETCH_MISSING = "fetch_missing"
+ATTR_METRIC = "metric"
+ATTR_START = "start"
+ATTR_TARGET = "target"
+ATTR_TOP = "top"
+
+SERVICE_BACKFILL = "backfill"
+SERVICE_PROFILE = "profile"
+SERVICE_QUERY = "query"
+SERVICE_REPAIR_GAPS = "repair_gaps"
+
+REPAIR_GAPS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_DAYS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_HISTORICAL_MONTHS * 30)
+        ),
+    }
+)
+
+QUERY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_METRIC): vol.In(
+            [metric for metrics in DAILY_METRICS.values() for metric in metrics]
+        ),
+        vol.Required(ATTR_START): cv.date,
+        vol.Required(ATTR_END): cv.date,
+        vol.Optional(ATTR_BUCKET, default="day"): vol.In(list(BUCKETS)),
+        vol.Optional(ATTR_AGGREGATE, default="mean"): vol.In(list(AGGREGATES)),
+        vol.Optional(ATTR_FETCH_MISSING, default=True): cv.boolean,
+    }
+)
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+        vol.Optional(ATTR_ENDPOINTS, default=list(DAILY_METRICS)): vol.All(
+            cv.ensure_list, [vol.In(list(DAILY_METRICS))]
+        ),
+        vol.Optional(ATTR_CONCURRENCY, default=DEFAULT_BACKFILL_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_BACKFILL_CONCURRENCY)
+        ),
+        vol.Optional(ATTR_DRY_RUN, default=False): cv.boolean,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_TARGET, default=PROFILE_TARGET_REFRESH): vol.In(
+            [PROFILE_TARGET_REFRESH, PROFILE_TARGET_BACKFILL]
+        ),
+        vol.Optional(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+        vol.Optional(ATTR_TOP, default=PROFILE_TOP_ENTRIES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
+
+async def _async_check_admin(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Raise unless the call comes from an admin or from Home Assistant itself."""
+    if (user_id := call.context.user_id) is None:
+        return
+    if (user := await hass.auth.async_get_user(user_id)) is None:
+        raise UnknownUser(context=call.context)
+    if not user.is_admin:
+        raise Unauthorized(context=call.context)
+
+
+def _get_coordinators(hass: HomeAssistant, call: ServiceCall) -> dict:
+    """Return the coordinators a service call targets, keyed by entry ID."""
+    coordinators = hass.data.get(DOMAIN, {})
+    if (entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID)) is None:
+        return dict(coordinators)
+    if entry_id not in coordinators:
+        raise ServiceValidationError(f"Oura Ring config entry {entry_id} is not loaded")
+    return {entry_id: coordinators[entry_id]}
+
+
+def _get_coordinator(hass: HomeAssistant, call: ServiceCall):
+    """Return the single coordinator a service call targets."""
+    coordinators = _get_coordinators(hass, call)
+    if len(coordinators) != 1:
+        raise ServiceValidationError(
+            "Specify the config_entry_id of the Oura Ring account to use"
+            if coordinators
+            else "No Oura Ring account is loaded"
+        )
+    return next(iter(coordinators.values()))
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def async_repair_gaps(call: ServiceCall) -> ServiceResponse:
+        """Fetch and import the days missing from the statistics."""
+        results = {}
+        for entry_id, coordinator in _get_coordinators(hass, call).items():
+            results[entry_id] = await coordinator.gap_scanner.async_scan(call.data.get(ATTR_DAYS))
+        return {"entries": results}
+
+    async def async_query_history(call: ServiceCall) -> ServiceResponse:
+        """Return a metric's daily values for a date range."""
+        if call.data[ATTR_START] > call.data[ATTR_END]:
+            raise ServiceValidationError("The start date must not be after the end date")
+        if (call.data[ATTR_END] - call.data[ATTR_START]).days >= QUERY_MAX_DAYS:
+            raise ServiceValidationError(f"Query at most {QUERY_MAX_DAYS} days at a time")
+        coordinator = _get_coordinator(hass, call)
+        return await async_query(
+            coordinator.api_client,
+            coordinator.history,
+            coordinator.import_index,
+            call.data[ATTR_METRIC],
+            call.data[ATTR_START],
+            call.data[ATTR_END],
+            call.data[ATTR_BUCKET],
+            call.data[ATTR_AGGREGATE],
+            call.data[ATTR_FETCH_MISSING],
+        )
+
+    async def async_backfill(call: ServiceCall) -> ServiceResponse:
+        """Plan a backfill of a date range and run it in the background."""
+        await _async_check_admin(hass, call)
+        start = call.data[ATTR_START]
+        end = min(call.data.get(ATTR_END, date.today()), date.today())
+        if start > end:
+            raise ServiceValidationError("The start date must not be after the end date or today")
+        if (end - start).days >= BACKFILL_MAX_DAYS:
+            raise ServiceValidationError(f"Backfill at most {BACKFILL_MAX_DAYS} days at a time")
+        coordinator = _get_coordinator(hass, call)
+        dry_run = call.data[ATTR_DRY_RUN]
+        if coordinator.backfill.running and not dry_run:
+            raise ServiceValidationError("A backfill is already running for this account")
+        return coordinator.backfill.async_start(
+            list(dict.fromkeys(call.data[ATTR_ENDPOINTS])),
+            start,
+            end,
+            call.data[ATTR_CONCURRENCY],
+            dry_run,
+        )
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile a refresh or a short backfill and write the results."""
+        # cProfile and tracemalloc are only loaded when a profile is requested
+        from .profiler import get_profiler
+
+        await _async_check_admin(hass, call)
+        coordinator = _get_coordinator(hass, call)
+        profiler = get_profiler(hass)
+        if profiler.running:
+            raise ServiceValidationError("A profile is already running")
+
+        if call.data[ATTR_TARGET] == PROFILE_TARGET_REFRESH:
+            run = coordinator.async_refresh
+        else:
+            if (start := call.data.get(ATTR_START)) is None:
+                raise ServiceValidationError("Profiling a backfill requires a start date")
+            end = min(
+                call.data.get(ATTR_END, start + timedelta(days=PROFILE_MAX_BACKFILL_DAYS - 1)),
+                date.today(),
+            )
+            if start > end:
+                raise ServiceValidationError("The start date must not be after the end date or today")
+            if (end - start).days >= PROFILE_MAX_BACKFILL_DAYS:
+                raise ServiceValidationError(
+                    f"Profile at most {PROFILE_MAX_BACKFILL_DAYS} days of backfill"
+                )
+            if coordinator.backfill.running:
+                raise ServiceValidationError("A backfill is already running for this account")
+
+            async def run() -> None:
+                coordinator.backfill.async_start(
+                    list(DAILY_METRICS), start, end, DEFAULT_BACKFILL_CONCURRENCY
+                )
+                await coordinator.backfill.async_wait()
+
+        return await profiler.async_profile(
+            coordinator.entry.entry_id, call.data[ATTR_TARGET], run, call.data[ATTR_TOP]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL,
+        async_backfill,
+        schema=BACKFILL_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY,
+        async_query_history,
+        schema=QUERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPAIR_GAPS,
+        async_repair_gaps,
+        schema=REPAIR_GAPS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
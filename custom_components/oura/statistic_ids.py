@@ -0,0 +1,144 @@
+"""Resolve the statistic_id used to import each Oura metric.
+
+Daily statistics are imported under the sensor entity of the metric, so they
+join the history the recorder compiles from the entity's states. The
+metric → entity_id map is built once per config entry from the entity registry
+and kept current from ``entity_registry_updated`` events, instead of querying
+the registry for every metric on every import.
+
+On a fresh install the statistics are imported before the sensor platform has
+created any entities, so a guessed ``sensor.oura_ring_<metric>`` id is used.
+When the real entity is created under a different id, the statistics imported
+under the guessed id are migrated to it.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import logging
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+from .running_sum import get_running_sums
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STATISTIC_IDS = f"{DOMAIN}_statistic_ids"
+
+
+def fallback_statistic_id(sensor_key: str) -> str:
+    """Return the default entity ID a metric's sensor is expected to get."""
+    return f"sensor.oura_ring_{sensor_key}"
+
+
+class StatisticIdResolver:
+    """Map metric keys of one config entry to statistic IDs."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the resolver."""
+        self.hass = hass
+        self._entry_id = entry.entry_id
+        self._unique_id_prefix = f"{entry.entry_id}_"
+        self._entity_ids: dict[str, str] | None = None
+        # Metric key -> guessed statistic_id that statistics were imported under
+        self._fallbacks: dict[str, str] = {}
+
+    @callback
+    def async_build(self, sensor_keys: Iterable[str]) -> None:
+        """Look up the sensor entity of every metric once."""
+        registry = er.async_get(self.hass)
+        self._entity_ids = {}
+        for sensor_key in sensor_keys:
+            entity_id = registry.async_get_entity_id(
+                "sensor", DOMAIN, f"{self._unique_id_prefix}{sensor_key}"
+            )
+            if entity_id:
+                self._entity_ids[sensor_key] = entity_id
+
+    @property
+    def built(self) -> bool:
+        """Return whether the metric map has been built."""
+        return self._entity_ids is not None
+
+    @callback
+    def async_resolve(self, sensor_key: str) -> str:
+        """Return the statistic_id for a metric.
+
+        Falls back to the default entity ID when the sensor does not exist
+        yet, and remembers it so the statistics can be migrated later.
+        """
+        if self._entity_ids is not None and (entity_id := self._entity_ids.get(sensor_key)):
+            return entity_id
+
+        statistic_id = fallback_statistic_id(sensor_key)
+        self._fallbacks[sensor_key] = statistic_id
+        return statistic_id
+
+    @callback
+    def async_handle_registry_event(self, event: Event) -> None:
+        """Keep the metric map current as sensor entities change."""
+        if self._entity_ids is None:
+            return
+
+        action = event.data.get("action")
+        entity_id = event.data.get("entity_id")
+
+        if action == "remove":
+            for sensor_key in [key for key, value in self._entity_ids.items() if value == entity_id]:
+                del self._entity_ids[sensor_key]
+            return
+
+        registry_entry = er.async_get(self.hass).async_get(entity_id)
+        if (
+            registry_entry is None
+            or registry_entry.platform != DOMAIN
+            or not registry_entry.unique_id.startswith(self._unique_id_prefix)
+        ):
+            return
+
+        sensor_key = registry_entry.unique_id[len(self._unique_id_prefix):]
+        self._entity_ids[sensor_key] = entity_id
+
+        # Renames are migrated by the recorder itself; only statistics imported
+        # under a guessed ID before the entity existed need moving
+        fallback = self._fallbacks.pop(sensor_key, None)
+        if action == "create" and fallback and fallback != entity_id:
+            _LOGGER.info("Migrating %s statistics from %s to %s", sensor_key, fallback, entity_id)
+            try:
+                get_instance(self.hass).async_update_statistics_metadata(
+                    fallback, new_statistic_id=entity_id
+                )
+            except KeyError:
+                _LOGGER.debug("Recorder not available, %s statistics not migrated", sensor_key)
+                return
+            # Imported days and cached running sums are keyed by statistic_id
+            if (coordinator := self.hass.data.get(DOMAIN, {}).get(self._entry_id)) is not None:
+                coordinator.import_index.rekey(fallback, entity_id)
+            get_running_sums(self.hass).evict(fallback, entity_id)
+
+
+@callback
+def get_statistic_id_resolver(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+) -> StatisticIdResolver:
+    """Return the statistic_id resolver of a config entry, creating it once."""
+    resolvers: dict[str, StatisticIdResolver] = hass.data.setdefault(DATA_STATISTIC_IDS, {})
+    if (resolver := resolvers.get(entry.entry_id)) is not None:
+        return resolver
+
+    resolver = resolvers[entry.entry_id] = StatisticIdResolver(hass, entry)
+    unsubscribe = hass.bus.async_listen(
+        er.EVENT_ENTITY_REGISTRY_UPDATED, resolver.async_handle_registry_event
+    )
+
+    @callback
+    def _async_remove() -> None:
+        unsubscribe()
+        resolvers.pop(entry.entry_id, None)
+
+    entry.async_on_unload(_async_remove)
+    return resolver
@@ -6,6 +6,7 @@ as Home Assistant long-term statistics, significantly reducing code duplication.
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from functools import lru_cache
 import logging
 from typing import Any, Callable
 
@@ -19,17 +20,38 @@ from homeassistant.components.recorder.statistics import (
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import entity_registry as er
 from homeassistant.const import (
     UnitOfTemperature,
     UnitOfTime,
     UnitOfEnergy,
 )
 
+from .backpressure import get_backpressure
 from .const import DOMAIN
+from .running_sum import get_running_sums
+from .import_index import ImportIndex
+from .metrics import (
+    METRIC_CATALOG,
+    METRIC_SOURCES,
+    SOURCE_EXTRACTORS,
+    SOURCE_REDUCERS,
+    SOURCE_SERIES,
+    STATISTIC_MEAN,
+    STATISTIC_SUM,
+    daily_documents,
+    metric_name,
+    metric_unit,
+    uses_external_statistics,
+)
+from .samples import decode_epochs, decode_sample
+from .statistic_ids import StatisticIdResolver, get_statistic_id_resolver
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maximum number of hourly series points held in memory before they are
+# handed to the recorder, so multi-year backfills stay bounded
+SERIES_FLUSH_POINTS = 1000
+
 
 def _get_unit_class(unit: str | None) -> str | None:
     """Map unit of measurement to device class for statistics.
@@ -54,144 +76,29 @@ def _get_unit_class(unit: str | None) -> str | None:
     # "%", "ml/kg/min", "years"
     return None
 
-# Statistics metadata for all Oura sensors
+# Statistics metadata for every catalog metric recorded as a statistic
 STATISTICS_METADATA = {
-    "sleep_score": {"name": "Sleep Score", "unit": "score", "has_mean": True, "has_sum": False},
-    "sleep_efficiency": {"name": "Sleep Efficiency", "unit": "score", "has_mean": True, "has_sum": False},
-    "restfulness": {"name": "Restfulness", "unit": "score", "has_mean": True, "has_sum": False},
-    "sleep_timing": {"name": "Sleep Timing", "unit": "score", "has_mean": True, "has_sum": False},
-    "total_sleep_duration": {"name": "Total Sleep Duration", "unit": UnitOfTime.HOURS, "has_mean": True, "has_sum": False},
-    "deep_sleep_duration": {"name": "Deep Sleep Duration", "unit": UnitOfTime.HOURS, "has_mean": True, "has_sum": False},
-    "rem_sleep_duration": {"name": "REM Sleep Duration", "unit": UnitOfTime.HOURS, "has_mean": True, "has_sum": False},
-    "light_sleep_duration": {"name": "Light Sleep Duration", "unit": UnitOfTime.HOURS, "has_mean": True, "has_sum": False},
-    "awake_time": {"name": "Awake Time", "unit": UnitOfTime.HOURS, "has_mean": True, "has_sum": False},
-    "sleep_latency": {"name": "Sleep Latency", "unit": UnitOfTime.MINUTES, "has_mean": True, "has_sum": False},
-    "time_in_bed": {"name": "Time in Bed", "unit": UnitOfTime.HOURS, "has_mean": True, "has_sum": False},
-    "deep_sleep_percentage": {"name": "Deep Sleep Percentage", "unit": "%", "has_mean": True, "has_sum": False},
-    "rem_sleep_percentage": {"name": "REM Sleep Percentage", "unit": "%", "has_mean": True, "has_sum": False},
-    "average_sleep_hrv": {"name": "Average Sleep HRV", "unit": "ms", "has_mean": True, "has_sum": False},
-    "readiness_score": {"name": "Readiness Score", "unit": "score", "has_mean": True, "has_sum": False},
-    "temperature_deviation": {"name": "Temperature Deviation", "unit": UnitOfTemperature.CELSIUS, "has_mean": True, "has_sum": False},
-    "resting_heart_rate": {"name": "Resting Heart Rate Score", "unit": "score", "has_mean": True, "has_sum": False},
-    "hrv_balance": {"name": "HRV Balance Score", "unit": "score", "has_mean": True, "has_sum": False},
-    "activity_score": {"name": "Activity Score", "unit": "score", "has_mean": True, "has_sum": False},
-    "steps": {"name": "Steps", "unit": "steps", "has_mean": False, "has_sum": True},
-    "active_calories": {"name": "Active Calories", "unit": UnitOfEnergy.KILO_CALORIE, "has_mean": False, "has_sum": True},
-    "total_calories": {"name": "Total Calories", "unit": UnitOfEnergy.KILO_CALORIE, "has_mean": False, "has_sum": True},
-    "target_calories": {"name": "Target Calories", "unit": UnitOfEnergy.KILO_CALORIE, "has_mean": True, "has_sum": False},
-    "met_min_high": {"name": "High Activity MET Minutes", "unit": "METâ‹…min", "has_mean": False, "has_sum": True},
-    "met_min_medium": {"name": "Medium Activity MET Minutes", "unit": "METâ‹…min", "has_mean": False, "has_sum": True},
-    "met_min_low": {"name": "Low Activity MET Minutes", "unit": "METâ‹…min", "has_mean": False, "has_sum": True},
-    "average_heart_rate": {"name": "Average Heart Rate", "unit": "bpm", "has_mean": True, "has_sum": False},
-    "min_heart_rate": {"name": "Minimum Heart Rate", "unit": "bpm", "has_mean": True, "has_sum": False},
-    "max_heart_rate": {"name": "Maximum Heart Rate", "unit": "bpm", "has_mean": True, "has_sum": False},
-    "stress_high_duration": {"name": "Stress High Duration", "unit": UnitOfTime.MINUTES, "has_mean": True, "has_sum": False},
-    "recovery_high_duration": {"name": "Recovery High Duration", "unit": UnitOfTime.MINUTES, "has_mean": True, "has_sum": False},
-    "stress_day_summary": {"name": "Stress Day Summary", "unit": None, "has_mean": False, "has_sum": False},
-    "resilience_level": {"name": "Resilience Level", "unit": None, "has_mean": False, "has_sum": False},
-    "sleep_recovery_score": {"name": "Sleep Recovery Score", "unit": "score", "has_mean": True, "has_sum": False},
-    "daytime_recovery_score": {"name": "Daytime Recovery Score", "unit": "score", "has_mean": True, "has_sum": False},
-    "stress_resilience_score": {"name": "Stress Resilience Score", "unit": "score", "has_mean": True, "has_sum": False},
-    "spo2_average": {"name": "SpO2 Average", "unit": "%", "has_mean": True, "has_sum": False},
-    "breathing_disturbance_index": {"name": "Breathing Disturbance Index", "unit": None, "has_mean": True, "has_sum": False},
-    "vo2_max": {"name": "VO2 Max", "unit": "ml/kg/min", "has_mean": True, "has_sum": False},
-    "cardiovascular_age": {"name": "Cardiovascular Age", "unit": "years", "has_mean": True, "has_sum": False},
-    "optimal_bedtime_start": {"name": "Optimal Bedtime Start", "unit": None, "has_mean": False, "has_sum": False},
-    "optimal_bedtime_end": {"name": "Optimal Bedtime End", "unit": None, "has_mean": False, "has_sum": False},
+    key: {
+        "name": metric_name(key),
+        "unit": metric_unit(key),
+        "has_mean": descriptor["statistic"] == STATISTIC_MEAN,
+        "has_sum": descriptor["statistic"] == STATISTIC_SUM,
+        # Series without a sensor entity are imported as external statistics
+        **({"external": True} if "series" in descriptor else {}),
+    }
+    for key, descriptor in METRIC_CATALOG.items()
+    if descriptor["statistic"]
 }
 
-# Configuration mapping API data sources to sensor mappings
-DATA_SOURCE_CONFIG = {
-    "sleep": {
-        "mappings": [
-            {"sensor_key": "sleep_score", "api_path": "score"},
-            {"sensor_key": "sleep_efficiency", "api_path": "contributors.efficiency"},
-            {"sensor_key": "restfulness", "api_path": "contributors.restfulness"},
-            {"sensor_key": "sleep_timing", "api_path": "contributors.timing"},
-        ],
-    },
-    "sleep_detail": {
-        "mappings": [
-            {"sensor_key": "total_sleep_duration", "api_path": "total_sleep_duration", "transform": "seconds_to_hours"},
-            {"sensor_key": "deep_sleep_duration", "api_path": "deep_sleep_duration", "transform": "seconds_to_hours"},
-            {"sensor_key": "rem_sleep_duration", "api_path": "rem_sleep_duration", "transform": "seconds_to_hours"},
-            {"sensor_key": "light_sleep_duration", "api_path": "light_sleep_duration", "transform": "seconds_to_hours"},
-            {"sensor_key": "awake_time", "api_path": "awake_time", "transform": "seconds_to_hours"},
-            {"sensor_key": "sleep_latency", "api_path": "latency", "transform": "seconds_to_minutes"},
-            {"sensor_key": "time_in_bed", "api_path": "time_in_bed", "transform": "seconds_to_hours"},
-            {"sensor_key": "average_sleep_hrv", "api_path": "average_hrv"},
-        ],
-        "computed": [
-            {
-                "sensor_key": "deep_sleep_percentage",
-                "compute": lambda entry: _compute_percentage(entry, "deep_sleep_duration", "total_sleep_duration"),
-            },
-            {
-                "sensor_key": "rem_sleep_percentage",
-                "compute": lambda entry: _compute_percentage(entry, "rem_sleep_duration", "total_sleep_duration"),
-            },
-        ],
-    },
-    "readiness": {
-        "mappings": [
-            {"sensor_key": "readiness_score", "api_path": "score"},
-            {"sensor_key": "temperature_deviation", "api_path": "temperature_deviation"},
-            {"sensor_key": "resting_heart_rate", "api_path": "contributors.resting_heart_rate"},
-            {"sensor_key": "hrv_balance", "api_path": "contributors.hrv_balance"},
-        ],
-    },
-    "activity": {
-        "mappings": [
-            {"sensor_key": "activity_score", "api_path": "score"},
-            {"sensor_key": "steps", "api_path": "steps"},
-            {"sensor_key": "active_calories", "api_path": "active_calories"},
-            {"sensor_key": "total_calories", "api_path": "total_calories"},
-            {"sensor_key": "target_calories", "api_path": "target_calories"},
-            {"sensor_key": "met_min_high", "api_path": "high_activity_met_minutes"},
-            {"sensor_key": "met_min_medium", "api_path": "medium_activity_met_minutes"},
-            {"sensor_key": "met_min_low", "api_path": "low_activity_met_minutes"},
-        ],
-    },
-    "heartrate": {
-        "custom_processor": "_process_heartrate_statistics",
-    },
-    "stress": {
-        "mappings": [
-            {"sensor_key": "stress_high_duration", "api_path": "stress_high_duration"},
-            {"sensor_key": "recovery_high_duration", "api_path": "recovery_high_duration"},
-            {"sensor_key": "stress_day_summary", "api_path": "day_summary"},
-        ],
-    },
-    "resilience": {
-        "mappings": [
-            {"sensor_key": "resilience_level", "api_path": "level"},
-            {"sensor_key": "sleep_recovery_score", "api_path": "sleep_recovery_score"},
-            {"sensor_key": "daytime_recovery_score", "api_path": "daytime_recovery_score"},
-            {"sensor_key": "stress_resilience_score", "api_path": "contributors.activity_score"},
-        ],
-    },
-    "spo2": {
-        "mappings": [
-            {"sensor_key": "spo2_average", "api_path": "average"},
-            {"sensor_key": "breathing_disturbance_index", "api_path": "breathing_disturbance_index"},
-        ],
-    },
-    "vo2_max": {
-        "mappings": [
-            {"sensor_key": "vo2_max", "api_path": "vo2_max"},
-        ],
-    },
-    "cardiovascular_age": {
-        "mappings": [
-            {"sensor_key": "cardiovascular_age", "api_path": "age"},
-        ],
-    },
-    "sleep_time": {
-        "mappings": [
-            {"sensor_key": "optimal_bedtime_start", "api_path": "optimal_bedtime_start"},
-            {"sensor_key": "optimal_bedtime_end", "api_path": "optimal_bedtime_end"},
-        ],
-    },
+# Daily extraction plans: the catalog extractors of metrics with statistics
+EXTRACTION_PLANS = {
+    source_key: plan
+    for source_key, extractors in SOURCE_EXTRACTORS.items()
+    if (plan := tuple(
+        (sensor_key, extract)
+        for sensor_key, extract in extractors
+        if sensor_key in STATISTICS_METADATA
+    ))
 }
 
 
@@ -199,6 +106,8 @@ async def async_import_statistics(
     hass: HomeAssistant,
     data: dict[str, Any],
     entry: ConfigEntry,
+    series_cursors: dict[str, tuple[datetime, int]] | None = None,
+    import_index: ImportIndex | None = None,
 ) -> None:
     """Import historical Oura data as long-term statistics.
     
@@ -206,153 +115,271 @@ async def async_import_statistics(
         hass: Home Assistant instance
         data: Historical data from Oura API
         entry: Config entry for unique ID generation
+        series_cursors: Optional intraday series cursors, updated in place
+            so later incremental imports continue where this one stopped
+        import_index: Optional loaded index of imported days; days already
+            imported with the same values are skipped
     """
-    _LOGGER.info("Starting statistics import from historical data")
+    _LOGGER.debug("Starting statistics import")
     
     total_stats = 0
+    metrics = get_backpressure(hass).metrics
+    chunks_before, wait_before = metrics.chunks, metrics.wait_seconds
     
-    # Process each configured data source
-    for source_key, config in DATA_SOURCE_CONFIG.items():
+    # Process each data source of the metric catalog
+    for source_key in METRIC_SOURCES:
         source_data = data.get(source_key, {}).get("data")
         if not source_data:
             continue
         
-        # Check if custom processor is specified
-        if custom_processor := config.get("custom_processor"):
-            processor_func = globals().get(custom_processor)
-            if processor_func:
-                stats_count = await processor_func(hass, source_data, entry)
-                total_stats += stats_count
-                _LOGGER.debug("Imported %d %s statistics", stats_count, source_key)
-            continue
-        
-        # Use generic processor
-        stats_count = await _process_generic_statistics(hass, source_data, config, entry)
+        stats_count = 0
+        if plan := EXTRACTION_PLANS.get(source_key):
+            stats_count += await _process_generic_statistics(
+                hass, source_data, plan, entry, import_index
+            )
+        if reducers := SOURCE_REDUCERS.get(source_key):
+            stats_count += await _process_daily_reductions(
+                hass, source_data, reducers, entry, import_index
+            )
+        if series := SOURCE_SERIES.get(source_key):
+            stats_count += await _process_series_statistics(
+                hass, source_data, series, entry, series_cursors
+            )
         total_stats += stats_count
         _LOGGER.debug("Imported %d %s statistics", stats_count, source_key)
     
-    _LOGGER.info("Successfully imported %d total statistics data points", total_stats)
+    # Polls in external statistics mode mostly find nothing new
+    _LOGGER.log(
+        logging.INFO if total_stats else logging.DEBUG,
+        "Successfully imported %d total statistics data points "
+        "(%d recorder chunks, waited %.1fs for the recorder queue, max depth %d)",
+        total_stats,
+        metrics.chunks - chunks_before,
+        metrics.wait_seconds - wait_before,
+        metrics.max_queue_depth,
+    )
+
+
+async def async_import_series_statistics(
+    hass: HomeAssistant,
+    data: dict[str, Any],
+    entry: ConfigEntry,
+    series_cursors: dict[str, tuple[datetime, int]],
+) -> int:
+    """Import only the intraday series found in the given data.
+    
+    Used by regular updates without re-importing the daily values, which are
+    recorded from the sensor states. Only hours at or after each series
+    cursor are decoded, so a poll of the current day processes only the
+    samples added since the previous poll.
+    
+    Args:
+        hass: Home Assistant instance
+        data: Data from Oura API
+        entry: Config entry for unique ID generation
+        series_cursors: Last imported (hour, item_count) per series key,
+            updated in place
+    
+    Returns:
+        Number of statistics imported
+    """
+    total_stats = 0
+    
+    for source_key, series in SOURCE_SERIES.items():
+        source_data = data.get(source_key, {}).get("data")
+        if source_data:
+            total_stats += await _process_series_statistics(
+                hass, source_data, series, entry, series_cursors
+            )
+    
+    return total_stats
 
 
 async def _process_generic_statistics(
     hass: HomeAssistant,
     data_list: list[dict[str, Any]],
-    config: dict[str, Any],
+    extractors: tuple[tuple[str, Callable[[dict[str, Any]], Any]], ...],
     entry: ConfigEntry,
+    import_index: ImportIndex | None = None,
 ) -> int:
-    """Process data using generic configuration-driven approach.
+    """Process data using a compiled extraction plan.
+    
+    Each day keeps one document, so the day's point and its import index
+    hash do not alternate between the sleep periods of a day. Its day is
+    parsed once, then every sensor's column is extracted in a single
+    comprehension and imported before the next one is built.
     
     Args:
         hass: Home Assistant instance
         data_list: List of data entries from API
-        config: Configuration with mappings and computed fields
+        extractors: Compiled (sensor_key, extractor) pairs for the source
         entry: Config entry for unique ID generation
+        import_index: Optional index of imported days
     
     Returns:
         Number of statistics imported
     """
     stats_count = 0
     
-    # Initialize data collectors for each sensor
-    sensor_data: dict[str, list[dict[str, Any]]] = {}
-    for mapping in config.get("mappings", []):
-        sensor_data[mapping["sensor_key"]] = []
+    dated = [
+        (timestamp, entry_data)
+        for entry_data in daily_documents(data_list)
+        if (timestamp := _parse_date_to_timestamp(entry_data.get("day")))
+    ]
     
-    for computed in config.get("computed", []):
-        sensor_data[computed["sensor_key"]] = []
+    for sensor_key, extract in extractors:
+        data_points = [
+            {"timestamp": timestamp, "value": value}
+            for timestamp, entry_data in dated
+            if (value := extract(entry_data)) is not None
+        ]
+        stats_count += await _create_statistic(hass, sensor_key, data_points, entry, import_index)
     
-    # Process each data entry
-    for entry_data in data_list:
-        timestamp = _parse_date_to_timestamp(entry_data.get("day"))
-        if not timestamp:
-            continue
+    return stats_count
+
+
+async def _process_series_statistics(
+    hass: HomeAssistant,
+    data_list: list[dict[str, Any]],
+    series_list: tuple[dict[str, Any], ...],
+    entry: ConfigEntry,
+    series_cursors: dict[str, tuple[datetime, int]] | None = None,
+) -> int:
+    """Import intraday series as hourly statistics.
+    
+    SampleModel series become hourly mean/min/max values. Classification
+    strings (configured with "epoch_seconds") become the minutes or the
+    percentage of each hour spent in the configured classes.
+    
+    Each document's series is decoded and aggregated on its own, and points
+    are flushed to the recorder every SERIES_FLUSH_POINTS, so memory stays
+    bounded regardless of how many nights are imported.
+    
+    When cursors are given, decoding starts at the last imported hour. That
+    hour is re-imported only if it gained items since, because the current
+    hour of an ongoing day is usually still partial.
+    
+    Args:
+        hass: Home Assistant instance
+        data_list: List of data entries from API
+        series_list: Series options of the source's catalog metrics
+        entry: Config entry for unique ID generation
+        series_cursors: Last imported (hour, item_count) per series key,
+            updated in place
+    
+    Returns:
+        Number of statistics imported
+    """
+    stats_count = 0
+    
+    for series in series_list:
+        sensor_key = series["sensor_key"]
+        cursor = series_cursors.get(sensor_key) if series_cursors is not None else None
+        since = cursor[0] if cursor else None
+        data_points: list[dict[str, Any]] = []
         
-        # Process direct mappings
-        for mapping in config.get("mappings", []):
-            value = _get_nested_value(entry_data, mapping["api_path"])
-            if value is not None:
-                # Apply transformation if specified
-                if transform := mapping.get("transform"):
-                    value = _apply_transformation(value, transform)
-                
-                sensor_data[mapping["sensor_key"]].append({
-                    "timestamp": timestamp,
-                    "value": value,
-                })
+        for entry_data in data_list:
+            for point in _series_points(entry_data, series, since):
+                if cursor and point["timestamp"] <= cursor[0]:
+                    if point["timestamp"] < cursor[0] or point["count"] == cursor[1]:
+                        continue
+                data_points.append(point)
+            
+            if len(data_points) >= SERIES_FLUSH_POINTS:
+                await _create_statistic(hass, sensor_key, data_points, entry)
+                stats_count += len(data_points)
+                cursor = (data_points[-1]["timestamp"], data_points[-1]["count"])
+                data_points = []
         
-        # Process computed fields
-        for computed in config.get("computed", []):
-            value = computed["compute"](entry_data)
-            if value is not None:
-                sensor_data[computed["sensor_key"]].append({
-                    "timestamp": timestamp,
-                    "value": value,
-                })
-    
-    # Import statistics for each sensor
-    for sensor_key, data_points in sensor_data.items():
         if data_points:
             await _create_statistic(hass, sensor_key, data_points, entry)
             stats_count += len(data_points)
+            cursor = (data_points[-1]["timestamp"], data_points[-1]["count"])
+        
+        if series_cursors is not None and cursor:
+            series_cursors[sensor_key] = cursor
     
     return stats_count
 
 
-async def _process_heartrate_statistics(
+def _series_points(
+    entry_data: dict[str, Any],
+    series: dict[str, Any],
+    since: datetime | None = None,
+) -> list[dict[str, Any]]:
+    """Decode one document's series and aggregate it into hourly data points.
+    
+    Each point carries the number of items in its hour as "count".
+    """
+    epoch_seconds = series.get("epoch_seconds")
+    
+    if epoch_seconds is None:
+        decoded = decode_sample(entry_data.get(series["api_path"]), since)
+        if decoded is None:
+            return []
+        return [
+            {"timestamp": start, "value": mean, "min": minimum, "max": maximum, "count": count}
+            for start, mean, minimum, maximum, count in decoded.iter_buckets()
+        ]
+    
+    epochs = decode_epochs(
+        entry_data.get(series["api_path"]),
+        entry_data.get(series["start_path"]),
+        epoch_seconds,
+        since,
+    )
+    if epochs is None:
+        return []
+    
+    if series["measure"] == "minutes":
+        return [
+            {"timestamp": start, "value": matched * epoch_seconds / 60, "count": total}
+            for start, matched, total in epochs.iter_buckets(series["codes"])
+        ]
+    return [
+        {"timestamp": start, "value": round(matched / total * 100, 1), "count": total}
+        for start, matched, total in epochs.iter_buckets(series["codes"])
+    ]
+
+
+async def _process_daily_reductions(
     hass: HomeAssistant,
-    heartrate_data: list[dict[str, Any]],
+    readings: list[dict[str, Any]],
+    reducers: tuple[tuple[str, Callable[[dict[str, Any]], Any], Callable[[list[Any]], Any]], ...],
     entry: ConfigEntry,
+    import_index: ImportIndex | None = None,
 ) -> int:
-    """Process heart rate data with special daily aggregation logic.
+    """Reduce individual readings (e.g. heart rate) to daily statistics.
     
-    Heart rate data comes as individual readings throughout the day,
-    so we need to aggregate them into daily statistics.
+    Readings come throughout the day, so they are grouped by the day of
+    their timestamp and each catalog reducer is applied to every day.
+    
+    Args:
+        hass: Home Assistant instance
+        readings: List of readings from API
+        reducers: Compiled (sensor_key, accessor, reduce) triples
+        entry: Config entry for unique ID generation
+        import_index: Optional index of imported days
+    
+    Returns:
+        Number of statistics imported
     """
     stats_count = 0
     
-    # Group heart rate readings by day
-    daily_readings: dict[str, list[int]] = {}
-    
-    for data_entry in heartrate_data:
-        if bpm := data_entry.get("bpm"):
-            # Extract date from timestamp
-            timestamp_str = data_entry.get("timestamp", "")
-            if timestamp_str:
-                day = timestamp_str.split("T")[0]
-                if day not in daily_readings:
-                    daily_readings[day] = []
-                daily_readings[day].append(bpm)
-    
-    # Calculate daily statistics
-    sensor_data = {
-        "average_heart_rate": [],
-        "min_heart_rate": [],
-        "max_heart_rate": [],
-    }
-    
-    for day, readings in daily_readings.items():
-        timestamp = _parse_date_to_timestamp(day)
-        if not timestamp or not readings:
-            continue
+    for sensor_key, accessor, reduce in reducers:
+        # Group readings by day
+        daily_values: dict[str, list[Any]] = {}
+        for reading in readings:
+            timestamp_str = reading.get("timestamp")
+            if timestamp_str and (value := accessor(reading)):
+                daily_values.setdefault(timestamp_str.split("T")[0], []).append(value)
         
-        sensor_data["average_heart_rate"].append({
-            "timestamp": timestamp,
-            "value": sum(readings) / len(readings),
-        })
-        sensor_data["min_heart_rate"].append({
-            "timestamp": timestamp,
-            "value": min(readings),
-        })
-        sensor_data["max_heart_rate"].append({
-            "timestamp": timestamp,
-            "value": max(readings),
-        })
-    
-    # Import statistics
-    for sensor_key, data_points in sensor_data.items():
-        if data_points:
-            await _create_statistic(hass, sensor_key, data_points, entry)
-            stats_count += len(data_points)
+        data_points = [
+            {"timestamp": timestamp, "value": reduce(values)}
+            for day, values in daily_values.items()
+            if (timestamp := _parse_date_to_timestamp(day))
+        ]
+        stats_count += await _create_statistic(hass, sensor_key, data_points, entry, import_index)
     
     return stats_count
 
@@ -362,29 +389,32 @@ async def _create_statistic(
     sensor_key: str,
     data_points: list[dict[str, Any]],
     entry: ConfigEntry,
-) -> None:
-    """Create and import a statistic for a sensor."""
+    import_index: ImportIndex | None = None,
+) -> int:
+    """Create and import a statistic for a sensor.
+    
+    Returns:
+        Number of data points imported
+    """
     if not data_points:
-        return
+        return 0
     
     metadata = STATISTICS_METADATA.get(sensor_key)
     if not metadata:
         _LOGGER.warning("No metadata found for sensor: %s", sensor_key)
-        return
+        return 0
     
-    # Hybrid approach for statistic_id
-    # 1. Try to find existing entity in registry
-    # 2. Fallback to default naming convention if not found
-    registry = er.async_get(hass)
-    unique_id = f"{entry.entry_id}_{sensor_key}"
-    entity_id = registry.async_get_entity_id("sensor", DOMAIN, unique_id)
+    statistic_id = resolve_statistic_id(hass, entry, sensor_key)
     
-    if entity_id:
-        statistic_id = entity_id
-    else:
-        # Fallback for fresh installs where entities don't exist yet
-        # Matches the default entity ID format: sensor.oura_ring_{sensor_key}
-        statistic_id = f"sensor.oura_ring_{sensor_key}"
+    # Skip days already imported with the same values
+    if import_index is not None:
+        skipped = len(data_points)
+        data_points = import_index.filter_changed(statistic_id, data_points)
+        skipped -= len(data_points)
+        if skipped:
+            _LOGGER.debug("Skipping %d unchanged %s days", skipped, statistic_id)
+        if not data_points:
+            return 0
     
     # Determine source and import method
     # If statistic_id has a colon, it's an external statistic (domain:name)
@@ -422,94 +452,66 @@ async def _create_statistic(
     )
     
     # Create data points
-    statistics = []
-    for point in data_points:
-        stat_data = StatisticData(
-            start=point["timestamp"],
-            mean=point["value"] if metadata["has_mean"] else None,
-            sum=point["value"] if metadata["has_sum"] else None,
+    if metadata["has_sum"]:
+        # Sums must be running totals: accumulate daily values on top of the
+        # last stored sum, rebasing stored rows when past days are revised
+        rows = await get_running_sums(hass).async_apply(
+            statistic_id,
+            [(point["timestamp"], point["value"]) for point in data_points],
         )
-        statistics.append(stat_data)
-    
-    # Import to database
-    import_func(hass, stat_metadata, statistics)
+        statistics = [StatisticData(**row) for row in rows]
+    else:
+        statistics = []
+        for point in data_points:
+            stat_data = StatisticData(
+                start=point["timestamp"],
+                mean=point["value"] if metadata["has_mean"] else None,
+                min=point.get("min"),
+                max=point.get("max"),
+            )
+            statistics.append(stat_data)
+    
+    # Import to database in bounded chunks, waiting for the recorder to drain
+    await get_backpressure(hass).async_submit(import_func, stat_metadata, statistics)
+    if import_index is not None:
+        import_index.mark_imported(statistic_id, data_points)
     _LOGGER.debug(
         "Imported %d statistics for %s (%s)",
         len(statistics),
         metadata["name"],
         sensor_key,
     )
+    return len(data_points)
 
 
-def _get_nested_value(data: dict[str, Any], path: str) -> Any:
-    """Get a value from nested dictionary using dot notation.
+def resolve_statistic_id(hass: HomeAssistant, entry: ConfigEntry, sensor_key: str) -> str:
+    """Return the statistic_id a metric is imported under.
     
-    Args:
-        data: Dictionary to extract from
-        path: Dot-separated path (e.g., "contributors.efficiency")
-    
-    Returns:
-        Value at path, or None if not found
-    """
-    keys = path.split(".")
-    value = data
-    
-    for key in keys:
-        if isinstance(value, dict):
-            value = value.get(key)
-            if value is None:
-                return None
-        else:
-            return None
-    
-    return value
-
-
-def _apply_transformation(value: Any, transform: str, **kwargs) -> Any:
-    """Apply a transformation to a value.
-    
-    Args:
-        value: Value to transform
-        transform: Transformation name
-        **kwargs: Additional arguments for transformation
-    
-    Returns:
-        Transformed value
+    Series without a sensor entity, and every metric in external mode, are
+    imported as external statistics; everything else under its sensor
+    entity (or the default entity ID until the entity exists).
     """
-    if transform == "seconds_to_hours":
-        return value / 3600
-    elif transform == "seconds_to_minutes":
-        return value / 60
-    elif transform == "percentage":
-        total = kwargs.get("total", 100)
-        return (value / total) * 100 if total else 0
-    
-    return value
+    if STATISTICS_METADATA[sensor_key].get("external") or uses_external_statistics(entry):
+        return f"{DOMAIN}:{sensor_key}"
+    return _get_resolver(hass, entry).async_resolve(sensor_key)
 
 
-def _compute_percentage(entry: dict[str, Any], numerator_key: str, denominator_key: str) -> float | None:
-    """Compute a percentage from two entry fields.
-    
-    Args:
-        entry: Data entry
-        numerator_key: Key for numerator value
-        denominator_key: Key for denominator value
-    
-    Returns:
-        Percentage value rounded to 1 decimal, or None if can't compute
-    """
-    numerator = entry.get(numerator_key)
-    denominator = entry.get(denominator_key)
-    
-    if numerator is None or denominator is None or denominator == 0:
-        return None
-    
-    return round((numerator / denominator) * 100, 1)
+def _get_resolver(hass: HomeAssistant, entry: ConfigEntry) -> StatisticIdResolver:
+    """Return the entry's statistic_id resolver, built for all entity metrics."""
+    resolver = get_statistic_id_resolver(hass, entry)
+    if not resolver.built:
+        resolver.async_build(
+            key for key, metadata in STATISTICS_METADATA.items() if not metadata.get("external")
+        )
+    return resolver
 
 
+@lru_cache(maxsize=4096)
 def _parse_date_to_timestamp(date_str: str | None) -> datetime | None:
     """Parse ISO date string to datetime object.
     
+    Results are memoized: every data source repeats the same days.
+    
     Args:
         date_str: ISO format date string (e.g., "2024-01-15")
     
@@ -528,3 +530,4 @@ def _parse_date_to_timestamp(date_str: str | None) -> datetime | None:
     except (ValueError, IndexError) as err:
         _LOGGER.warning("Failed to parse date '%s': %s", date_str, err)
         return None
+
@@ -0,0 +1,321 @@
+"""Timing spans of refresh cycles.
+
+A cycle (a refresh or the historical load) is the root span of a trace, and
+the stages it goes through open child spans: token validation, every HTTP
+request, JSON decoding, data processing, entity updates, statistics imports
+and history writes. The current span lives in a context variable, so spans
+opened in the API client need no reference to the coordinator, and the
+requests that ``asyncio.gather`` runs concurrently all become children of
+the cycle. Outside a cycle ``span`` does nothing.
+
+Every finished cycle updates per-stage aggregates, shown in the config
+entry's diagnostics, and the slowest recent cycles are kept with their
+stage breakdown. When trace export is enabled in the options, every cycle is
+also appended to a local JSON lines file, one OTLP/JSON
+``ExportTraceServiceRequest`` per line, which OpenTelemetry tooling can
+import::
+
+    <config>/oura_traces/<entry_id>.jsonl
+"""
+from __future__ import annotations
+
+from collections import deque
+from contextvars import ContextVar
+import json
+import logging
+import os
+from pathlib import Path
+import secrets
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, TRACE_EXPORT_MAX_BYTES, TRACE_HISTORY
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_DIR = f"{DOMAIN}_traces"
+
+# OTLP span kind and status codes
+_SPAN_KIND_INTERNAL = 1
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+_current_span: ContextVar[Span | None] = ContextVar(f"{DOMAIN}_span", default=None)
+
+
+class Span:
+    """One timed stage of a cycle."""
+
+    __slots__ = (
+        "name", "trace", "span_id", "parent_id", "attributes",
+        "start_unix_ns", "start_ns", "end_ns", "error", "_token",
+    )
+
+    def __init__(self, name: str, trace: Trace, parent_id: str | None, attributes: dict[str, Any]) -> None:
+        """Initialize the span."""
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_unix_ns = 0
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: str | None = None
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        """Return the duration in milliseconds."""
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute of the span."""
+        self.attributes[key] = value
+
+    def __enter__(self) -> Span:
+        self.start_unix_ns = time.time_ns()
+        self.start_ns = time.perf_counter_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, traceback: Any) -> None:
+        self.end_ns = time.perf_counter_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.trace.spans.append(self)
+
+    def as_otlp(self) -> dict[str, Any]:
+        """Return the span in the OTLP/JSON encoding."""
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_unix_ns),
+            "endTimeUnixNano": str(self.start_unix_ns + self.end_ns - self.start_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": (
+                {"code": _STATUS_ERROR, "message": self.error} if self.error else {"code": _STATUS_OK}
+            ),
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoSpan:
+    """Stand-in for a span outside any cycle."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ignore the attribute."""
+
+    def __enter__(self) -> _NoSpan:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Trace:
+    """The spans of one cycle."""
+
+    def __init__(self) -> None:
+        """Initialize the trace."""
+        self.trace_id = secrets.token_hex(16)
+        self.spans: list[Span] = []
+
+
+def span(name: str, **attributes: Any) -> Span | _NoSpan:
+    """Return a span for a stage of the current cycle.
+
+    Use it as a context manager around the stage. Outside a cycle, the
+    returned object does nothing.
+
+    Args:
+        name: Stage name, e.g. "http.request"
+        **attributes: Span attributes
+    """
+    if (parent := _current_span.get()) is None:
+        return _NO_SPAN
+    return Span(name, parent.trace, parent.span_id, attributes)
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    """Return an attribute in the OTLP/JSON encoding."""
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+class StageStats:
+    """Aggregated durations of one stage."""
+
+    def __init__(self) -> None:
+        """Initialize the aggregates."""
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, span: Span) -> None:
+        """Add a finished span."""
+        duration = span.duration_ms
+        self.count += 1
+        self.errors += span.error is not None
+        self.total_ms += duration
+        self.max_ms = max(self.max_ms, duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the aggregates as a dictionary."""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+def _write_lines(path: Path, lines: list[str], max_bytes: int) -> None:
+    """Append lines to a trace file, keeping one rotated file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if path.stat().st_size >= max_bytes:
+            os.replace(path, path.with_name(f"{path.name}.1"))
+    except FileNotFoundError:
+        pass
+    with path.open("a", encoding="utf-8") as file:
+        file.writelines(lines)
+
+
+class TraceExporter:
+    """Appends finished cycles to a JSON lines file."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, max_bytes: int = TRACE_EXPORT_MAX_BYTES) -> None:
+        """Initialize the exporter."""
+        self.hass = hass
+        self.path = Path(hass.config.path(TRACE_DIR, f"{entry_id}.jsonl"))
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def encode(trace: Trace) -> str:
+        """Return a trace as one OTLP/JSON line."""
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", DOMAIN)]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.as_otlp() for span in trace.spans],
+                }],
+            }]
+        }
+        return json.dumps(request, separators=(",", ":")) + "\n"
+
+    async def async_export(self, trace: Trace) -> None:
+        """Append a trace to the file."""
+        try:
+            await self.hass.async_add_executor_job(
+                _write_lines, self.path, [self.encode(trace)], self.max_bytes
+            )
+        except OSError as err:
+            _LOGGER.warning("Failed to write trace to %s: %s", self.path, err)
+
+
+class _Cycle:
+    """Async context manager tracing one cycle."""
+
+    def __init__(self, tracer: Tracer, name: str, attributes: dict[str, Any]) -> None:
+        """Initialize the cycle."""
+        self.tracer = tracer
+        self.root = Span(name, Trace(), None, attributes)
+
+    async def __aenter__(self) -> Span:
+        return self.root.__enter__()
+
+    async def __aexit__(self, exc_type: Any, exc: BaseException | None, traceback: Any) -> None:
+        self.root.__exit__(exc_type, exc, traceback)
+        await self.tracer.async_finish(self.root.trace, self.root)
+
+
+class Tracer:
+    """Traces the cycles of one config entry and aggregates their stages."""
+
+    def __init__(self, exporter: TraceExporter | None = None, history: int = TRACE_HISTORY) -> None:
+        """Initialize the tracer.
+
+        Args:
+            exporter: Writes every finished cycle, if trace export is enabled
+            history: Number of recent and of slowest cycles kept
+        """
+        self.exporter = exporter
+        self.history = history
+        # (cycle name, stage name) -> aggregates
+        self.stages: dict[tuple[str, str], StageStats] = {}
+        self.recent: deque[dict[str, Any]] = deque(maxlen=history)
+        self.slowest: list[dict[str, Any]] = []
+
+    def cycle(self, name: str, **attributes: Any) -> _Cycle:
+        """Return an async context manager tracing a cycle.
+
+        Args:
+            name: Cycle name, e.g. "refresh"
+            **attributes: Attributes of the cycle's root span
+        """
+        return _Cycle(self, name, attributes)
+
+    async def async_finish(self, trace: Trace, root: Span) -> None:
+        """Aggregate a finished cycle and export it."""
+        stages: dict[str, float] = {}
+        for finished in trace.spans:
+            key = (root.name, finished.name)
+            if (stats := self.stages.get(key)) is None:
+                stats = self.stages[key] = StageStats()
+            stats.add(finished)
+            if finished is not root:
+                stages[finished.name] = stages.get(finished.name, 0.0) + finished.duration_ms
+
+        summary = {
+            "cycle": root.name,
+            "trace_id": trace.trace_id,
+            "start": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(root.start_unix_ns / 1e9)),
+            "duration_ms": round(root.duration_ms, 3),
+            "spans": len(trace.spans),
+            "error": root.error,
+            # Summed over concurrent spans, so stages can exceed the cycle
+            "stages_ms": {name: round(duration, 3) for name, duration in sorted(stages.items())},
+        }
+        self.recent.append(summary)
+        self.slowest.append(summary)
+        self.slowest.sort(key=lambda cycle: cycle["duration_ms"], reverse=True)
+        del self.slowest[self.history:]
+
+        if self.exporter is not None:
+            await self.exporter.async_export(trace)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the aggregates for diagnostics."""
+        stages: dict[str, dict[str, Any]] = {}
+        for (cycle, stage), stats in sorted(self.stages.items()):
+            stages.setdefault(cycle, {})[stage] = stats.as_dict()
+        return {
+            "export_path": str(self.exporter.path) if self.exporter else None,
+            "stages": stages,
+            "recent_cycles": [
+                {key: cycle[key] for key in ("cycle", "start", "duration_ms", "error")}
+                for cycle in self.recent
+            ],
+            "slowest_cycles": list(self.slowest),
+        }
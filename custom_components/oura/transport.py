@@ -0,0 +1,404 @@
+"""Pluggable HTTP transports for the Oura API client.
+
+``OuraApiClient`` sends every request through a transport. The default one
+uses the aiohttp client session. Two more make API traffic reproducible
+offline:
+
+- ``RecordingTransport`` wraps another transport and appends every response
+  to a cassette file, with access tokens redacted and, optionally, document
+  identifiers and email addresses replaced by stable pseudonyms.
+- ``ReplayTransport`` answers requests from a cassette, either as fast as
+  possible or after each response's recorded duration. The coordinator asks
+  for dates relative to today, so requests that were not recorded are
+  matched again with their dates shifted back to the day of the recording.
+
+A cassette is gzip-compressed JSON lines: a header line followed by one line
+per request with its URL path, query, status, a few response headers, the JSON
+body and the time the request took. Every line is written as its own gzip
+member, so a cassette stays readable when Home Assistant stops mid-recording.
+
+To record a running instance, add a ``cassette`` mapping to the config entry
+data, e.g. ``{"mode": "record", "path": "oura.jsonl.gz", "anonymize": true}``;
+relative paths are resolved against the configuration directory.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import secrets
+import time
+from typing import Any, NamedTuple, Protocol
+from urllib.parse import urlsplit
+
+from aiohttp import ClientResponseError, ClientSession, RequestInfo
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .tracing import span
+
+_LOGGER = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+CASSETTE_MODE_RECORD = "record"
+CASSETTE_MODE_REPLAY = "replay"
+
+REDACTED = "REDACTED"
+# Query parameters carrying credentials
+_SECRET_PARAMS = frozenset({"access_token", "client_secret", "refresh_token"})
+# Response headers kept in a cassette
+_RECORDED_HEADERS = ("Content-Type", "Retry-After")
+# Query parameters starting with a date, shifted when replaying on a later day
+_DATE_PARAMS = ("start_date", "end_date", "start_datetime", "end_datetime")
+
+
+class TransportResponse(NamedTuple):
+    """Decoded body of a response and the size of the raw body in bytes."""
+
+    body: Any
+    size: int
+
+
+class Transport(Protocol):
+    """Sends GET requests to the Oura API."""
+
+    async def async_get(
+        self, url: str, headers: dict[str, str], params: dict[str, Any] | None = None
+    ) -> TransportResponse:
+        """Return the JSON body of a response and its size.
+
+        Raises:
+            ClientResponseError: The response status is 400 or above
+        """
+
+
+class HttpTransport:
+    """Transport sending requests with an aiohttp client session."""
+
+    def __init__(self, client_session: ClientSession) -> None:
+        """Initialize the transport."""
+        self.client_session = client_session
+
+    async def async_get(
+        self, url: str, headers: dict[str, str], params: dict[str, Any] | None = None
+    ) -> TransportResponse:
+        """Return the JSON body of a response and its size."""
+        async with self.client_session.get(url, headers=headers, params=params) as response:
+            response.raise_for_status()
+            body = await response.read()
+        with span("json.decode", bytes=len(body)):
+            return TransportResponse(json.loads(body), len(body))
+
+
+def request_key(url: str, params: dict[str, Any] | None) -> str:
+    """Return the key a request is matched by during replay.
+
+    The key holds the URL path and the sorted query, without the host, so a
+    cassette recorded against the API replays for any base URL.
+    """
+    query = "&".join(f"{key}={params[key]}" for key in sorted(params or {}))
+    return f"{urlsplit(url).path}?{query}"
+
+
+def shift_dates(params: dict[str, Any], days: int) -> dict[str, Any]:
+    """Return query parameters with their dates moved by a number of days."""
+    shifted = dict(params)
+    for key in _DATE_PARAMS:
+        if isinstance(value := params.get(key), str):
+            try:
+                day = date.fromisoformat(value[:10])
+            except ValueError:
+                continue
+            shifted[key] = f"{(day + timedelta(days=days)).isoformat()}{value[10:]}"
+    return shifted
+
+
+def _recorded_day(interactions: list[dict[str, Any]], header: dict[str, Any]) -> date | None:
+    """Return the day a cassette was recorded on.
+
+    Refreshes ask for ranges ending today, so this is the latest day a
+    recorded request ends on, or else the local day of the header's time.
+    """
+    days = [
+        value[:10]
+        for interaction in interactions
+        for key in ("end_date", "end_datetime")
+        if isinstance(value := interaction["params"].get(key), str)
+    ]
+    try:
+        if days:
+            return date.fromisoformat(max(days))
+        if recorded_at := header.get("recorded_at"):
+            return datetime.fromisoformat(recorded_at).astimezone().date()
+    except ValueError:
+        pass
+    return None
+
+
+def _redact_params(params: dict[str, Any] | None) -> dict[str, Any]:
+    """Return query parameters with credentials redacted."""
+    return {
+        key: REDACTED if key in _SECRET_PARAMS else value
+        for key, value in (params or {}).items()
+    }
+
+
+class Anonymizer:
+    """Replaces identifiers with pseudonyms that are stable within a cassette.
+
+    Values of ``id``, ``*_id`` and ``email`` fields are hashed with a random
+    salt, so documents referring to each other still match after anonymization
+    while the original identifiers cannot be recovered.
+    """
+
+    def __init__(self, salt: bytes | None = None) -> None:
+        """Initialize the anonymizer."""
+        self._salt = salt or secrets.token_bytes(16)
+
+    def pseudonym(self, value: str) -> str:
+        """Return the pseudonym of an identifier."""
+        return hashlib.blake2b(value.encode(), key=self._salt, digest_size=16).hexdigest()
+
+    def anonymize(self, value: Any) -> Any:
+        """Return a copy of a JSON value with identifiers replaced."""
+        if isinstance(value, list):
+            return [self.anonymize(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        result = {}
+        for key, item in value.items():
+            if isinstance(item, str) and (key == "id" or key.endswith("_id")):
+                result[key] = self.pseudonym(item)
+            elif isinstance(item, str) and key == "email":
+                result[key] = f"{self.pseudonym(item)[:12]}@example.com"
+            else:
+                result[key] = self.anonymize(item)
+        return result
+
+
+def _append_lines(path: Path, lines: list[dict[str, Any]], header: dict[str, Any]) -> None:
+    """Append JSON lines to a cassette as one gzip member.
+
+    The header is written first when the cassette is new.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists() or not path.stat().st_size:
+        lines = [header, *lines]
+    content = "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines)
+    with gzip.open(path, "at", encoding="utf-8") as file:
+        file.write(content)
+
+
+def read_cassette(path: str | os.PathLike) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Read a cassette.
+
+    Args:
+        path: Cassette file
+
+    Returns:
+        The header and the recorded interactions, in recording order
+
+    Raises:
+        OSError: The file cannot be read
+        ValueError: The file is not a cassette of a supported version
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file if line.strip()]
+    if not lines or lines[0].get("cassette_version") != CASSETTE_VERSION:
+        raise ValueError(f"{path} is not a supported cassette")
+    return lines[0], lines[1:]
+
+
+class RecordingTransport:
+    """Transport recording the responses of another transport to a cassette."""
+
+    def __init__(
+        self,
+        transport: Transport,
+        path: str | os.PathLike,
+        anonymize: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the transport.
+
+        Args:
+            transport: Transport sending the requests
+            path: Cassette file; interactions are appended to an existing one
+            anonymize: Replace document identifiers and email addresses
+            clock: Monotonic clock timing the requests
+        """
+        self.transport = transport
+        self.path = Path(path)
+        self.anonymizer = Anonymizer() if anonymize else None
+        self._clock = clock
+        self._started = clock()
+        self._lock = asyncio.Lock()
+
+    async def async_get(
+        self, url: str, headers: dict[str, str], params: dict[str, Any] | None = None
+    ) -> TransportResponse:
+        """Return the JSON body of a response and record it."""
+        started = self._clock()
+        try:
+            response = await self.transport.async_get(url, headers, params)
+        except ClientResponseError as err:
+            await self._async_record(
+                url, params, started, err.status, err.headers, {"detail": err.message}, 0
+            )
+            raise
+        await self._async_record(url, params, started, 200, None, response.body, response.size)
+        return response
+
+    async def _async_record(
+        self,
+        url: str,
+        params: dict[str, Any] | None,
+        started: float,
+        status: int,
+        headers: Any,
+        body: Any,
+        size: int,
+    ) -> None:
+        """Append one interaction to the cassette."""
+        interaction = {
+            "url": urlsplit(url).path,
+            "params": _redact_params(params),
+            "status": status,
+            "headers": {
+                name: headers[name] for name in _RECORDED_HEADERS if headers and name in headers
+            },
+            "body": self.anonymizer.anonymize(body) if self.anonymizer else body,
+            "size": size,
+            "offset": round(started - self._started, 6),
+            "duration": round(self._clock() - started, 6),
+        }
+        header = {
+            "cassette_version": CASSETTE_VERSION,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "anonymized": self.anonymizer is not None,
+        }
+        async with self._lock:
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, _append_lines, self.path, [interaction], header
+                )
+            except OSError as err:
+                _LOGGER.warning("Failed to record %s to %s: %s", url, self.path, err)
+
+
+class ReplayTransport:
+    """Transport answering requests from a cassette."""
+
+    def __init__(
+        self,
+        interactions: list[dict[str, Any]],
+        realtime: bool = False,
+        header: dict[str, Any] | None = None,
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        """Initialize the transport.
+
+        Requests recorded more than once are answered in recording order;
+        once the recorded responses run out, the last one is repeated. A
+        request that was not recorded is looked up again with its dates
+        shifted by the days between today and the recording, so a refresh
+        replays on any later day. Cassettes appended to on several days only
+        match the requests of their last day this way.
+
+        Args:
+            interactions: Recorded interactions, as returned by read_cassette
+            realtime: Delay each response by its recorded duration
+            header: Cassette header
+            today: Returns the current local day
+        """
+        self.header = header or {}
+        self.realtime = realtime
+        self.replayed = 0
+        self.recorded_day = _recorded_day(interactions, self.header)
+        self._today = today
+        self._responses: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for interaction in interactions:
+            self._responses[request_key(interaction["url"], interaction["params"])].append(interaction)
+        self._positions: dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def from_file(cls, path: str | os.PathLike, realtime: bool = False) -> ReplayTransport:
+        """Return a transport replaying a cassette file."""
+        header, interactions = read_cassette(path)
+        return cls(interactions, realtime, header)
+
+    @property
+    def recorded_at(self) -> datetime | None:
+        """Return when the recording started."""
+        recorded_at = self.header.get("recorded_at")
+        return datetime.fromisoformat(recorded_at) if recorded_at else None
+
+    async def async_get(
+        self, url: str, headers: dict[str, str], params: dict[str, Any] | None = None
+    ) -> TransportResponse:
+        """Return the recorded JSON body of a request and its size.
+
+        Raises:
+            ClientResponseError: The recorded status is 400 or above
+            LookupError: The request was not recorded
+        """
+        params = _redact_params(params)
+        key = request_key(url, params)
+        if key not in self._responses and self.recorded_day is not None:
+            if days := (self.recorded_day - self._today()).days:
+                key = request_key(url, shift_dates(params, days))
+        responses = self._responses.get(key)
+        if not responses:
+            raise LookupError(f"No recorded response for {key}")
+        position = self._positions[key]
+        self._positions[key] = position + 1
+        interaction = responses[min(position, len(responses) - 1)]
+
+        if self.realtime:
+            await asyncio.sleep(interaction["duration"])
+        self.replayed += 1
+
+        if interaction["status"] >= 400:
+            request_headers = CIMultiDictProxy(CIMultiDict(headers))
+            raise ClientResponseError(
+                RequestInfo(URL(url), "GET", request_headers, URL(url)),
+                (),
+                status=interaction["status"],
+                message=str((interaction["body"] or {}).get("detail", "")),
+                headers=CIMultiDictProxy(CIMultiDict(interaction["headers"])),
+            )
+        return TransportResponse(interaction["body"], interaction.get("size", 0))
+
+
+async def async_create_transport(
+    config: dict[str, Any], transport: Transport, config_dir: str | os.PathLike = "."
+) -> Transport:
+    """Return the transport a cassette configuration asks for.
+
+    Args:
+        config: Cassette configuration with "mode" (record or replay),
+            "path" and optionally "anonymize" and "realtime"
+        transport: Transport sending real requests
+        config_dir: Directory relative cassette paths are resolved against
+
+    Raises:
+        ValueError: The mode is unknown or the cassette cannot be replayed
+    """
+    path = Path(config_dir, config["path"])
+    mode = config.get("mode", CASSETTE_MODE_REPLAY)
+    if mode == CASSETTE_MODE_RECORD:
+        _LOGGER.warning("Recording Oura API responses to %s", path)
+        return RecordingTransport(transport, path, anonymize=config.get("anonymize", False))
+    if mode == CASSETTE_MODE_REPLAY:
+        _LOGGER.warning("Replaying Oura API responses from %s", path)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, ReplayTransport.from_file, path, config.get("realtime", False)
+        )
+    raise ValueError(f"Unknown cassette mode {mode}")
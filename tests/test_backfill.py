@@ -0,0 +1,109 @@
+"""Tests for on-demand backfills."""
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.oura.backfill import Backfill, estimate_duration, plan_backfill
+from custom_components.oura.const import EVENT_BACKFILL_PROGRESS
+
+
+def test_plan_respects_endpoint_range_limits():
+    """Test that heart rate is split into 30-day requests."""
+    plan = plan_backfill(["sleep", "heartrate"], date(2024, 1, 1), date(2024, 3, 10))
+
+    assert plan[0] == ("sleep", date(2024, 1, 1), date(2024, 3, 10))
+    assert plan[1:] == [
+        ("heartrate", date(2024, 1, 1), date(2024, 1, 30)),
+        ("heartrate", date(2024, 1, 31), date(2024, 2, 29)),
+        ("heartrate", date(2024, 3, 1), date(2024, 3, 10)),
+    ]
+
+
+def test_estimate_duration():
+    """Test that estimates account for concurrency and the rate limit."""
+    assert estimate_duration(4, 2) == 3.0
+    assert estimate_duration(4, 1) == 6.0
+    # Beyond one rate-limit allowance, waiting for the next period dominates
+    assert estimate_duration(12000, 8) == 2250.0
+
+
+@pytest.fixture
+def backfill(mock_hass, mock_config_entry):
+    """Return a backfill runner with mocked dependencies."""
+    mock_hass.async_create_background_task = lambda coro, name: asyncio.ensure_future(coro)
+    mock_hass.bus = MagicMock()
+    api_client = MagicMock()
+    import_index = MagicMock()
+    import_index.async_load = AsyncMock()
+    history = MagicMock()
+    history.async_add = AsyncMock()
+    return Backfill(mock_hass, api_client, mock_config_entry, import_index, history)
+
+
+@pytest.mark.asyncio
+async def test_dry_run_reports_plan_without_requests(backfill):
+    """Test that a dry run only reports the plan."""
+    backfill.api_client.async_get_range = AsyncMock()
+
+    summary = backfill.async_start(["heartrate"], date(2024, 1, 1), date(2024, 3, 1), 2, dry_run=True)
+
+    assert summary["requests"] == 3
+    assert summary["requests_by_endpoint"] == {"heartrate": 3}
+    assert summary["days"] == 61
+    assert summary["estimated_seconds"] == 3.0
+    assert not backfill.running
+    backfill.api_client.async_get_range.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_backfill_imports_ranges_and_reports_progress(backfill):
+    """Test that ranges are fetched, imported and reported."""
+    async def get_range(source, first, last):
+        if first == date(2024, 1, 31):
+            raise TimeoutError("Timeout")
+        return {"data": [{"bpm": 60, "timestamp": f"{first.isoformat()}T08:00:00+00:00"}]}
+
+    backfill.api_client.async_get_range = AsyncMock(side_effect=get_range)
+
+    with patch("custom_components.oura.backfill.async_import_statistics", AsyncMock()) as import_statistics:
+        backfill.async_start(["heartrate"], date(2024, 1, 1), date(2024, 3, 1), 2)
+        assert backfill.running
+        await backfill._task
+
+    assert import_statistics.await_count == 2
+    assert backfill._history.async_add.await_count == 2
+
+    events = [call.args for call in backfill.hass.bus.async_fire.call_args_list]
+    assert all(event_type == EVENT_BACKFILL_PROGRESS for event_type, _data in events)
+    assert [data["status"] for _type, data in events] == ["running"] * 3 + ["done"]
+    assert events[-1][1] | {"entry_id": None} == {
+        "entry_id": None,
+        "status": "done",
+        "total": 3,
+        "completed": 3,
+        "failed": 1,
+        "documents": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_backfill_imports_ranges_of_an_endpoint_in_order(backfill):
+    """Test that ranges finishing out of order are still imported chronologically."""
+    async def get_range(source, first, last):
+        # Later ranges respond first
+        await asyncio.sleep((date(2024, 4, 1) - first).days / 10000)
+        return {"data": [{"bpm": 60, "timestamp": f"{first.isoformat()}T08:00:00+00:00"}]}
+
+    backfill.api_client.async_get_range = AsyncMock(side_effect=get_range)
+
+    with patch("custom_components.oura.backfill.async_import_statistics", AsyncMock()) as import_statistics:
+        backfill.async_start(["heartrate"], date(2024, 1, 1), date(2024, 3, 1), 3)
+        await backfill._task
+
+    imported = [
+        call.args[1]["heartrate"]["data"][0]["timestamp"][:10]
+        for call in import_statistics.await_args_list
+    ]
+    assert imported == ["2024-01-01", "2024-01-31", "2024-03-01"]
@@ -0,0 +1,46 @@
+"""Tests for chunked statistics submission with recorder backpressure."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.oura.backpressure import RecorderBackpressure, get_backpressure
+
+
+@pytest.mark.asyncio
+async def test_submit_splits_statistics_into_chunks(mock_hass):
+    """Test that statistics are submitted in bounded chunks."""
+    import_func = MagicMock()
+    backpressure = RecorderBackpressure(mock_hass, chunk_size=2)
+
+    with patch("custom_components.oura.backpressure.get_instance", side_effect=KeyError):
+        await backpressure.async_submit(import_func, {"statistic_id": "sensor.x"}, [1, 2, 3, 4, 5])
+
+    assert [call.args[2] for call in import_func.call_args_list] == [[1, 2], [3, 4], [5]]
+    assert backpressure.metrics.chunks == 3
+    assert backpressure.metrics.rows == 5
+    assert backpressure.metrics.waits == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_waits_for_recorder_queue_to_drain(mock_hass):
+    """Test that submission pauses above the high-water mark until drained."""
+    import_func = MagicMock()
+    recorder = MagicMock()
+    type(recorder).backlog = property(lambda self: depths.pop(0) if len(depths) > 1 else depths[0])
+    depths = [150, 80, 30, 10]
+    backpressure = RecorderBackpressure(mock_hass, chunk_size=10, high_water=100, low_water=20)
+
+    with patch("custom_components.oura.backpressure.get_instance", return_value=recorder), \
+         patch("custom_components.oura.backpressure.RECORDER_DRAIN_POLL_INTERVAL", 0):
+        await backpressure.async_submit(import_func, {}, list(range(10)))
+
+    assert import_func.call_count == 1
+    assert backpressure.metrics.waits == 1
+    assert backpressure.metrics.max_queue_depth == 150
+    assert backpressure.metrics.last_queue_depth == 10
+    assert backpressure.metrics.wait_seconds >= 0
+
+
+def test_backpressure_shared_per_instance(mock_hass):
+    """Test that one submitter is shared by all entries."""
+    assert get_backpressure(mock_hass) is get_backpressure(mock_hass)
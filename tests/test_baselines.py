@@ -0,0 +1,133 @@
+"""Tests for rolling baselines of daily metrics."""
+from datetime import date, timedelta
+import random
+import statistics
+
+import pytest
+
+from custom_components.oura.baselines import (
+    BASELINE_SENSOR_TYPES,
+    BaselineTracker,
+    RollingWindow,
+)
+
+
+def test_window_matches_full_recomputation():
+    """Test that incremental statistics equal a recomputation over the window."""
+    rng = random.Random(7)
+    window = RollingWindow(7)
+    values = [rng.gauss(50, 8) for _ in range(40)]
+
+    for ordinal, value in enumerate(values):
+        window.add(ordinal, value)
+
+    previous = values[-8:-1]
+    assert window.count == 7
+    assert window.current == values[-1]
+    assert window.mean == pytest.approx(statistics.fmean(previous))
+    assert window.variance == pytest.approx(statistics.variance(previous))
+    assert window.z_score() == pytest.approx(
+        (values[-1] - statistics.fmean(previous)) / statistics.stdev(previous)
+    )
+
+    ewma = values[0]
+    for value in values[1:-1]:
+        ewma += 0.25 * (value - ewma)
+    assert window.ewma == pytest.approx(ewma)
+
+
+def test_window_replaces_current_day_and_skips_missing_days():
+    """Test that the current day is revised in place and gaps expire days."""
+    window = RollingWindow(3)
+    for ordinal, value in ((1, 10.0), (2, 20.0), (3, 30.0)):
+        window.add(ordinal, value)
+
+    # Revising the current day leaves the baseline untouched
+    window.add(3, 33.0)
+    window.add(2, 99.0)
+    assert window.current == 33.0
+    assert window.mean == 15.0
+
+    # Days 1 and 2 fall out of the 3 days before day 6
+    window.add(6, 60.0)
+    assert window.count == 1
+    assert window.mean == 33.0
+    assert window.variance is None
+    assert window.z_score() is None
+
+
+def _days(count: int) -> list[str]:
+    """Return consecutive ISO days ending yesterday."""
+    start = date.today() - timedelta(days=count)
+    return [(start + timedelta(days=offset)).isoformat() for offset in range(count)]
+
+
+def test_tracker_exposes_baseline_sensors():
+    """Test baseline and z-score values seeded from a backfill."""
+    tracker = BaselineTracker()
+    days = _days(31)
+    scores = [70 + offset % 5 for offset in range(30)] + [90]
+    tracker.add_documents({"sleep": {"data": [
+        {"day": day, "score": score} for day, score in zip(days, scores)
+    ]}})
+
+    values = tracker.values()
+    assert values["sleep_score_baseline_7d"] == round(statistics.fmean(scores[-8:-1]), 1)
+    assert values["sleep_score_baseline_30d"] == 72.0
+    assert values["sleep_score_z_score"] == round(
+        (90 - statistics.fmean(scores[:-1])) / statistics.stdev(scores[:-1]), 2
+    )
+    # Metrics without enough days report no baseline
+    assert "average_sleep_hrv_baseline_7d" not in values
+
+    attributes = tracker.attributes("sleep_score_baseline_7d")
+    assert attributes["window_days"] == 7
+    assert attributes["days"] == 7
+
+    # A later poll revises the current day without touching the baseline
+    tracker.add_documents({"sleep": {"data": [{"day": days[-1], "score": 72}]}})
+    assert tracker.values()["sleep_score_baseline_30d"] == 72.0
+
+
+def test_baseline_sensor_types():
+    """Test that baseline sensors follow their metric's sensor."""
+    assert BASELINE_SENSOR_TYPES["average_sleep_hrv_baseline_7d"]["unit"] == "ms"
+    assert BASELINE_SENSOR_TYPES["average_sleep_hrv_z_score"]["unit"] is None
+    assert BASELINE_SENSOR_TYPES["sleep_score_baseline_30d"]["name"] == "Sleep Score 30-Day Baseline"
+
+
+def test_heart_rate_baseline_tracks_lowest_sleeping_heart_rate():
+    """Test that the heart rate baseline is in bpm from the detailed sleep."""
+    assert BASELINE_SENSOR_TYPES["lowest_heart_rate_baseline_7d"]["unit"] == "bpm"
+
+    tracker = BaselineTracker()
+    days = _days(4)
+    tracker.add_documents({
+        "readiness": {"data": [
+            {"day": day, "contributors": {"resting_heart_rate": 90}} for day in days
+        ]},
+        "sleep_detail": {"data": [
+            {"day": day, "lowest_heart_rate": bpm} for day, bpm in zip(days, (50, 52, 54, 60))
+        ]},
+    })
+
+    assert tracker.values()["lowest_heart_rate_baseline_7d"] == 52.0
+
+
+def test_naps_are_left_out_of_sleep_baselines():
+    """Test that a nap ending after the night's sleep is not the day's value."""
+    tracker = BaselineTracker()
+    days = _days(4)
+    documents = [
+        {"day": day, "type": "long_sleep", "lowest_heart_rate": 50, "average_hrv": 40}
+        for day in days
+    ]
+    documents.insert(2, {"day": days[1], "type": "late_nap", "lowest_heart_rate": 70, "average_hrv": 20})
+    # A day with only a nap is skipped
+    documents.insert(0, {"day": _days(5)[0], "type": "late_nap", "lowest_heart_rate": 80})
+    tracker.add_documents({"sleep_detail": {"data": documents}})
+
+    values = tracker.values()
+    assert values["lowest_heart_rate_baseline_7d"] == 50.0
+    assert values["average_sleep_hrv_baseline_7d"] == 40.0
+    assert tracker.attributes("lowest_heart_rate_baseline_7d")["days"] == 3
@@ -4,25 +4,19 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "custom_components"))
 
+from oura.baselines import BaselineTracker
 from oura.coordinator import OuraDataUpdateCoordinator
 
 
 class MockCoordinator:
     """Mock coordinator for testing data processing methods without HA framework."""
     
-    # Copy all the processing methods from the real coordinator
+    # Copy the processing method from the real coordinator
     _process_data = OuraDataUpdateCoordinator._process_data
-    _process_sleep_scores = OuraDataUpdateCoordinator._process_sleep_scores
-    _process_sleep_details = OuraDataUpdateCoordinator._process_sleep_details
-    _process_readiness = OuraDataUpdateCoordinator._process_readiness
-    _process_activity = OuraDataUpdateCoordinator._process_activity
-    _process_heart_rate = OuraDataUpdateCoordinator._process_heart_rate
-    _process_stress = OuraDataUpdateCoordinator._process_stress
-    _process_resilience = OuraDataUpdateCoordinator._process_resilience
-    _process_spo2 = OuraDataUpdateCoordinator._process_spo2
-    _process_vo2_max = OuraDataUpdateCoordinator._process_vo2_max
-    _process_cardiovascular_age = OuraDataUpdateCoordinator._process_cardiovascular_age
-    _process_sleep_time = OuraDataUpdateCoordinator._process_sleep_time
+
+    def __init__(self):
+        """Initialize the baselines the processing method updates."""
+        self.baselines = BaselineTracker()
 
 
 def test_process_sleep_scores():
@@ -42,8 +36,7 @@ def test_process_sleep_scores():
             ]
         }
     }
-    processed = {}
-    coordinator._process_sleep_scores(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["sleep_score"] == 85
     assert processed["sleep_efficiency"] == 90
@@ -70,8 +63,7 @@ def test_process_sleep_details_with_durations():
             ]
         }
     }
-    processed = {}
-    coordinator._process_sleep_details(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["total_sleep_duration"] == 8.0
     assert processed["deep_sleep_duration"] == 2.0
@@ -85,6 +77,26 @@ def test_process_sleep_details_with_durations():
     assert processed["rem_sleep_percentage"] == 25.0
 
 
+def test_process_sleep_details_hypnogram_summaries():
+    """Test that hypnogram and movement strings are summarized."""
+    coordinator = MockCoordinator()
+    data = {
+        "sleep_detail": {
+            "data": [
+                {
+                    "sleep_phase_5_min": "44214344244",
+                    "movement_30_sec": "1122111341114",
+                }
+            ]
+        }
+    }
+    processed = coordinator._process_data(data)
+    
+    assert processed["sleep_stage_transitions"] == 7
+    assert processed["wake_bouts"] == 2
+    assert processed["restless_periods"] == 3
+
+
 def test_process_sleep_details_low_battery_alert():
     """Test that low_battery_alert is extracted from sleep_detail data."""
     coordinator = MockCoordinator()
@@ -99,8 +111,7 @@ def test_process_sleep_details_low_battery_alert():
             ]
         }
     }
-    processed = {}
-    coordinator._process_sleep_details(data_true, processed)
+    processed = coordinator._process_data(data_true)
     assert processed["low_battery_alert"] is True
     
     # Test with False value
@@ -113,8 +124,7 @@ def test_process_sleep_details_low_battery_alert():
             ]
         }
     }
-    processed = {}
-    coordinator._process_sleep_details(data_false, processed)
+    processed = coordinator._process_data(data_false)
     assert processed["low_battery_alert"] is False
     
     # Test with missing value (should default to False)
@@ -127,8 +137,7 @@ def test_process_sleep_details_low_battery_alert():
             ]
         }
     }
-    processed = {}
-    coordinator._process_sleep_details(data_missing, processed)
+    processed = coordinator._process_data(data_missing)
     assert processed["low_battery_alert"] is False
 
 
@@ -149,8 +158,7 @@ def test_process_readiness():
             ]
         }
     }
-    processed = {}
-    coordinator._process_readiness(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["readiness_score"] == 82
     assert processed["temperature_deviation"] == -0.5
@@ -177,8 +185,7 @@ def test_process_activity():
             ]
         }
     }
-    processed = {}
-    coordinator._process_activity(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["activity_score"] == 88
     assert processed["steps"] == 12345
@@ -204,8 +211,7 @@ def test_process_heart_rate_with_aggregation():
             ]
         }
     }
-    processed = {}
-    coordinator._process_heart_rate(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["current_heart_rate"] == 57
     assert processed["heart_rate_timestamp"] == "2024-01-01T00:20:00"
@@ -228,8 +234,7 @@ def test_process_stress():
             ]
         }
     }
-    processed = {}
-    coordinator._process_stress(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["stress_high_duration"] == 60
     assert processed["recovery_high_duration"] == 30
@@ -253,8 +258,7 @@ def test_process_resilience():
             ]
         }
     }
-    processed = {}
-    coordinator._process_resilience(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["resilience_level"] == "solid"
     assert processed["sleep_recovery_score"] == 85
@@ -275,8 +279,7 @@ def test_process_spo2():
             ]
         }
     }
-    processed = {}
-    coordinator._process_spo2(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["spo2_average"] == 96.5
     assert processed["breathing_disturbance_index"] == 12
@@ -290,8 +293,7 @@ def test_process_vo2_max():
             "data": [{"vo2_max": 45.2}]
         }
     }
-    processed = {}
-    coordinator._process_vo2_max(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["vo2_max"] == 45.2
 
@@ -304,8 +306,7 @@ def test_process_cardiovascular_age():
             "data": [{"vascular_age": 28}]
         }
     }
-    processed = {}
-    coordinator._process_cardiovascular_age(data, processed)
+    processed = coordinator._process_data(data)
     
     assert processed["cardiovascular_age"] == 28
 
@@ -328,8 +329,7 @@ def test_process_sleep_time():
             ]
         }
     }
-    processed = {}
-    coordinator._process_sleep_time(data, processed)
+    processed = coordinator._process_data(data)
     
     # 2023-10-25 22:00:00 UTC
     expected_start = datetime(2023, 10, 25, 22, 0, 0, tzinfo=timezone.utc)
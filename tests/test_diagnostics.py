@@ -0,0 +1,72 @@
+"""Tests for the config entry diagnostics."""
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.oura.backpressure import DATA_BACKPRESSURE, RecorderBackpressure
+from custom_components.oura.const import DOMAIN
+from custom_components.oura.diagnostics import async_get_config_entry_diagnostics
+from custom_components.oura.freshness import FreshnessTracker
+from custom_components.oura.health import ApiHealth
+from custom_components.oura.tracing import Tracer, span
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_redact_tokens(mock_config_entry):
+    """Test that credentials never appear in the diagnostics."""
+    hass = SimpleNamespace(data={})
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_config_entry)
+
+    token = diagnostics["entry"]["data"]["token"]
+    assert token["access_token"] == "**REDACTED**" and token["refresh_token"] == "**REDACTED**"
+    assert "mock_client_secret" not in str(diagnostics)
+    assert diagnostics["entry"]["options"] == dict(mock_config_entry.options)
+    assert "coordinator" not in diagnostics
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_include_coordinator_metrics(mock_config_entry):
+    """Test that the stage aggregates, API health, freshness and import metrics are included."""
+    tracer = Tracer()
+    health = ApiHealth()
+    health.record_request("daily_sleep", 0.1, size=100, documents=1)
+    freshness = FreshnessTracker()
+    freshness.observe({"sleep": {"data": [{"day": "2024-01-01"}]}}, 0.0)
+    async with tracer.cycle("refresh"):
+        with span("process_data"):
+            pass
+    coordinator = SimpleNamespace(
+        last_update_success=True,
+        update_interval=timedelta(minutes=5),
+        historical_data_loaded=True,
+        data={"sleep_score": 85},
+        tracer=tracer,
+        api_client=SimpleNamespace(health=health),
+        freshness=freshness,
+    )
+    hass = SimpleNamespace(data={DOMAIN: {mock_config_entry.entry_id: coordinator}})
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_config_entry)
+    assert diagnostics["statistics_import"] is None
+
+    backpressure = hass.data[DATA_BACKPRESSURE] = RecorderBackpressure(hass)
+    backpressure.metrics.chunks = 2
+    backpressure.metrics.max_queue_depth = 40
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_config_entry)
+
+    assert diagnostics["coordinator"] == {
+        "last_update_success": True,
+        "update_interval_seconds": 300,
+        "historical_data_loaded": True,
+        "sensors_with_values": 1,
+    }
+    assert diagnostics["tracing"]["stages"]["refresh"]["process_data"]["count"] == 1
+    assert diagnostics["tracing"]["recent_cycles"][0]["cycle"] == "refresh"
+    assert diagnostics["api_health"]["endpoints"]["daily_sleep"]["requests"] == 1
+    assert diagnostics["freshness"]["sleep"]["samples"] == 0
+    assert diagnostics["statistics_import"]["chunks"] == 2
+    assert diagnostics["statistics_import"]["max_queue_depth"] == 40
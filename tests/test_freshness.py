@@ -0,0 +1,91 @@
+"""Tests for the freshness lag of new documents."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from homeassistant.util import dt as dt_util
+import pytest
+
+from custom_components.oura.freshness import FreshnessTracker, document_time
+
+HOUR = 3600.0
+
+
+def _timestamp(value: str) -> float:
+    """Return the POSIX time of an ISO 8601 string."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+@pytest.fixture
+def time_zone():
+    """Use a Home Assistant time zone that differs from UTC."""
+    default = dt_util.get_default_time_zone()
+    dt_util.set_default_time_zone(dt_util.get_time_zone("America/New_York"))
+    yield dt_util.get_default_time_zone()
+    dt_util.set_default_time_zone(default)
+
+
+def test_document_time(time_zone):
+    """Test the time taken from each kind of document."""
+    assert document_time(
+        {"day": "2024-01-02", "bedtime_end": "2024-01-02T07:30:00+01:00"}
+    ) == datetime(2024, 1, 2, 6, 30, tzinfo=timezone.utc)
+    assert document_time({"timestamp": "2024-01-02T08:00:00Z"}) == datetime(
+        2024, 1, 2, 8, tzinfo=timezone.utc
+    )
+    # Bare days and naive times are in Home Assistant's time zone
+    assert document_time({"day": "2024-01-02"}) == datetime(
+        2024, 1, 2, 5, tzinfo=timezone.utc
+    )
+    assert document_time({"timestamp": "2024-01-02T08:00:00"}) == datetime(
+        2024, 1, 2, 8, tzinfo=time_zone
+    )
+    assert document_time({"day": "not a day"}) is None
+    assert document_time({"score": 80}) is None
+
+
+def test_new_documents_are_sampled():
+    """Test the lag, poll wait and write lag of a new document."""
+    tracker = FreshnessTracker()
+    first_fetch = _timestamp("2024-01-02T08:00:00+00:00")
+    samples = {"data": [{"timestamp": "2024-01-02T07:55:00+00:00"}]}
+
+    # The first fetch only sets the starting point
+    tracker.observe({"heartrate": samples, "stress": {}}, first_fetch)
+    tracker.written(first_fetch + 1)
+    heartrate = tracker.as_dict()["heartrate"]
+    assert heartrate["samples"] == 0 and heartrate["last_sample"] is None
+    assert "stress" not in tracker.as_dict()
+
+    # Nothing new five minutes later
+    tracker.observe({"heartrate": samples}, first_fetch + 300)
+    assert tracker.as_dict()["heartrate"]["samples"] == 0
+
+    # A sample from 08:02, first returned at 08:10 and written a second later
+    samples["data"].append({"timestamp": "2024-01-02T08:02:00+00:00"})
+    tracker.observe({"heartrate": samples}, first_fetch + 600)
+    tracker.written(first_fetch + 601)
+    tracker.written(first_fetch + 700)
+
+    heartrate = tracker.as_dict()["heartrate"]
+    assert heartrate["samples"] == 1
+    assert heartrate["lag_s"]["p50"] == 480.0
+    assert heartrate["poll_wait_s"]["p50"] == 300.0
+    assert heartrate["lag_before_poll_s"]["p50"] == 180.0
+    assert heartrate["write_lag_s"] == {"p50": 1.0, "p95": 1.0, "max": 1.0}
+    assert heartrate["newest_document"] == "2024-01-02T08:02:00+00:00"
+    assert heartrate["last_sample"]["written"] is not None
+
+
+def test_failed_fetches_extend_the_poll_wait():
+    """Test that a failed fetch doesn't count as a poll."""
+    tracker = FreshnessTracker()
+    night = {"day": "2024-01-01", "bedtime_end": "2024-01-01T07:00:00+00:00"}
+    tracker.observe({"sleep": {"data": [night]}}, _timestamp("2024-01-01T08:00:00+00:00"))
+    tracker.observe({"sleep": {}}, _timestamp("2024-01-02T08:00:00+00:00"))
+    night = {"day": "2024-01-02", "bedtime_end": "2024-01-02T07:00:00+00:00"}
+    tracker.observe({"sleep": {"data": [night]}}, _timestamp("2024-01-02T09:00:00+00:00"))
+
+    sleep = tracker.as_dict()["sleep"]
+    assert sleep["lag_s"]["max"] == 2 * HOUR
+    assert sleep["poll_wait_s"]["max"] == 25 * HOUR
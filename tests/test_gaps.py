@@ -0,0 +1,104 @@
+"""Tests for repairing days missing from the imported statistics."""
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.oura.const import GAP_SCAN_SETTLE_DAYS
+from custom_components.oura.gaps import GapScanner, merge_gaps
+from custom_components.oura.import_index import ImportIndex
+
+
+def test_merge_gaps_respects_range_limit():
+    """Test that missing days are covered by the fewest allowed ranges."""
+    days = [1, 2, 3, 10, 11, 40, 41, 75]
+
+    assert merge_gaps(days) == [(1, 75)]
+    assert merge_gaps(days, 30) == [(1, 11), (40, 41), (75, 75)]
+    assert merge_gaps(list(range(1, 62)), 30) == [(1, 30), (31, 60), (61, 61)]
+    assert merge_gaps([], 30) == []
+
+
+def _point(day: date, value: float) -> dict:
+    """Return a daily data point for a day."""
+    return {"timestamp": datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc), "value": value}
+
+
+@pytest.fixture
+def import_index(mock_hass, mock_config_entry):
+    """Return an import index with in-memory storage."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=None)
+    with patch("custom_components.oura.import_index.Store", return_value=store):
+        yield ImportIndex(mock_hass, mock_config_entry)
+
+
+@pytest.mark.asyncio
+async def test_scan_fetches_only_missing_ranges(mock_hass, mock_config_entry, import_index):
+    """Test that only missing days are fetched and empty days are remembered."""
+    last = date.today() - timedelta(days=GAP_SCAN_SETTLE_DAYS)
+    days = [last - timedelta(days=offset) for offset in range(59, -1, -1)]
+    statistic_id = "oura:average_heart_rate"
+
+    # Days 10-49 were lost when two heart rate windows failed
+    import_index.mark_imported(statistic_id, [_point(day, 60) for day in days[:10] + days[50:]])
+
+    async def get_range(source, start, end):
+        # The ring was not worn on the last missing day
+        return {"data": [
+            {"bpm": 60, "timestamp": f"{day.isoformat()}T08:00:00+00:00"}
+            for day in days[10:49]
+            if start <= day <= end
+        ]}
+
+    async def import_statistics(hass, data, entry, series_cursors, index):
+        points = [
+            _point(date.fromisoformat(reading["timestamp"][:10]), reading["bpm"])
+            for reading in data["heartrate"]["data"]
+        ]
+        index.mark_imported(statistic_id, points)
+
+    api_client = MagicMock()
+    api_client.async_get_range = AsyncMock(side_effect=get_range)
+    scanner = GapScanner(mock_hass, api_client, mock_config_entry, import_index)
+
+    with patch(
+        "custom_components.oura.gaps.DAILY_METRICS", {"heartrate": ("average_heart_rate",)}
+    ), patch(
+        "custom_components.oura.gaps.resolve_statistic_id", return_value=statistic_id
+    ), patch(
+        "custom_components.oura.gaps.async_import_statistics", side_effect=import_statistics
+    ):
+        summary = await scanner.async_scan(60)
+
+        # The heart rate endpoint is limited to 30 days per request
+        assert [call.args[1:] for call in api_client.async_get_range.call_args_list] == [
+            (days[10], days[39]),
+            (days[40], days[49]),
+        ]
+        assert summary == {"ranges": 2, "repaired_days": 39, "empty_days": 1, "failed_ranges": 0}
+
+        # Nothing is missing any more, including the day without data
+        api_client.async_get_range.reset_mock()
+        summary = await scanner.async_scan(60)
+        api_client.async_get_range.assert_not_called()
+        assert summary["ranges"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scan_retries_failed_ranges(mock_hass, mock_config_entry, import_index):
+    """Test that days of a failed request stay missing for the next scan."""
+    api_client = MagicMock()
+    api_client.async_get_range = AsyncMock(side_effect=TimeoutError("Timeout"))
+    scanner = GapScanner(mock_hass, api_client, mock_config_entry, import_index)
+
+    with patch(
+        "custom_components.oura.gaps.DAILY_METRICS", {"sleep": ("sleep_score",)}
+    ), patch(
+        "custom_components.oura.gaps.resolve_statistic_id", return_value="oura:sleep_score"
+    ):
+        summary = await scanner.async_scan(5)
+        assert summary == {"ranges": 1, "repaired_days": 0, "empty_days": 0, "failed_ranges": 1}
+
+        await scanner.async_scan(5)
+        assert api_client.async_get_range.call_count == 2
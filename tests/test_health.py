@@ -0,0 +1,146 @@
+"""Tests for the API health metrics."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from aiohttp import ClientConnectionError, ClientResponseError, ClientSession
+import pytest
+
+from benchmarks.mock_server import MockOuraServer
+from custom_components.oura.api import OuraApiClient
+from custom_components.oura.const import CONF_API_BASE_URL
+from custom_components.oura.health import (
+    HEALTH_SENSOR_TYPES,
+    ApiHealth,
+    RingBuffer,
+    error_class,
+    histogram,
+    percentile,
+)
+
+
+class _Clock:
+    """Settable wall clock."""
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ring_buffer_keeps_the_newest_samples():
+    """Test that a full buffer drops its oldest samples."""
+    buffer = RingBuffer(3)
+    assert buffer.values() == [] and buffer.last() is None
+
+    for value in range(5):
+        buffer.append(value)
+
+    assert buffer.values() == [2.0, 3.0, 4.0]
+    assert buffer.last() == 4.0 and buffer.count == 3
+
+
+def test_histogram_and_percentile():
+    """Test bucketing by upper bound and nearest-rank percentiles."""
+    assert histogram([10, 50, 51, 5000], (50, 100)) == {"<=50": 2, "<=100": 1, ">100": 1}
+    assert percentile([], 95) is None
+    assert percentile([float(value) for value in range(1, 101)], 95) == 95.0
+    assert percentile([3.0], 50) == 3.0
+
+
+def test_error_classes():
+    """Test that errors are grouped by status, timeout and connection."""
+    response_error = ClientResponseError(MagicMock(), (), status=429)
+    assert error_class(response_error) == "http_429"
+    assert error_class(asyncio.TimeoutError()) == "timeout"
+    assert error_class(ClientConnectionError()) == "connection"
+    assert error_class(ValueError()) == "ValueError"
+
+
+def test_endpoint_histograms():
+    """Test the per-endpoint latency, size, document and error histograms."""
+    health = ApiHealth(size=4)
+    for latency in (0.02, 0.2, 3.0):
+        health.record_request("daily_sleep", latency, size=2048, documents=1)
+    health.record_request("daily_sleep", 30.0, error=asyncio.TimeoutError())
+    health.record_request("daily_sleep", 0.04, size=512, documents=0)
+
+    endpoint = health.as_dict()["endpoints"]["daily_sleep"]
+    # The first request fell out of the buffer
+    assert endpoint["requests"] == 5 and endpoint["buffered"] == 4
+    assert endpoint["errors"] == {"timeout": 1}
+    assert endpoint["latency_ms"]["max"] == 30000.0
+    assert endpoint["latency_ms"]["histogram"]["<=50"] == 1
+    assert endpoint["latency_ms"]["histogram"][">10000"] == 1
+    # Sizes and documents only count successful responses
+    assert sum(endpoint["response_bytes"]["histogram"].values()) == 3
+    assert endpoint["response_bytes"]["histogram"]["<=10240"] == 2
+    assert endpoint["documents"]["histogram"] == {
+        "<=0": 1, "<=1": 2, "<=10": 0, "<=100": 0, "<=1000": 0, "<=10000": 0, ">10000": 0,
+    }
+
+
+def test_sensor_values_cover_the_last_hour():
+    """Test that the rates only count requests of the last hour."""
+    clock = _Clock()
+    health = ApiHealth(clock=clock)
+    assert health.values() == {
+        "last_refresh_duration": None,
+        "api_requests_per_hour": 0,
+        "api_errors_per_hour": 0,
+        "api_latency_p95": None,
+    }
+
+    health.record_request("daily_sleep", 5.0, error=asyncio.TimeoutError())
+    clock.now += 3000
+    health.record_request("daily_sleep", 0.1)
+    health.record_request("heartrate", 0.3)
+    health.record_cycle(1.234)
+    clock.now += 1000
+
+    assert health.values() == {
+        "last_refresh_duration": 1.23,
+        "api_requests_per_hour": 2,
+        "api_errors_per_hour": 0,
+        "api_latency_p95": 300.0,
+    }
+    assert set(HEALTH_SENSOR_TYPES) == set(health.values())
+
+
+def test_cycles():
+    """Test the refresh cycle aggregates."""
+    health = ApiHealth(cycle_size=2)
+    for duration in (10.0, 1.0, 2.0):
+        health.record_cycle(duration, success=duration < 5)
+    health.record_cycle(3.0, success=False)
+
+    cycles = health.as_dict()["cycles"]
+    assert cycles["buffered"] == 2 and cycles["failed"] == 2
+    assert cycles["duration_s"] == {"p50": 2.0, "p95": 3.0, "max": 3.0}
+
+
+@pytest.mark.asyncio
+async def test_api_client_records_requests():
+    """Test that every request of a refresh is recorded by endpoint."""
+    oauth = MagicMock()
+    oauth.async_ensure_token_valid = AsyncMock()
+    oauth.valid_token = True
+    oauth.token = {"access_token": "token"}
+
+    async with MockOuraServer() as server, ClientSession() as client_session:
+        entry = SimpleNamespace(data={CONF_API_BASE_URL: server.base_url}, options={})
+        client = OuraApiClient(MagicMock(), oauth, entry)
+        client._client_session = client_session
+        await client.async_get_data(days_back=1)
+
+    endpoints = client.health.as_dict()["endpoints"]
+    assert len(endpoints) == 11
+    sleep = endpoints["daily_sleep"]
+    assert sleep["requests"] == 1 and sleep["errors"] == {}
+    assert sum(sleep["documents"]["histogram"].values()) == 1
+    assert sleep["response_bytes"]["max"] > 0
+    assert client.health.values()["api_requests_per_hour"] == 11
+
@@ -0,0 +1,87 @@
+"""Tests for the local columnar history store."""
+from datetime import date
+import math
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.oura.history_store import HistoryStore, Segment, encode_segment
+from custom_components.oura.metrics import extract_daily_values
+
+
+@pytest.fixture
+def history_store(mock_hass, mock_config_entry, tmp_path) -> HistoryStore:
+    """Return a history store under a temporary config directory."""
+    mock_hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=lambda func, *args: func(*args))
+    return HistoryStore(mock_hass, mock_config_entry)
+
+
+def test_segment_round_trip():
+    """Test that encoded segments decode to the same rows."""
+    days = [date(2024, 1, day).toordinal() for day in (2, 5, 9)]
+    segment = Segment(encode_segment(days, {
+        "sleep_score": [80.0, math.nan, 85.0],
+        "restfulness": [70.0, 71.0, 72.0],
+    }))
+
+    assert list(segment.days) == days
+    assert segment.find(days[0] + 1, days[2]) == (1, 3)
+    assert segment.column("sleep_score", 1, 3) == [None, 85.0]
+    assert segment.column("unknown", 0, 2) == [None, None]
+    assert segment.to_rows()[days[1]] == {"restfulness": 71.0}
+
+
+def test_daily_values_reduce_readings_per_day():
+    """Test that timestamped readings are reduced to daily values."""
+    daily = extract_daily_values("heartrate", [
+        {"bpm": 50, "timestamp": "2024-01-01T08:00:00+00:00"},
+        {"bpm": 70, "timestamp": "2024-01-01T18:00:00+00:00"},
+        {"bpm": 60, "timestamp": "2024-01-02T08:00:00+00:00"},
+    ])
+
+    assert daily["2024-01-01"] == {"average_heart_rate": 60, "min_heart_rate": 50, "max_heart_rate": 70}
+    assert daily["2024-01-02"]["average_heart_rate"] == 60
+
+
+@pytest.mark.asyncio
+async def test_store_merges_and_reads_ranges_across_months(
+    history_store, mock_hass, mock_config_entry, tmp_path
+):
+    """Test monthly segments, merging of polls, and range reads."""
+    backfill = {
+        "sleep": {"data": [
+            {"day": "2024-01-30", "score": 80, "contributors": {"efficiency": 90}},
+            {"day": "2024-01-31", "score": 81},
+            {"day": "2024-02-01", "score": 82},
+        ]},
+        "readiness": {"data": [{"day": "2024-01-31", "score": 75}]},
+    }
+    assert await history_store.async_add(backfill) == 3
+    assert sorted(path.name for path in (tmp_path / ".storage/oura_history/mock_entry_id/sleep").iterdir()) == [
+        "2024-01.seg",
+        "2024-02.seg",
+    ]
+
+    # A poll revises the last day and adds a new one; unchanged months are not rewritten
+    poll = {"sleep": {"data": [{"day": "2024-02-01", "score": 83}, {"day": "2024-02-02", "score": 84}]}}
+    assert await history_store.async_add(poll) == 1
+    assert await history_store.async_add(poll) == 0
+
+    columns = await history_store.async_read(
+        "sleep", date(2024, 1, 31), date(2024, 2, 5), ["sleep_score", "sleep_efficiency"]
+    )
+    assert columns == {
+        "day": ["2024-01-31", "2024-02-01", "2024-02-02"],
+        "sleep_score": [81.0, 83.0, 84.0],
+        "sleep_efficiency": [None, None, None],
+    }
+
+    # A fresh store finds the segments on disk
+    reopened = HistoryStore(mock_hass, mock_config_entry)
+    columns = reopened.read("sleep", date(2024, 1, 1).toordinal(), date(2024, 1, 30).toordinal())
+    assert columns["day"] == ["2024-01-30"]
+    assert columns["sleep_efficiency"] == [90.0]
+
+    await history_store.async_remove()
+    assert history_store.read("sleep", 1, date(2030, 1, 1).toordinal())["day"] == []
@@ -0,0 +1,117 @@
+"""Tests for the day-level import index."""
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.oura.import_index import ImportIndex, _decode, _encode
+
+
+@pytest.fixture
+def mock_store():
+    """Patch the index storage with an in-memory store."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=None)
+    with patch("custom_components.oura.import_index.Store", return_value=store):
+        yield store
+
+
+def _point(day: int, value: float) -> dict:
+    """Return a daily data point at noon UTC."""
+    return {"timestamp": datetime(2024, 1, day, 12, tzinfo=timezone.utc), "value": value}
+
+
+@pytest.mark.asyncio
+async def test_unchanged_days_are_skipped(mock_hass, mock_config_entry, mock_store):
+    """Test that only new or changed days pass the index."""
+    index = ImportIndex(mock_hass, mock_config_entry)
+    await index.async_load()
+
+    points = [_point(2, 80), _point(3, 85)]
+    assert index.filter_changed("sensor.oura_ring_sleep_score", points) == points
+    index.mark_imported("sensor.oura_ring_sleep_score", points)
+
+    changed = index.filter_changed(
+        "sensor.oura_ring_sleep_score", [_point(1, 70), _point(2, 80), _point(3, 86), _point(4, 90)]
+    )
+    assert [point["timestamp"].day for point in changed] == [1, 3, 4]
+
+    # Other statistics are indexed separately
+    assert index.filter_changed("oura:sleep_score", points) == points
+
+
+@pytest.mark.asyncio
+async def test_index_extends_and_persists(mock_hass, mock_config_entry, mock_store):
+    """Test that the index grows in both directions and round-trips storage."""
+    index = ImportIndex(mock_hass, mock_config_entry)
+    await index.async_load()
+
+    index.mark_imported("sensor.oura_ring_steps", [_point(10, 1000)])
+    index.mark_imported("sensor.oura_ring_steps", [_point(5, 500), _point(20, 2000)])
+
+    # Saving is delayed and coalesced
+    data_func = mock_store.async_delay_save.call_args.args[0]
+    stored = data_func()["statistics"]["sensor.oura_ring_steps"]
+    assert stored["first"] == datetime(2024, 1, 5).toordinal()
+    assert len(_decode(stored["hashes"])) == 16
+
+    mock_store.async_load.return_value = data_func()
+    reloaded = ImportIndex(mock_hass, mock_config_entry)
+    await reloaded.async_load()
+
+    changed = reloaded.filter_changed(
+        "sensor.oura_ring_steps", [_point(5, 500), _point(6, 600), _point(20, 2000)]
+    )
+    assert [point["timestamp"].day for point in changed] == [6]
+
+
+def test_hash_array_encoding_round_trip():
+    """Test that hash arrays survive encoding."""
+    from array import array
+
+    hashes = array("I", [0, 1, 0xFFFFFFFF, 12345])
+    assert _decode(_encode(hashes)) == hashes
+
+
+@pytest.mark.asyncio
+async def test_gaps_union_statistics_and_skip_empty_days(mock_hass, mock_config_entry, mock_store):
+    """Test that a day is a gap only if no statistic of the source has it."""
+    index = ImportIndex(mock_hass, mock_config_entry)
+    await index.async_load()
+
+    index.mark_imported("sensor.oura_ring_sleep_score", [_point(1, 80), _point(2, 81)])
+    index.mark_imported("sensor.oura_ring_restfulness", [_point(4, 70)])
+    first = datetime(2024, 1, 1).toordinal()
+
+    gaps = index.find_gaps(
+        "sleep", ["sensor.oura_ring_sleep_score", "sensor.oura_ring_restfulness"], first, first + 5
+    )
+    assert gaps == [first + 2, first + 4, first + 5]
+
+    index.mark_empty("sleep", [first + 2])
+    assert index.find_gaps("sleep", ["sensor.oura_ring_sleep_score"], first, first + 3) == [first + 3]
+    # Empty days are tracked per data source
+    assert index.find_gaps("readiness", [], first + 2, first + 2) == [first + 2]
+
+    mock_store.async_load.return_value = mock_store.async_delay_save.call_args.args[0]()
+    reloaded = ImportIndex(mock_hass, mock_config_entry)
+    await reloaded.async_load()
+    assert reloaded.find_gaps("sleep", [], first + 1, first + 3) == [first + 1, first + 3]
+
+
+@pytest.mark.asyncio
+async def test_rekey_moves_imported_days(mock_hass, mock_config_entry, mock_store):
+    """Test that a renamed statistic keeps its imported days."""
+    index = ImportIndex(mock_hass, mock_config_entry)
+    await index.async_load()
+    index.mark_imported("sensor.oura_ring_steps", [_point(1, 100), _point(2, 200)])
+    index.mark_imported("sensor.steps", [_point(4, 400)])
+
+    index.rekey("sensor.oura_ring_steps", "sensor.steps")
+
+    assert index.filter_changed("sensor.oura_ring_steps", [_point(1, 100)]) == [_point(1, 100)]
+    assert index.filter_changed(
+        "sensor.steps", [_point(1, 100), _point(2, 200), _point(3, 300), _point(4, 400)]
+    ) == [_point(3, 300)]
+    first, last = datetime(2024, 1, 1).toordinal(), datetime(2024, 1, 4).toordinal()
+    assert index.find_gaps("activity", ["sensor.steps"], first, last) == [first + 2]
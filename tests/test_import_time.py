@@ -0,0 +1,60 @@
+"""Tests for the import time benchmark."""
+from __future__ import annotations
+
+from benchmarks.import_time import (
+    BUDGETS,
+    DEFERRED_MODULES,
+    _MARKER,
+    check_budgets,
+    measure_import,
+    parse_importtime,
+    summarize,
+)
+
+_OUTPUT = f"""\
+import time: self [us] | cumulative | imported package
+import time:       900 |        900 | homeassistant.core
+{_MARKER}
+import time:       120 |        120 |   custom_components.oura.const
+import time:       300 |        300 |   fractions
+import time:      1500 |       1920 | custom_components.oura
+import time:       400 |        400 |   custom_components.oura.statistics
+"""
+
+
+def test_parse_and_summarize():
+    """Test that only modules imported after the marker are counted."""
+    modules = parse_importtime(_OUTPUT)
+    assert modules == [
+        ("custom_components.oura.const", 120),
+        ("fractions", 300),
+        ("custom_components.oura", 1500),
+        ("custom_components.oura.statistics", 400),
+    ]
+    assert summarize(modules) == {
+        "total_ms": 2.32,
+        "integration_ms": 2.02,
+        "modules": 4,
+        "deferred_loaded": ["custom_components.oura.statistics"],
+    }
+
+
+def test_check_budgets():
+    """Test that exceeded budgets and loaded deferred modules are reported."""
+    within = dict(BUDGETS, deferred_loaded=[])
+    assert check_budgets(within) == []
+
+    exceeded = dict(within, modules=BUDGETS["modules"] + 1, deferred_loaded=["pstats"])
+    assert check_budgets(exceeded) == [
+        f"modules {BUDGETS['modules'] + 1} exceeds the budget of {BUDGETS['modules']}",
+        "pstats is loaded on import",
+    ]
+
+
+def test_import_defers_statistics_and_profiling():
+    """Test that importing the integration loads none of the deferred modules."""
+    result = measure_import()
+
+    assert "custom_components.oura.statistics" in DEFERRED_MODULES
+    assert result["modules"] > 0
+    assert result["deferred_loaded"] == []
@@ -0,0 +1,78 @@
+"""Tests for the multi-account load test harness."""
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.load_test import (
+    THRESHOLDS,
+    async_load,
+    check_thresholds,
+    next_refresh,
+    peak_overlap,
+    peak_rate,
+)
+from benchmarks.mock_server import MockOuraServer
+
+
+def _discard_statistics(hass, metadata, statistics) -> None:
+    """Stand in for the recorder import functions."""
+
+
+def test_peak_overlap():
+    """Test that spans touching at an edge do not overlap."""
+    assert peak_overlap([]) == 0
+    assert peak_overlap([(0, 1), (1, 2), (2, 3)]) == 1
+    assert peak_overlap(iter([(0, 2), (1, 3), (1.5, 4), (3, 5)])) == 3
+
+
+def test_peak_rate():
+    """Test the most starts within a sliding window."""
+    assert peak_rate([]) == 0
+    assert peak_rate([0.0, 0.5, 0.99, 1.0, 1.2, 5.0]) == 4
+    assert peak_rate([0.0, 0.1, 0.2], window=0.15) == 2
+
+
+def test_next_refresh_is_truncated_to_the_second():
+    """Test that refreshes finishing within the same second cluster again."""
+    assert next_refresh(10.2, 5, 0.3) == next_refresh(10.9, 5, 0.3) == pytest.approx(15.3)
+
+
+def test_check_thresholds():
+    """Test that results are checked against the largest covered entry count."""
+    limit = THRESHOLDS[10]["loop_lag_p99_ms"]
+    results = [
+        {"case": "load_aligned", "size": "12e", "entries": 12, "loop_lag_p99_ms": limit + 1},
+        {"case": "load_aligned", "size": "10e", "entries": 10, "loop_lag_p99_ms": limit},
+        {"case": "load_aligned", "size": "0e", "entries": 0, "loop_lag_p99_ms": 10_000},
+    ]
+
+    assert check_thresholds(results) == [
+        f"load_aligned 12e: loop_lag_p99_ms {limit + 1} exceeds {limit}"
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["aligned", "staggered"])
+async def test_load(tmp_path: Path, mode: str):
+    """Test a short load run against the mock API."""
+    with (
+        patch("custom_components.oura.statistics.async_import_statistics_ha", _discard_statistics),
+        patch("custom_components.oura.statistics.async_add_external_statistics", _discard_statistics),
+    ):
+        async with MockOuraServer() as server:
+            result = await async_load(3, server.base_url, str(tmp_path), cycles=2, interval=0.5, mode=mode)
+
+    assert result["refreshes"] == 6
+    assert result["requests"] == 66 and result["failed_requests"] == 0
+    assert result["request_peak_in_flight"] <= 33
+    if mode == "aligned":
+        assert result["refresh_peak_in_flight"] == 3
+    assert result["memory_per_entry_kib"] > 0
+    assert result["loop_lag_p99_ms"] is not None
+    # Every entry wrote its own history store
+    assert {path.name for path in (tmp_path / ".storage" / "oura_history").iterdir()} == {
+        "load_0", "load_1", "load_2",
+    }
@@ -0,0 +1,96 @@
+"""Tests for the Oura metric catalog."""
+from datetime import datetime, timezone
+
+from custom_components.oura.const import SENSOR_TYPES
+from custom_components.oura.metrics import (
+    METRIC_CATALOG,
+    SOURCE_SERIES,
+    STATISTIC_MEAN,
+    STATISTIC_SUM,
+    daily_documents,
+    extract_current_values,
+    metric_name,
+    metric_unit,
+)
+from custom_components.oura.statistics import STATISTICS_METADATA
+
+
+def test_every_sensor_has_a_metric():
+    """Test that every sensor entity reads its value through the catalog."""
+    for sensor_key in SENSOR_TYPES:
+        assert sensor_key in METRIC_CATALOG, f"Sensor {sensor_key} not in METRIC_CATALOG"
+
+
+def test_catalog_descriptors_are_complete():
+    """Test that every descriptor defines a source, a value and a statistic type."""
+    for key, descriptor in METRIC_CATALOG.items():
+        assert "source" in descriptor
+        assert sum(field in descriptor for field in ("path", "compute", "series")) == 1, key
+        assert descriptor["statistic"] in (STATISTIC_MEAN, STATISTIC_SUM, None)
+        if "series" in descriptor:
+            # Series have no entity, so they name themselves
+            assert key not in SENSOR_TYPES
+            assert descriptor["name"]
+
+
+def test_statistics_metadata_follows_sensor_units():
+    """Test that statistics use the unit of the sensor entity they belong to."""
+    for key, metadata in STATISTICS_METADATA.items():
+        assert metadata["unit"] == metric_unit(key)
+        assert metadata["name"] == metric_name(key)
+        if key in SENSOR_TYPES:
+            assert metadata["unit"] == SENSOR_TYPES[key]["unit"]
+
+    assert STATISTICS_METADATA["steps"]["has_sum"] is True
+    assert STATISTICS_METADATA["sleep_hrv"]["external"] is True
+    assert "stress_day_summary" not in STATISTICS_METADATA
+    assert {series["sensor_key"] for series in SOURCE_SERIES["activity"]} == {
+        "activity_met",
+        "active_time",
+        "sedentary_time",
+    }
+
+
+def test_extract_current_values_single_pass():
+    """Test live values from the latest document of each source."""
+    data = {
+        "stress": {"data": [
+            {"stress_high": 60, "recovery_high": 60},
+            {"stress_high": 1800, "recovery_high": None, "day_summary": "normal"},
+        ]},
+        "spo2": {"data": [{"spo2_percentage": None, "breathing_disturbance_index": 3}]},
+        "sleep_time": {"data": [{
+            "day": "2024-03-10",
+            "optimal_bedtime": {"day_tz": 3600, "start_offset": -3600, "end_offset": 0},
+        }]},
+        "heartrate": {"data": [{"bpm": bpm, "timestamp": f"t{bpm}"} for bpm in range(40, 60)]},
+    }
+
+    values = extract_current_values(data)
+
+    assert values["stress_high_duration"] == 30
+    assert "recovery_high_duration" not in values
+    assert values["stress_day_summary"] == "normal"
+    assert "spo2_average" not in values
+    assert values["breathing_disturbance_index"] == 3
+    assert values["optimal_bedtime_start"] == datetime(2024, 3, 9, 22, 0, tzinfo=timezone.utc)
+    assert values["optimal_bedtime_end"] == datetime(2024, 3, 9, 23, 0, tzinfo=timezone.utc)
+    # Heart rate aggregates the last 10 readings
+    assert values["current_heart_rate"] == 59
+    assert values["heart_rate_timestamp"] == "t59"
+    assert (values["min_heart_rate"], values["max_heart_rate"]) == (50, 59)
+    assert values["average_heart_rate"] == 54.5
+
+
+def test_daily_documents_prefer_the_main_sleep():
+    """Test that a nap never replaces the night's sleep of the same day."""
+    night = {"day": "2024-01-02", "type": "long_sleep"}
+    documents = [
+        {"day": "2024-01-01", "type": "sleep"},
+        {"day": "2024-01-01", "type": "late_nap"},
+        night,
+        {"day": "2024-01-02", "type": "late_nap"},
+        {"timestamp": "2024-01-02T08:00:00+00:00"},
+    ]
+
+    assert daily_documents(documents) == [documents[1], night]
@@ -0,0 +1,167 @@
+"""Tests running the API client against the local mock Oura API."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiohttp import ClientResponseError, ClientSession, web
+import pytest
+import pytest_asyncio
+
+from benchmarks.mock_server import ALL_SCOPES, MockOuraServer
+from custom_components.oura.api import OuraApiClient
+from custom_components.oura.const import CONF_API_BASE_URL
+from custom_components.oura.metrics import extract_current_values
+from custom_components.oura.sensor import SENSOR_TYPES
+
+
+@pytest_asyncio.fixture
+async def client_session() -> AsyncIterator[ClientSession]:
+    """Return an aiohttp client session."""
+    async with ClientSession() as session:
+        yield session
+
+
+def _client(server: MockOuraServer, client_session: ClientSession) -> OuraApiClient:
+    """Return an API client requesting the mock server."""
+    oauth = MagicMock()
+    oauth.async_ensure_token_valid = AsyncMock()
+    oauth.valid_token = True
+    oauth.token = {"access_token": "mock_access_token"}
+    entry = SimpleNamespace(data={CONF_API_BASE_URL: server.base_url}, options={})
+    with patch("custom_components.oura.api.async_get_clientsession", return_value=client_session):
+        client = OuraApiClient(MagicMock(), oauth, entry)
+        assert client.client_session is client_session
+    return client
+
+
+@pytest.mark.asyncio
+async def test_get_data_from_mock_api(client_session: ClientSession):
+    """Test that a regular update yields a value for every sensor."""
+    async with MockOuraServer(page_size=1) as server:
+        data = await _client(server, client_session).async_get_data(days_back=1)
+
+    values = extract_current_values(data)
+    assert set(SENSOR_TYPES) - set(values) <= {"low_battery_alert"}
+    # Two days of daily documents, one page each
+    assert len(data["sleep"]["data"]) == 2
+    assert server.request_count("daily_sleep") == 2
+    assert server.request_count(status=200) == len(server.requests)
+
+
+@pytest.mark.asyncio
+async def test_historical_heartrate_stays_within_range_limit(client_session: ClientSession):
+    """Test that a historical load batches heart rate requests the API accepts."""
+    async with MockOuraServer() as server:
+        data = await _client(server, client_session).async_get_data(days_back=90)
+
+    assert server.request_count("heartrate", 400) == 0
+    assert server.request_count("heartrate") == 4
+    assert len(data["heartrate"]["data"]) == 91 * 288
+
+
+@pytest.mark.asyncio
+async def test_missing_scope_keeps_other_endpoints(client_session: ClientSession):
+    """Test that endpoints without a granted scope are skipped."""
+    async with MockOuraServer(scopes=ALL_SCOPES - {"heart_health"}) as server:
+        data = await _client(server, client_session).async_get_data(days_back=1)
+
+    assert data["vo2_max"] == {"data": []} and data["cardiovascular_age"] == {"data": []}
+    assert data["sleep"]["data"]
+    assert server.request_count("vO2_max", 401) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit(client_session: ClientSession):
+    """Test that requests beyond the budget are rejected with Retry-After."""
+    async with MockOuraServer(rate_limit=2, rate_period=60) as server:
+        client = _client(server, client_session)
+        url = f"{server.base_url}/daily_sleep"
+        await client._async_get(url)
+        await client._async_get(url)
+        with pytest.raises(ClientResponseError) as err:
+            await client._async_get(url)
+
+    assert err.value.status == 429
+    assert 1 <= int(err.value.headers["Retry-After"]) <= 60
+
+
+@pytest.mark.asyncio
+async def test_heartrate_range_limit(client_session: ClientSession):
+    """Test that heart rate ranges beyond 30 days are rejected."""
+    async with MockOuraServer() as server:
+        async with client_session.get(
+            f"{server.base_url}/heartrate",
+            headers={"Authorization": "Bearer token"},
+            params={"start_datetime": "2024-01-01T00:00:00", "end_datetime": "2024-02-15T00:00:00"},
+        ) as response:
+            assert response.status == 400
+        async with client_session.get(f"{server.base_url}/daily_sleep") as response:
+            assert response.status == 401
+
+
+@pytest.mark.asyncio
+async def test_latency(client_session: ClientSession):
+    """Test that responses are delayed by the configured latency."""
+    async with MockOuraServer(latency=0.05) as server:
+        started = datetime.now()
+        await _client(server, client_session)._async_get(f"{server.base_url}/daily_sleep")
+
+    assert datetime.now() - started >= timedelta(seconds=0.05)
+
+
+@pytest.mark.asyncio
+async def test_webhook_delivery(client_session: ClientSession):
+    """Test that verified webhook subscriptions receive events."""
+    received = []
+
+    async def handle_callback(request: web.Request) -> web.Response:
+        if request.method == "GET":
+            assert request.query["verification_token"] == "secret"
+            return web.json_response({"challenge": request.query["challenge"]})
+        received.append(await request.json())
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_route("*", "/callback", handle_callback)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    callback_url = f"http://127.0.0.1:{runner.addresses[0][1]}/callback"
+
+    try:
+        async with MockOuraServer() as server:
+            headers = {"x-client-id": server.client_id, "x-client-secret": server.client_secret}
+            async with client_session.post(
+                f"{server.origin}/v2/webhook/subscription",
+                headers=headers,
+                json={
+                    "callback_url": callback_url,
+                    "verification_token": "secret",
+                    "event_type": "create",
+                    "data_type": "daily_sleep",
+                },
+            ) as response:
+                assert response.status == 201
+                subscription = await response.json()
+
+            assert await server.async_deliver_webhook("daily_sleep", "create", "abc") == 1
+            assert await server.async_deliver_webhook("daily_activity", "create") == 0
+            async with client_session.delete(
+                f"{server.origin}/v2/webhook/subscription/{subscription['id']}", headers=headers
+            ) as response:
+                assert response.status == 204
+    finally:
+        await runner.cleanup()
+
+    assert received == [
+        {
+            "event_type": "create",
+            "data_type": "daily_sleep",
+            "object_id": "abc",
+            "event_time": received[0]["event_time"],
+            "user_id": "mock_user",
+        }
+    ]
@@ -0,0 +1,99 @@
+"""Tests for on-demand profiling."""
+from __future__ import annotations
+
+import asyncio
+import pstats
+from pathlib import Path
+from types import SimpleNamespace
+import tracemalloc
+
+import pytest
+
+from custom_components.oura.profiler import (
+    PROFILE_DIR,
+    Profiler,
+    _summarize_results,
+    get_profiler,
+)
+
+
+def _hass(config_dir: Path) -> SimpleNamespace:
+    """Return the parts of Home Assistant the profiler uses."""
+    jobs = []
+
+    async def async_add_executor_job(target, *args):
+        jobs.append(target)
+        return target(*args)
+
+    return SimpleNamespace(
+        data={},
+        jobs=jobs,
+        config=SimpleNamespace(path=lambda *parts: str(config_dir.joinpath(*parts))),
+        async_add_executor_job=async_add_executor_job,
+    )
+
+
+retained: list[bytes] = []
+
+
+def _allocate() -> None:
+    """Allocate memory that outlives the profiled run."""
+    retained.append(bytes(512 * 1024))
+
+
+async def _refresh() -> None:
+    """Stand-in for a refresh."""
+    await asyncio.sleep(0)
+    _allocate()
+
+
+@pytest.mark.asyncio
+async def test_profile_writes_stats_and_allocations(tmp_path: Path):
+    """Test that a profiled run is written to disk and summarized."""
+    hass = _hass(tmp_path)
+    profiler = Profiler(hass)
+
+    summary = await profiler.async_profile("entry_id", "refresh", _refresh, top=5)
+
+    assert not profiler.running and not tracemalloc.is_tracing()
+    # Snapshots, their comparison and the summary run in the executor
+    assert hass.jobs == [tracemalloc.take_snapshot, _summarize_results]
+    assert summary["entry_id"] == "entry_id" and summary["error"] is None
+    stats_file = Path(summary["stats_file"])
+    assert stats_file.parent == tmp_path / PROFILE_DIR
+    assert stats_file.name.startswith("entry_id-refresh-")
+    assert any(name == "_allocate" for _file, _line, name in pstats.Stats(str(stats_file)).stats)
+    assert len(summary["top_functions"]) <= 5
+    assert any("_refresh" in function["function"] for function in summary["top_functions"])
+
+    # The retained allocation is the largest site
+    assert summary["memory"]["retained_kib"] >= 512
+    assert summary["top_allocations"][0]["site"].startswith("tests/test_profiler.py:")
+    assert summary["top_allocations"][0]["size_kib"] >= 512
+    assert "test_profiler.py" in Path(summary["allocations_file"]).read_text()
+
+
+@pytest.mark.asyncio
+async def test_profile_reports_errors(tmp_path: Path):
+    """Test that a failing run is still profiled and its error reported."""
+    profiler = Profiler(_hass(tmp_path))
+
+    async def failing() -> None:
+        raise RuntimeError("offline")
+
+    tracemalloc.start()
+    try:
+        summary = await profiler.async_profile("entry_id", "backfill", failing)
+        # Tracing started elsewhere is left running
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    assert summary["error"] == "RuntimeError: offline"
+    assert Path(summary["stats_file"]).exists()
+
+
+def test_profiler_is_shared(tmp_path: Path):
+    """Test that all entries share one profiler."""
+    hass = _hass(tmp_path)
+    assert get_profiler(hass) is get_profiler(hass)
@@ -0,0 +1,98 @@
+"""Tests for history range queries."""
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.oura.history_store import HistoryStore
+from custom_components.oura.import_index import ImportIndex
+from custom_components.oura.query import async_query, downsample
+
+
+def test_downsample_buckets():
+    """Test weekly, monthly and whole-range aggregation."""
+    days = ["2024-01-29", "2024-01-30", "2024-01-31", "2024-02-01", "2024-02-05"]
+    values = [1.0, None, 3.0, 4.0, 10.0]
+
+    assert downsample(days, values) == [
+        {"start": "2024-01-29", "value": 1.0},
+        {"start": "2024-01-31", "value": 3.0},
+        {"start": "2024-02-01", "value": 4.0},
+        {"start": "2024-02-05", "value": 10.0},
+    ]
+    assert downsample(days, values, "week", "sum") == [
+        {"start": "2024-01-29", "value": 8.0},
+        {"start": "2024-02-05", "value": 10.0},
+    ]
+    assert downsample(days, values, "month", "max") == [
+        {"start": "2024-01-01", "value": 3.0},
+        {"start": "2024-02-01", "value": 10.0},
+    ]
+    assert downsample(days, values, "all", "count") == [{"start": "2024-01-29", "value": 4}]
+
+
+@pytest.fixture
+def history(mock_hass, mock_config_entry, tmp_path) -> HistoryStore:
+    """Return a history store under a temporary config directory."""
+    mock_hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=lambda func, *args: func(*args))
+    return HistoryStore(mock_hass, mock_config_entry)
+
+
+@pytest.fixture
+def import_index(mock_hass, mock_config_entry) -> ImportIndex:
+    """Return an import index with in-memory storage."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=None)
+    with patch("custom_components.oura.import_index.Store", return_value=store):
+        yield ImportIndex(mock_hass, mock_config_entry)
+
+
+@pytest.mark.asyncio
+async def test_query_fetches_only_missing_days(history, import_index):
+    """Test that stored days are served locally and missing days fetched once."""
+    start = date.today() - timedelta(days=20)
+    days = [start + timedelta(days=offset) for offset in range(10)]
+    await history.async_add({"sleep": {"data": [
+        {"day": day.isoformat(), "score": 80} for day in days[:5]
+    ]}})
+
+    api_client = MagicMock()
+    api_client.async_get_range = AsyncMock(return_value={"data": [
+        {"day": day.isoformat(), "score": 90} for day in days[5:8]
+    ]})
+
+    result = await async_query(
+        api_client, history, import_index, "sleep_score", days[0], days[-1], "all", "mean"
+    )
+    api_client.async_get_range.assert_awaited_once_with("sleep", days[5], days[-1])
+    assert result["fetched_days"] == 5
+    assert result["points"] == [{"start": days[0].isoformat(), "value": 5 * 80 / 8 + 3 * 90 / 8}]
+    assert result["name"] == "Sleep Score"
+
+    # Days the API had no data for are not requested again
+    result = await async_query(api_client, history, import_index, "sleep_score", days[0], days[-1])
+    api_client.async_get_range.assert_awaited_once()
+    assert result["fetched_days"] == 0
+    assert len(result["points"]) == 8
+
+
+@pytest.mark.asyncio
+async def test_query_serves_stored_days_when_fetch_fails(history, import_index):
+    """Test that a failed fetch still returns the stored days."""
+    day = date.today() - timedelta(days=10)
+    await history.async_add({"readiness": {"data": [{"day": day.isoformat(), "score": 70}]}})
+
+    api_client = MagicMock()
+    api_client.async_get_range = AsyncMock(side_effect=TimeoutError("Timeout"))
+
+    result = await async_query(
+        api_client, history, import_index, "readiness_score", day, day + timedelta(days=2)
+    )
+    assert result["points"] == [{"start": day.isoformat(), "value": 70.0}]
+    assert result["fetched_days"] == 0
+
+    result = await async_query(
+        api_client, history, import_index, "readiness_score", day, day, fetch_missing=False
+    )
+    assert api_client.async_get_range.await_count == 1
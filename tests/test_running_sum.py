@@ -0,0 +1,84 @@
+"""Tests for running-sum accumulation of cumulative statistics."""
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.oura.running_sum import RunningSumEngine, get_running_sums, rebase
+
+DAY = 86400.0
+
+
+def test_rebase_appends_on_base():
+    """Test that new days accumulate on top of the previous sum."""
+    rows, last = rebase(100.0, [], [(1 * DAY, 10.0), (2 * DAY, 20.0)])
+
+    assert rows == [(1 * DAY, 10.0, 110.0), (2 * DAY, 20.0, 130.0)]
+    assert last == (2 * DAY, 130.0)
+
+
+def test_rebase_shifts_tail_after_revision():
+    """Test that a revised day shifts every later stored row."""
+    stored = [(1 * DAY, 10.0, 110.0), (2 * DAY, 20.0, 130.0), (3 * DAY, 5.0, 135.0)]
+
+    rows, last = rebase(100.0, stored, [(1 * DAY, 15.0)])
+
+    assert rows == [
+        (1 * DAY, 15.0, 115.0),
+        (2 * DAY, 20.0, 135.0),
+        (3 * DAY, 5.0, 140.0),
+    ]
+    assert last == (3 * DAY, 140.0)
+
+
+def test_rebase_skips_unchanged_tail():
+    """Test that re-importing an unchanged day does not rewrite later rows."""
+    stored = [(1 * DAY, 10.0, 110.0), (2 * DAY, 20.0, 130.0)]
+
+    rows, last = rebase(100.0, stored, [(1 * DAY, 10.0)])
+
+    assert rows == [(1 * DAY, 10.0, 110.0)]
+    assert last == (2 * DAY, 130.0)
+
+
+def test_rebase_inserted_day_without_state():
+    """Test inserting a missing day between rows that carry no usable state."""
+    stored = [(3 * DAY, None, 150.0)]
+
+    rows, _last = rebase(100.0, stored, [(2 * DAY, 7.0)])
+
+    assert rows == [(2 * DAY, 7.0, 107.0), (3 * DAY, None, 157.0)]
+
+
+@pytest.mark.asyncio
+async def test_engine_caches_last_sum(mock_hass):
+    """Test that the last stored sum is read once and reused for appends."""
+    engine = RunningSumEngine(mock_hass)
+    recorder = MagicMock()
+    recorder.async_add_executor_job = AsyncMock(return_value={
+        "sensor.steps": [{"start": 0.0, "sum": 1000.0}],
+    })
+    day1 = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    day2 = datetime(2024, 1, 2, 12, tzinfo=timezone.utc)
+
+    with patch("custom_components.oura.running_sum.get_instance", return_value=recorder):
+        first = await engine.async_apply("sensor.steps", [(day1, 500.0)])
+        second = await engine.async_apply("sensor.steps", [(day2, 250.0)])
+
+    assert recorder.async_add_executor_job.await_count == 1
+    assert first == [{"start": day1, "state": 500.0, "sum": 1500.0}]
+    assert second == [{"start": day2, "state": 250.0, "sum": 1750.0}]
+
+
+@pytest.mark.asyncio
+async def test_engine_without_recorder_starts_at_zero(mock_hass):
+    """Test accumulation when the recorder is not available."""
+    engine = get_running_sums(mock_hass)
+    day1 = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    day2 = datetime(2024, 1, 2, 12, tzinfo=timezone.utc)
+
+    with patch("custom_components.oura.running_sum.get_instance", side_effect=KeyError):
+        rows = await engine.async_apply("sensor.steps", [(day2, 3.0), (day1, 2.0)])
+
+    assert [row["sum"] for row in rows] == [2.0, 5.0]
+    assert get_running_sums(mock_hass) is engine
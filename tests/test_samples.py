@@ -0,0 +1,150 @@
+"""Tests for Oura SampleModel series decoding."""
+from datetime import datetime, timezone
+import math
+
+from custom_components.oura.samples import (
+    count_restless_periods,
+    count_transitions,
+    count_wake_bouts,
+    decode_classes,
+    decode_epochs,
+    decode_sample,
+)
+
+
+def test_decode_sample_compacts_nulls():
+    """Test that null items are stored as NaN in a float array."""
+    series = decode_sample({
+        "interval": 300,
+        "items": [40, None, 44],
+        "timestamp": "2024-01-01T23:00:00.000+00:00",
+    })
+
+    assert series is not None
+    assert len(series) == 3
+    assert series.values.typecode == "f"
+    assert math.isnan(series.values[1])
+    assert series.latest() == 44
+    assert series.end == datetime(2024, 1, 1, 23, 15, tzinfo=timezone.utc)
+
+
+def test_decode_sample_invalid():
+    """Test that missing or malformed samples are ignored."""
+    assert decode_sample(None) is None
+    assert decode_sample({}) is None
+    assert decode_sample({"interval": 300, "items": [], "timestamp": "2024-01-01T00:00:00"}) is None
+    assert decode_sample({"interval": 300, "items": [1], "timestamp": "invalid"}) is None
+
+
+def test_decode_sample_converts_timezone_to_utc():
+    """Test that local timestamps are converted to UTC."""
+    series = decode_sample({
+        "interval": 300,
+        "items": [50],
+        "timestamp": "2024-01-02T01:30:00.000+02:00",
+    })
+
+    assert series.start == datetime(2024, 1, 1, 23, 30, tzinfo=timezone.utc)
+
+
+def test_iter_buckets_hourly_aggregation():
+    """Test hourly mean/min/max aggregation across hour boundaries."""
+    # 23:30 to 00:30 in 5-minute samples: 6 samples per hour
+    series = decode_sample({
+        "interval": 300,
+        "items": [30, 40, None, 50, 60, 70, 10, 20, None, None, None, None],
+        "timestamp": "2024-01-01T23:30:00+00:00",
+    })
+
+    buckets = list(series.iter_buckets())
+
+    assert len(buckets) == 2
+    start, mean, minimum, maximum, count = buckets[0]
+    assert start == datetime(2024, 1, 1, 23, 0, tzinfo=timezone.utc)
+    assert mean == 50
+    assert (minimum, maximum, count) == (30, 70, 5)
+
+    start, mean, minimum, maximum, count = buckets[1]
+    assert start == datetime(2024, 1, 2, 0, 0, tzinfo=timezone.utc)
+    assert mean == 15
+    assert (minimum, maximum, count) == (10, 20, 2)
+
+
+def test_iter_buckets_since_skips_earlier_buckets():
+    """Test that buckets before the since time are not aggregated."""
+    series = decode_sample({
+        "interval": 60,
+        "items": [1.0] * 180,
+        "timestamp": "2024-01-01T10:00:00+00:00",
+    })
+
+    since = datetime(2024, 1, 1, 11, 20, tzinfo=timezone.utc)
+    buckets = list(series.iter_buckets(since=since))
+
+    assert [bucket[0].hour for bucket in buckets] == [11, 12]
+    assert buckets[0][4] == 60
+
+
+def test_decode_classes_to_numeric_codes():
+    """Test that classification digits are translated to byte codes."""
+    codes = decode_classes("4423")
+
+    assert codes == bytes((4, 4, 2, 3))
+    assert decode_classes(None) is None
+    assert decode_classes("") is None
+    assert decode_classes("42\u00e9") is None
+
+
+def test_hypnogram_summaries():
+    """Test stage transition and wake bout counting."""
+    # awake x2, light, deep, awake (bout 1), REM, awake x2 (bout 2), light, awake x2
+    codes = decode_classes("44214344244")
+
+    assert count_transitions(codes) == 7
+    # Leading and trailing awake runs are not wake bouts
+    assert count_wake_bouts(codes) == 2
+    assert count_wake_bouts(decode_classes("4444")) == 0
+    assert count_transitions(b"") == 0
+
+
+def test_restless_periods():
+    """Test counting of restless movement runs."""
+    codes = decode_classes("1122111341114")
+
+    assert count_restless_periods(codes) == 3
+    assert count_restless_periods(decode_classes("1111")) == 0
+
+
+def test_epoch_buckets_count_matching_codes():
+    """Test hourly counting of epochs without copying the codes."""
+    # 30 epochs of 5 minutes from 23:30: 6 in the first hour, 12, then 12
+    epochs = decode_epochs("444422" + "2" * 10 + "44" + "1" * 12, "2024-01-01T23:30:00+00:00", 300)
+
+    assert isinstance(epochs.codes, bytes)
+    buckets = list(epochs.iter_buckets(bytes((4,))))
+
+    assert [(start.hour, matched, total) for start, matched, total in buckets] == [
+        (23, 4, 6),
+        (0, 2, 12),
+        (1, 0, 12),
+    ]
+
+
+def test_decode_since_skips_earlier_items():
+    """Test that incremental decoding only materializes newer items."""
+    since = datetime(2024, 1, 1, 5, 0, tzinfo=timezone.utc)
+
+    series = decode_sample({
+        "interval": 60,
+        "items": list(range(120)),
+        "timestamp": "2024-01-01T04:00:00+00:00",
+    }, since)
+    assert series.start == since
+    assert len(series) == 60
+    assert series.values[0] == 60
+
+    epochs = decode_epochs("2" * 12 + "3" * 12, "2024-01-01T04:00:00+00:00", 300, since)
+    assert epochs.start == since
+    assert epochs.codes == bytes((3,)) * 12
+
+    assert decode_epochs("22", "2024-01-01T04:00:00+00:00", 300, since) is None
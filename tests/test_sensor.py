@@ -8,7 +8,8 @@ from homeassistant.helpers.device_registry import DeviceEntryType
 
 from custom_components.oura.const import DOMAIN, SENSOR_TYPES
 from custom_components.oura.coordinator import OuraDataUpdateCoordinator
-from custom_components.oura.sensor import OuraSensor
+from custom_components.oura.health import HEALTH_SENSOR_TYPES, ApiHealth
+from custom_components.oura.sensor import OuraHealthSensor, OuraSensor
 
 
 @pytest.fixture
@@ -139,3 +140,34 @@ def test_boolean_sensor_false_value(mock_coordinator):
     assert sensor.native_value is False
     assert sensor.available is True
 
+
+def test_sensor_external_statistics_mode(mock_coordinator):
+    """Test that daily metrics stop being compiled by the recorder in external mode."""
+    steps = OuraSensor(mock_coordinator, "steps", SENSOR_TYPES["steps"], external_statistics=True)
+    heart_rate = OuraSensor(
+        mock_coordinator, "current_heart_rate", SENSOR_TYPES["current_heart_rate"], external_statistics=True
+    )
+    
+    assert steps.state_class is None
+    assert heart_rate.state_class == "measurement"
+
+
+def test_health_sensor(mock_coordinator):
+    """Test that health sensors read the refresh's health values, not the data."""
+    health = ApiHealth()
+    mock_coordinator.api_client = Mock(health=health)
+    mock_coordinator.health_values = health.values()
+    sensor = OuraHealthSensor(
+        mock_coordinator, "last_refresh_duration", HEALTH_SENSOR_TYPES["last_refresh_duration"]
+    )
+    assert sensor.entity_category == "diagnostic"
+    assert not sensor.available
+
+    health.record_cycle(2.5)
+    # The values are computed once per refresh, not on every state write
+    assert not sensor.available
+    mock_coordinator.health_values = health.values()
+    mock_coordinator.data = None
+
+    assert sensor.available
+    assert sensor.native_value == 2.5
@@ -0,0 +1,212 @@
+"""Tests for the Oura Ring services."""
+from datetime import date, timedelta
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import yaml
+from homeassistant.core import Context, ServiceCall
+from homeassistant.exceptions import ServiceValidationError, Unauthorized
+
+from custom_components.oura.const import BACKFILL_MAX_DAYS, DOMAIN
+from custom_components.oura.services import (
+    BACKFILL_SCHEMA,
+    PROFILE_SCHEMA,
+    QUERY_SCHEMA,
+    SERVICE_BACKFILL,
+    SERVICE_PROFILE,
+    SERVICE_QUERY,
+    SERVICE_REPAIR_GAPS,
+    async_setup_services,
+)
+
+
+@pytest.fixture
+def handlers(mock_hass) -> dict:
+    """Register the services and return their handlers by name."""
+    mock_hass.services = MagicMock()
+    async_setup_services(mock_hass)
+    return {
+        call.args[1]: call.args[2] for call in mock_hass.services.async_register.call_args_list
+    }
+
+
+INTEGRATION_DIR = Path(__file__).parent.parent / "custom_components" / "oura"
+
+
+def test_every_service_is_described(handlers):
+    """Test that every registered service has fields and translations."""
+    services = yaml.safe_load((INTEGRATION_DIR / "services.yaml").read_text())
+    assert set(services) == set(handlers)
+    for strings in ("strings.json", "translations/en.json"):
+        described = json.loads((INTEGRATION_DIR / strings).read_text())["services"]
+        assert set(described) == set(handlers)
+        for service, definition in services.items():
+            assert set(definition["fields"]) == set(described[service]["fields"])
+
+
+def _coordinator() -> MagicMock:
+    """Return a coordinator with a mocked gap scanner."""
+    coordinator = MagicMock()
+    coordinator.gap_scanner.async_scan = AsyncMock(return_value={"ranges": 1})
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_repair_gaps_targets_entries(mock_hass, handlers):
+    """Test that gap repair runs for all entries or the requested one."""
+    mock_hass.data[DOMAIN] = {"one": _coordinator(), "two": _coordinator()}
+
+    response = await handlers[SERVICE_REPAIR_GAPS](ServiceCall(mock_hass, DOMAIN, SERVICE_REPAIR_GAPS, {}))
+    assert response == {"entries": {"one": {"ranges": 1}, "two": {"ranges": 1}}}
+
+    response = await handlers[SERVICE_REPAIR_GAPS](
+        ServiceCall(mock_hass, DOMAIN, SERVICE_REPAIR_GAPS, {"config_entry_id": "two", "days": 30})
+    )
+    assert list(response["entries"]) == ["two"]
+    mock_hass.data[DOMAIN]["two"].gap_scanner.async_scan.assert_awaited_with(30)
+
+    with pytest.raises(ServiceValidationError):
+        await handlers[SERVICE_REPAIR_GAPS](
+            ServiceCall(mock_hass, DOMAIN, SERVICE_REPAIR_GAPS, {"config_entry_id": "three"})
+        )
+
+
+@pytest.mark.asyncio
+async def test_query_requires_one_entry_and_valid_range(mock_hass, handlers):
+    """Test query validation."""
+    mock_hass.data[DOMAIN] = {"one": _coordinator(), "two": _coordinator()}
+    data = QUERY_SCHEMA({"metric": "sleep_score", "start": date(2024, 1, 1), "end": date(2024, 1, 31)})
+    assert data["bucket"] == "day"
+    assert data["aggregate"] == "mean"
+
+    with pytest.raises(ServiceValidationError):
+        await handlers[SERVICE_QUERY](ServiceCall(mock_hass, DOMAIN, SERVICE_QUERY, data))
+
+    with pytest.raises(ServiceValidationError):
+        await handlers[SERVICE_QUERY](ServiceCall(mock_hass, DOMAIN, SERVICE_QUERY, {
+            **data, "config_entry_id": "one", "start": date(2024, 2, 1),
+        }))
+
+    # The range is capped like the historical load
+    with pytest.raises(ServiceValidationError):
+        await handlers[SERVICE_QUERY](ServiceCall(mock_hass, DOMAIN, SERVICE_QUERY, {
+            **data, "config_entry_id": "one", "start": date(2019, 1, 1),
+        }))
+
+    with patch(
+        "custom_components.oura.services.async_query", AsyncMock(return_value={"points": []})
+    ) as query:
+        response = await handlers[SERVICE_QUERY](
+            ServiceCall(mock_hass, DOMAIN, SERVICE_QUERY, {**data, "config_entry_id": "one"})
+        )
+    assert response == {"points": []}
+    assert query.await_args.args[3:6] == ("sleep_score", date(2024, 1, 1), date(2024, 1, 31))
+
+
+@pytest.mark.asyncio
+async def test_backfill_defaults_and_running_guard(mock_hass, handlers):
+    """Test backfill defaults and that only one backfill runs per entry."""
+    coordinator = _coordinator()
+    coordinator.backfill.running = False
+    coordinator.backfill.async_start = MagicMock(return_value={"requests": 1})
+    mock_hass.data[DOMAIN] = {"one": coordinator}
+    data = BACKFILL_SCHEMA({"start": date(2024, 1, 1), "end": date(2024, 1, 31)})
+
+    response = await handlers[SERVICE_BACKFILL](ServiceCall(mock_hass, DOMAIN, SERVICE_BACKFILL, data))
+    assert response == {"requests": 1}
+    sources, start, end, concurrency, dry_run = coordinator.backfill.async_start.call_args.args
+    assert "heartrate" in sources
+    assert (start, end, concurrency, dry_run) == (date(2024, 1, 1), date(2024, 1, 31), 2, False)
+
+    coordinator.backfill.running = True
+    with pytest.raises(ServiceValidationError):
+        await handlers[SERVICE_BACKFILL](ServiceCall(mock_hass, DOMAIN, SERVICE_BACKFILL, data))
+
+    # Dry runs are allowed while a backfill runs
+    await handlers[SERVICE_BACKFILL](
+        ServiceCall(mock_hass, DOMAIN, SERVICE_BACKFILL, {**data, "dry_run": True})
+    )
+
+
+@pytest.mark.asyncio
+async def test_backfill_requires_admin_and_bounded_range(mock_hass, handlers):
+    """Test that only admins backfill, at most BACKFILL_MAX_DAYS at a time."""
+    coordinator = _coordinator()
+    coordinator.backfill.running = False
+    mock_hass.data[DOMAIN] = {"one": coordinator}
+    start = date(2022, 1, 1)
+
+    with pytest.raises(ServiceValidationError):
+        await handlers[SERVICE_BACKFILL](ServiceCall(mock_hass, DOMAIN, SERVICE_BACKFILL, BACKFILL_SCHEMA(
+            {"start": start, "end": start + timedelta(days=BACKFILL_MAX_DAYS)}
+        )))
+    await handlers[SERVICE_BACKFILL](ServiceCall(mock_hass, DOMAIN, SERVICE_BACKFILL, BACKFILL_SCHEMA(
+        {"start": start, "end": start + timedelta(days=BACKFILL_MAX_DAYS - 1)}
+    )))
+    coordinator.backfill.async_start.assert_called_once()
+
+    mock_hass.auth = MagicMock()
+    mock_hass.auth.async_get_user = AsyncMock(return_value=MagicMock(is_admin=False))
+    call = ServiceCall(
+        mock_hass, DOMAIN, SERVICE_BACKFILL, BACKFILL_SCHEMA({"start": start}), context=Context(user_id="user")
+    )
+    with pytest.raises(Unauthorized):
+        await handlers[SERVICE_BACKFILL](call)
+
+
+@pytest.mark.asyncio
+async def test_profile_requires_admin(mock_hass, handlers):
+    """Test that only admins and automations can profile."""
+    mock_hass.data[DOMAIN] = {"one": _coordinator()}
+    mock_hass.auth = MagicMock()
+    mock_hass.auth.async_get_user = AsyncMock(return_value=MagicMock(is_admin=False))
+    call = ServiceCall(
+        mock_hass, DOMAIN, SERVICE_PROFILE, PROFILE_SCHEMA({}), context=Context(user_id="user")
+    )
+
+    with pytest.raises(Unauthorized):
+        await handlers[SERVICE_PROFILE](call)
+
+
+@pytest.mark.asyncio
+async def test_profile_targets(mock_hass, handlers):
+    """Test that a refresh or a bounded backfill window is profiled."""
+    coordinator = _coordinator()
+    coordinator.entry.entry_id = "one"
+    coordinator.backfill.running = False
+    mock_hass.data[DOMAIN] = {"one": coordinator}
+    profiler = MagicMock(running=False)
+    profiler.async_profile = AsyncMock(return_value={"duration_s": 1.0})
+
+    with patch("custom_components.oura.profiler.get_profiler", return_value=profiler):
+        response = await handlers[SERVICE_PROFILE](
+            ServiceCall(mock_hass, DOMAIN, SERVICE_PROFILE, PROFILE_SCHEMA({}))
+        )
+        assert response == {"duration_s": 1.0}
+        entry_id, target, run, top = profiler.async_profile.await_args.args
+        assert (entry_id, target, run, top) == ("one", "refresh", coordinator.async_refresh, 15)
+
+        data = PROFILE_SCHEMA({"target": "backfill", "start": date(2024, 1, 1)})
+        await handlers[SERVICE_PROFILE](ServiceCall(mock_hass, DOMAIN, SERVICE_PROFILE, data))
+        coordinator.backfill.async_wait = AsyncMock()
+        await profiler.async_profile.await_args.args[2]()
+        sources, start, end, concurrency = coordinator.backfill.async_start.call_args.args
+        assert (start, end, concurrency) == (date(2024, 1, 1), date(2024, 1, 31), 2)
+        coordinator.backfill.async_wait.assert_awaited_once()
+
+        for invalid in (
+            {"target": "backfill"},
+            {"target": "backfill", "start": date(2024, 1, 1), "end": date(2024, 3, 1)},
+        ):
+            with pytest.raises(ServiceValidationError):
+                await handlers[SERVICE_PROFILE](
+                    ServiceCall(mock_hass, DOMAIN, SERVICE_PROFILE, PROFILE_SCHEMA(invalid))
+                )
+
+        profiler.running = True
+        with pytest.raises(ServiceValidationError):
+            await handlers[SERVICE_PROFILE](
+                ServiceCall(mock_hass, DOMAIN, SERVICE_PROFILE, PROFILE_SCHEMA({}))
+            )
@@ -0,0 +1,92 @@
+"""Tests for the cached statistic_id resolver."""
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import Event
+
+from custom_components.oura.const import DOMAIN
+from custom_components.oura.running_sum import get_running_sums
+from custom_components.oura.statistic_ids import get_statistic_id_resolver
+
+
+def _registry(entity_ids: dict[str, str]) -> MagicMock:
+    """Return a mock registry holding entity IDs by unique ID."""
+    registry = MagicMock()
+    registry.async_get_entity_id.side_effect = (
+        lambda domain, platform, unique_id: entity_ids.get(unique_id)
+    )
+    return registry
+
+
+def test_resolver_builds_map_once(mock_hass, mock_config_entry):
+    """Test that the registry is only queried when the map is built."""
+    registry = _registry({"mock_entry_id_steps": "sensor.oura_ring_steps"})
+
+    with patch("custom_components.oura.statistic_ids.er.async_get", return_value=registry):
+        resolver = get_statistic_id_resolver(mock_hass, mock_config_entry)
+        resolver.async_build(["steps", "sleep_score"])
+
+        assert resolver.async_resolve("steps") == "sensor.oura_ring_steps"
+        assert resolver.async_resolve("steps") == "sensor.oura_ring_steps"
+        assert resolver.async_resolve("sleep_score") == "sensor.oura_ring_sleep_score"
+
+    assert registry.async_get_entity_id.call_count == 2
+    assert get_statistic_id_resolver(mock_hass, mock_config_entry) is resolver
+    mock_hass.bus.async_listen.assert_called_once()
+
+
+def test_resolver_migrates_fallback_statistics(mock_hass, mock_config_entry):
+    """Test that statistics under a guessed ID move to the created entity."""
+    registry = _registry({})
+    registry.async_get.return_value = MagicMock(
+        platform=DOMAIN, unique_id="mock_entry_id_met_min_high"
+    )
+    recorder = MagicMock()
+    coordinator = MagicMock()
+    mock_hass.data[DOMAIN] = {mock_config_entry.entry_id: coordinator}
+    running_sums = get_running_sums(mock_hass)
+    running_sums._last["sensor.oura_ring_met_min_high"] = (0.0, 10.0)
+
+    with patch("custom_components.oura.statistic_ids.er.async_get", return_value=registry), \
+         patch("custom_components.oura.statistic_ids.get_instance", return_value=recorder):
+        resolver = get_statistic_id_resolver(mock_hass, mock_config_entry)
+        resolver.async_build(["met_min_high"])
+        assert resolver.async_resolve("met_min_high") == "sensor.oura_ring_met_min_high"
+
+        resolver.async_handle_registry_event(Event("entity_registry_updated", {
+            "action": "create",
+            "entity_id": "sensor.oura_ring_high_activity_time",
+        }))
+
+        assert resolver.async_resolve("met_min_high") == "sensor.oura_ring_high_activity_time"
+
+        resolver.async_handle_registry_event(Event("entity_registry_updated", {
+            "action": "remove",
+            "entity_id": "sensor.oura_ring_high_activity_time",
+        }))
+        assert resolver.async_resolve("met_min_high") == "sensor.oura_ring_met_min_high"
+
+    recorder.async_update_statistics_metadata.assert_called_once_with(
+        "sensor.oura_ring_met_min_high",
+        new_statistic_id="sensor.oura_ring_high_activity_time",
+    )
+    # The imported days and the running sum cache follow the statistic
+    coordinator.import_index.rekey.assert_called_once_with(
+        "sensor.oura_ring_met_min_high", "sensor.oura_ring_high_activity_time"
+    )
+    assert "sensor.oura_ring_met_min_high" not in running_sums._last
+
+
+def test_resolver_ignores_other_entries(mock_hass, mock_config_entry):
+    """Test that entities of other integrations or entries are ignored."""
+    registry = _registry({})
+    registry.async_get.return_value = MagicMock(platform=DOMAIN, unique_id="other_entry_steps")
+
+    with patch("custom_components.oura.statistic_ids.er.async_get", return_value=registry):
+        resolver = get_statistic_id_resolver(mock_hass, mock_config_entry)
+        resolver.async_build(["steps"])
+        resolver.async_handle_registry_event(Event("entity_registry_updated", {
+            "action": "create",
+            "entity_id": "sensor.other_steps",
+        }))
+
+        assert resolver.async_resolve("steps") == "sensor.oura_ring_steps"
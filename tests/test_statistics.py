@@ -4,14 +4,13 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from benchmarks.bench_statistics_extraction import apply_transformation, get_nested_value
+from custom_components.oura.metrics import METRIC_CATALOG, compute_percentage
 from custom_components.oura.statistics import (
     async_import_statistics,
     STATISTICS_METADATA,
-    DATA_SOURCE_CONFIG,
+    EXTRACTION_PLANS,
     _parse_date_to_timestamp,
-    _apply_transformation,
-    _compute_percentage,
-    _get_nested_value,
 )
 
 
@@ -35,19 +34,14 @@ def test_statistics_metadata_completeness():
         assert "has_sum" in metadata
 
 
-def test_data_source_config_structure():
-    """Test that data source configuration is properly structured."""
-    for source_key, config in DATA_SOURCE_CONFIG.items():
-        # Either has mappings or a custom processor
-        assert "mappings" in config or "custom_processor" in config
-        
-        if "mappings" in config:
-            assert isinstance(config["mappings"], list)
-            
-            for mapping in config["mappings"]:
-                assert "sensor_key" in mapping
-                assert "api_path" in mapping
-                assert mapping["sensor_key"] in STATISTICS_METADATA
+def test_extraction_plans_structure():
+    """Test that daily extraction plans only cover metrics with statistics."""
+    for source_key, extractors in EXTRACTION_PLANS.items():
+        assert extractors
+        for sensor_key, extract in extractors:
+            assert sensor_key in STATISTICS_METADATA
+            assert METRIC_CATALOG[sensor_key]["source"] == source_key
+            assert callable(extract)
 
 
 def test_timestamp_parsing():
@@ -68,20 +62,20 @@ def test_timestamp_parsing():
 
 
 def test_value_transformations():
-    """Test that data transformations work correctly."""
+    """Test the legacy transformations the extraction benchmark compares against."""
     # Test seconds to hours
-    assert _apply_transformation(3600, "seconds_to_hours") == 1.0
-    assert _apply_transformation(7200, "seconds_to_hours") == 2.0
+    assert apply_transformation(3600, "seconds_to_hours") == 1.0
+    assert apply_transformation(7200, "seconds_to_hours") == 2.0
     
     # Test seconds to minutes
-    assert _apply_transformation(60, "seconds_to_minutes") == 1.0
-    assert _apply_transformation(300, "seconds_to_minutes") == 5.0
+    assert apply_transformation(60, "seconds_to_minutes") == 1.0
+    assert apply_transformation(300, "seconds_to_minutes") == 5.0
     
     # Test percentage calculation
-    assert _apply_transformation(30, "percentage", total=100) == 30.0
+    assert apply_transformation(30, "percentage", total=100) == 30.0
     
     # Test no transformation
-    assert _apply_transformation(42, None) == 42
+    assert apply_transformation(42, None) == 42
 
 
 def test_compute_percentage():
@@ -92,16 +86,16 @@ def test_compute_percentage():
         "rem_sleep_duration": 5760,     # 1.6 hours = 20%
     }
     
-    deep_pct = _compute_percentage(entry, "deep_sleep_duration", "total_sleep_duration")
+    deep_pct = compute_percentage(entry, "deep_sleep_duration", "total_sleep_duration")
     assert deep_pct == 25.0
     
-    rem_pct = _compute_percentage(entry, "rem_sleep_duration", "total_sleep_duration")
+    rem_pct = compute_percentage(entry, "rem_sleep_duration", "total_sleep_duration")
     assert rem_pct == 20.0
     
     # Test missing values
-    assert _compute_percentage({}, "numerator", "denominator") is None
-    assert _compute_percentage({"numerator": 10}, "numerator", "denominator") is None
-    assert _compute_percentage({"numerator": 10, "denominator": 0}, "numerator", "denominator") is None
+    assert compute_percentage({}, "numerator", "denominator") is None
+    assert compute_percentage({"numerator": 10}, "numerator", "denominator") is None
+    assert compute_percentage({"numerator": 10, "denominator": 0}, "numerator", "denominator") is None
 
 
 def test_get_nested_value():
@@ -115,15 +109,39 @@ def test_get_nested_value():
     }
     
     # Test direct access
-    assert _get_nested_value(data, "score") == 85
+    assert get_nested_value(data, "score") == 85
     
     # Test nested access
-    assert _get_nested_value(data, "contributors.efficiency") == 90
-    assert _get_nested_value(data, "contributors.restfulness") == 75
+    assert get_nested_value(data, "contributors.efficiency") == 90
+    assert get_nested_value(data, "contributors.restfulness") == 75
     
     # Test missing values
-    assert _get_nested_value(data, "missing") is None
-    assert _get_nested_value(data, "contributors.missing") is None
-    assert _get_nested_value(data, "missing.nested") is None
+    assert get_nested_value(data, "missing") is None
+    assert get_nested_value(data, "contributors.missing") is None
+    assert get_nested_value(data, "missing.nested") is None
 
 
+def test_extraction_plans_match_nested_lookup():
+    """Test that compiled extractors agree with the dot notation lookup."""
+    entry = {
+        "day": "2024-01-15",
+        "score": 85,
+        "contributors": {"efficiency": 90, "timing": None},
+        "total_sleep_duration": 28800,
+        "deep_sleep_duration": 7200,
+        "latency": 600,
+    }
+    
+    for extractors in EXTRACTION_PLANS.values():
+        for sensor_key, extract in extractors:
+            descriptor = METRIC_CATALOG[sensor_key]
+            if "path" not in descriptor:
+                continue
+            expected = get_nested_value(entry, descriptor["path"])
+            if expected is not None and descriptor.get("transform"):
+                expected = apply_transformation(expected, descriptor["transform"])
+            assert extract(entry) == expected, sensor_key
+    
+    assert "heartrate" not in EXTRACTION_PLANS
+    assert dict(EXTRACTION_PLANS["sleep_detail"])["deep_sleep_percentage"](entry) == 25.0
+    assert dict(EXTRACTION_PLANS["sleep_detail"])["sleep_latency"](entry) == 10.0
@@ -3,8 +3,9 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from custom_components.oura.statistics import async_import_statistics
+from custom_components.oura.statistics import async_import_series_statistics, async_import_statistics
 from custom_components.oura.const import DOMAIN
+from custom_components.oura.coordinator import OuraDataUpdateCoordinator
 
 @pytest.mark.asyncio
 async def test_import_statistics_entity_exists(mock_hass: HomeAssistant, mock_config_entry: ConfigEntry):
@@ -21,7 +22,7 @@ async def test_import_statistics_entity_exists(mock_hass: HomeAssistant, mock_co
         }
     }
     
-    with patch("custom_components.oura.statistics.er.async_get") as mock_er_get, \
+    with patch("custom_components.oura.statistic_ids.er.async_get") as mock_er_get, \
          patch("custom_components.oura.statistics.async_import_statistics_ha") as mock_import_ha, \
          patch("custom_components.oura.statistics.async_add_external_statistics") as mock_add_external:
         
@@ -63,7 +64,7 @@ async def test_import_statistics_entity_missing(mock_hass: HomeAssistant, mock_c
         }
     }
     
-    with patch("custom_components.oura.statistics.er.async_get") as mock_er_get, \
+    with patch("custom_components.oura.statistic_ids.er.async_get") as mock_er_get, \
          patch("custom_components.oura.statistics.async_import_statistics_ha") as mock_import_ha, \
          patch("custom_components.oura.statistics.async_add_external_statistics") as mock_add_external:
         
@@ -88,3 +89,187 @@ async def test_import_statistics_entity_missing(mock_hass: HomeAssistant, mock_c
                 found = True
                 break
         assert found
+
+@pytest.mark.asyncio
+async def test_import_sleep_series_as_external_statistics(mock_hass: HomeAssistant, mock_config_entry: ConfigEntry):
+    """Test that sleep HRV samples are imported as hourly external statistics."""
+    
+    data = {
+        "sleep_detail": {
+            "data": [
+                {
+                    "id": "sleep-1",
+                    "day": "2024-01-02",
+                    "hrv": {
+                        "interval": 300,
+                        "items": [40, None, 50, 60, 30, 20, 10],
+                        "timestamp": "2024-01-01T23:30:00+00:00",
+                    },
+                }
+            ]
+        }
+    }
+    
+    with patch("custom_components.oura.statistic_ids.er.async_get") as mock_er_get, \
+         patch("custom_components.oura.statistics.async_import_statistics_ha"), \
+         patch("custom_components.oura.statistics.async_add_external_statistics") as mock_add_external:
+        
+        mock_er_get.return_value = MagicMock()
+        
+        await async_import_statistics(mock_hass, data, mock_config_entry)
+        
+        assert mock_add_external.call_count == 1
+        args, _ = mock_add_external.call_args
+        metadata, statistics = args[1], args[2]
+        assert metadata["statistic_id"] == f"{DOMAIN}:sleep_hrv"
+        assert metadata["source"] == DOMAIN
+        assert len(statistics) == 2
+        assert statistics[0]["mean"] == 40
+        assert statistics[0]["min"] == 20
+        assert statistics[0]["max"] == 60
+        assert statistics[1]["mean"] == 10
+
+
+@pytest.mark.asyncio
+async def test_import_activity_series_incrementally(mock_hass: HomeAssistant, mock_config_entry: ConfigEntry):
+    """Test that repeated polls only import hours with new samples."""
+    
+    activity = {
+        "day": "2024-01-01",
+        "timestamp": "2024-01-01T04:00:00+00:00",
+        # 1 hour inactive, then 30 minutes of low activity
+        "class_5_min": "2" * 12 + "3" * 6,
+        "met": {
+            "interval": 60,
+            "items": [1.0] * 60 + [3.0] * 30,
+            "timestamp": "2024-01-01T04:00:00+00:00",
+        },
+    }
+    cursors = {}
+    
+    with patch("custom_components.oura.statistics.async_add_external_statistics") as mock_add_external:
+        await async_import_series_statistics(
+            mock_hass, {"activity": {"data": [activity]}}, mock_config_entry, cursors
+        )
+        
+        imported = {args[1]["statistic_id"]: args[2] for args, _ in mock_add_external.call_args_list}
+        assert [point["mean"] for point in imported[f"{DOMAIN}:activity_met"]] == [1.0, 3.0]
+        assert [point["mean"] for point in imported[f"{DOMAIN}:sedentary_time"]] == [60.0, 0.0]
+        assert [point["mean"] for point in imported[f"{DOMAIN}:active_time"]] == [0.0, 30.0]
+        
+        # Nothing new: no statistics are imported
+        mock_add_external.reset_mock()
+        await async_import_series_statistics(
+            mock_hass, {"activity": {"data": [activity]}}, mock_config_entry, cursors
+        )
+        assert not mock_add_external.called
+        
+        # New samples in the current hour: only that hour is re-imported
+        activity["class_5_min"] += "5"
+        activity["met"]["items"] = activity["met"]["items"] + [8.0] * 5
+        await async_import_series_statistics(
+            mock_hass, {"activity": {"data": [activity]}}, mock_config_entry, cursors
+        )
+        imported = {args[1]["statistic_id"]: args[2] for args, _ in mock_add_external.call_args_list}
+        assert len(imported[f"{DOMAIN}:activity_met"]) == 1
+        assert imported[f"{DOMAIN}:activity_met"][0]["start"].hour == 5
+        assert imported[f"{DOMAIN}:active_time"][0]["mean"] == 35.0
+
+
+@pytest.mark.asyncio
+async def test_import_statistics_external_mode(mock_hass: HomeAssistant, mock_config_entry: ConfigEntry):
+    """Test that external mode imports daily values as oura:<metric> without registry lookups."""
+    mock_config_entry.options = {**mock_config_entry.options, "statistics_mode": "external"}
+    data = {
+        "sleep": {"data": [{"day": "2024-01-01", "score": 85}]},
+    }
+    
+    with patch("custom_components.oura.statistic_ids.er.async_get") as mock_er_get, \
+         patch("custom_components.oura.statistics.async_import_statistics_ha") as mock_import_ha, \
+         patch("custom_components.oura.statistics.async_add_external_statistics") as mock_add_external:
+        
+        await async_import_statistics(mock_hass, data, mock_config_entry)
+        
+        assert not mock_er_get.called
+        assert not mock_import_ha.called
+        imported = {args[1]["statistic_id"]: args[1] for args, _ in mock_add_external.call_args_list}
+        assert imported[f"{DOMAIN}:sleep_score"]["source"] == DOMAIN
+
+
+class _Refresh:
+    """The refresh methods of the coordinator, without its scheduler."""
+
+    _async_update_data = OuraDataUpdateCoordinator._async_update_data
+    _process_data = OuraDataUpdateCoordinator._process_data
+    _async_import_daily = OuraDataUpdateCoordinator._async_import_daily
+    _async_import_series = OuraDataUpdateCoordinator._async_import_series
+    _async_store_history = OuraDataUpdateCoordinator._async_store_history
+
+    def __init__(self, hass, entry, data):
+        self.hass = hass
+        self.entry = entry
+        self.data = None
+        self._series_cursors = {}
+        self.api_client = MagicMock()
+        self.api_client.async_get_data = AsyncMock(return_value=data)
+        self.import_index = MagicMock(async_load=AsyncMock())
+        self.history = MagicMock(async_add=AsyncMock(return_value=0))
+        self.baselines = MagicMock()
+        self.freshness = MagicMock()
+
+
+@pytest.mark.asyncio
+async def test_external_mode_imports_polled_days(mock_hass: HomeAssistant, mock_config_entry: ConfigEntry):
+    """Test that refreshes in external mode import the polled days' daily values."""
+    data = {"sleep": {"data": [{"day": "2024-01-01", "score": 85}]}}
+
+    with patch("custom_components.oura.statistics.async_import_statistics", AsyncMock()) as import_daily, \
+         patch("custom_components.oura.statistics.async_import_series_statistics", AsyncMock()) as import_series:
+        refresh = _Refresh(mock_hass, mock_config_entry, data)
+        await refresh._async_update_data()
+        assert refresh.health_values is refresh.api_client.health.values.return_value
+        # Entity mode: the recorder compiles the daily values from the sensor states
+        assert not import_daily.called
+
+        mock_config_entry.options = {**mock_config_entry.options, "statistics_mode": "external"}
+        refresh = _Refresh(mock_hass, mock_config_entry, data)
+        await refresh._async_update_data()
+
+        import_daily.assert_awaited_once_with(
+            mock_hass, data, mock_config_entry, refresh._series_cursors, refresh.import_index
+        )
+        refresh.import_index.async_load.assert_awaited_once()
+        assert not import_series.called
+
+
+@pytest.mark.asyncio
+async def test_day_with_nap_is_imported_once(mock_hass: HomeAssistant, mock_config_entry: ConfigEntry):
+    """Test that a day with a nap and the night's sleep is not re-imported."""
+    from custom_components.oura.import_index import ImportIndex
+
+    data = {"sleep_detail": {"data": [
+        {"day": "2024-01-01", "type": "long_sleep", "total_sleep_duration": 27000},
+        {"day": "2024-01-01", "type": "late_nap", "total_sleep_duration": 1800},
+    ]}}
+    store = MagicMock(async_load=AsyncMock(return_value=None))
+
+    with patch("custom_components.oura.import_index.Store", return_value=store), \
+         patch("custom_components.oura.statistic_ids.er.async_get") as mock_er_get, \
+         patch("custom_components.oura.statistics.async_import_statistics_ha") as mock_import_ha:
+        mock_er_get.return_value.async_get_entity_id.side_effect = (
+            lambda _domain, _platform, unique_id: f"sensor.{unique_id}"
+        )
+        index = ImportIndex(mock_hass, mock_config_entry)
+        await index.async_load()
+
+        await async_import_statistics(mock_hass, data, mock_config_entry, import_index=index)
+        submitted = {
+            args[1]["statistic_id"]: args[2] for args, _ in mock_import_ha.call_args_list
+        }
+        duration = next(points for statistic_id, points in submitted.items()
+                        if statistic_id.endswith("total_sleep_duration"))
+        assert [point["mean"] for point in duration] == [7.5]
+
+        mock_import_ha.reset_mock()
+        await async_import_statistics(mock_hass, data, mock_config_entry, import_index=index)
+        assert not mock_import_ha.called
@@ -0,0 +1,105 @@
+"""Tests for the spec-driven synthetic payload generator."""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.synthetic import ENDPOINT_SOURCES, SyntheticOura, decode_token
+from custom_components.oura.metrics import DAILY_METRICS, extract_daily_values
+
+
+@pytest.fixture(scope="module")
+def oura() -> SyntheticOura:
+    """Return a seeded generator."""
+    return SyntheticOura(seed=7)
+
+
+def test_documents_match_the_spec(oura: SyntheticOura):
+    """Test that every endpoint's documents validate against its response model."""
+    assert set(ENDPOINT_SOURCES) <= set(oura.models)
+    for endpoint, model in oura.models.items():
+        for document in oura.iter_documents(endpoint, date(2024, 2, 27), date(2024, 3, 2)):
+            assert oura.spec.validate(model, document) == [], endpoint
+
+
+def test_nullable_fields_still_match_the_spec():
+    """Test that documents with null fields validate too."""
+    oura = SyntheticOura(seed=1, null_rate=1.0)
+    for endpoint, model in oura.models.items():
+        for document in oura.iter_documents(endpoint, date(2024, 1, 1), date(2024, 1, 2)):
+            assert oura.spec.validate(model, document) == [], endpoint
+
+
+def test_validate_reports_errors(oura: SyntheticOura):
+    """Test that the validator rejects documents that break the spec."""
+    model = oura.models["daily_stress"]
+    document = next(oura.iter_documents("daily_stress", date(2024, 1, 1), date(2024, 1, 1)))
+
+    assert oura.spec.validate(model, {**document, "day_summary": "calm"})
+    assert oura.spec.validate(model, {**document, "stress_high": "1"})
+    assert oura.spec.validate(model, {key: value for key, value in document.items() if key != "day"})
+
+
+def test_generation_is_seeded():
+    """Test that a seed always yields the same documents, and days are independent."""
+    first = SyntheticOura(seed=3)
+    second = SyntheticOura(seed=3)
+    day = date(2024, 6, 1)
+
+    assert first.day_documents("sleep", day) == second.day_documents("sleep", day)
+    assert first.day_documents("sleep", day) != SyntheticOura(seed=4).day_documents("sleep", day)
+    # A day does not depend on the range it is generated in
+    ranged = list(first.iter_documents("daily_sleep", date(2024, 5, 1), day))
+    assert ranged[-1] == first.day_documents("daily_sleep", day)[0]
+
+
+def test_heartrate_density(oura: SyntheticOura):
+    """Test that heart rate readings come every five minutes within the range."""
+    start = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 3, 12, tzinfo=timezone.utc)
+    readings = list(oura.iter_documents("heartrate", start, end))
+
+    timestamps = [datetime.fromisoformat(reading["timestamp"]) for reading in readings]
+    assert len(readings) == 2 * 288 + 1
+    assert timestamps[0] == start and timestamps[-1] == end
+    assert {later - earlier for earlier, later in zip(timestamps, timestamps[1:])} == {timedelta(minutes=5)}
+
+
+def test_sleep_is_consistent(oura: SyntheticOura):
+    """Test that a night's durations and samples follow its hypnogram."""
+    night = oura.day_documents("sleep", date(2024, 1, 1))[0]
+    epochs = len(night["sleep_phase_5_min"])
+
+    assert night["time_in_bed"] == epochs * 300
+    assert night["deep_sleep_duration"] == night["sleep_phase_5_min"].count("1") * 300
+    assert night["total_sleep_duration"] == night["time_in_bed"] - night["awake_time"]
+    assert len(night["movement_30_sec"]) == epochs * 10
+    assert len(night["heart_rate"]["items"]) == epochs
+    bedtime_end = datetime.fromisoformat(night["bedtime_end"])
+    assert bedtime_end - datetime.fromisoformat(night["bedtime_start"]) == timedelta(seconds=epochs * 300)
+
+
+def test_pages_follow_next_token(oura: SyntheticOura):
+    """Test that pages resume where the previous one stopped."""
+    start, end = date(2024, 1, 1), date(2024, 1, 10)
+    pages = list(oura.iter_pages("heartrate", start, end, page_size=1000))
+
+    assert [len(page["data"]) for page in pages] == [1000, 1000, 880]
+    assert pages[-1]["next_token"] is None
+    assert [reading for page in pages for reading in page["data"]] == list(
+        oura.iter_documents("heartrate", start, end)
+    )
+    assert oura.get_page("heartrate", start, end, pages[0]["next_token"], 1000) == pages[1]
+    with pytest.raises(ValueError):
+        decode_token("not a token")
+
+
+def test_payload_has_every_daily_metric(oura: SyntheticOura):
+    """Test that a payload yields a value for every daily metric on every day."""
+    payload = oura.build_payload(date(2024, 1, 1), date(2024, 1, 7))
+
+    assert set(payload) == set(ENDPOINT_SOURCES.values())
+    for source, metrics in DAILY_METRICS.items():
+        daily = extract_daily_values(source, payload[source]["data"])
+        assert len(daily) == 7, source
+        for values in daily.values():
+            assert set(metrics) <= set(values), source
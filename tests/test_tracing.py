@@ -0,0 +1,150 @@
+"""Tests for refresh cycle tracing."""
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from aiohttp import ClientSession
+import pytest
+
+from benchmarks.mock_server import MockOuraServer
+from custom_components.oura.api import OuraApiClient
+from custom_components.oura.const import CONF_API_BASE_URL
+from custom_components.oura.tracing import TRACE_DIR, TraceExporter, Tracer, span
+
+
+def _hass(config_dir: Path) -> SimpleNamespace:
+    """Return the parts of Home Assistant the exporter uses."""
+
+    async def async_add_executor_job(target, *args):
+        return target(*args)
+
+    return SimpleNamespace(
+        config=SimpleNamespace(path=lambda *parts: str(config_dir.joinpath(*parts))),
+        async_add_executor_job=async_add_executor_job,
+    )
+
+
+def test_span_outside_cycle_does_nothing():
+    """Test that spans outside a cycle are not recorded."""
+    with span("process_data") as stage:
+        stage.set_attribute("ignored", True)
+
+
+@pytest.mark.asyncio
+async def test_cycle_spans_and_aggregates():
+    """Test that stages, including concurrent ones, become children of the cycle."""
+    tracer = Tracer()
+
+    async def request(index: int) -> None:
+        with span("http.request", index=index):
+            await asyncio.sleep(0)
+            with span("json.decode"):
+                pass
+
+    async with tracer.cycle("refresh") as root:
+        with span("api.get_data") as fetch:
+            await asyncio.gather(*(request(index) for index in range(3)))
+        with pytest.raises(ValueError), span("process_data"):
+            raise ValueError("bad data")
+
+    stages = tracer.as_dict()["stages"]["refresh"]
+    assert stages["http.request"]["count"] == 3 and stages["json.decode"]["count"] == 3
+    assert stages["process_data"]["errors"] == 1
+    assert stages["refresh"]["count"] == 1
+
+    trace = tracer.recent[-1]
+    assert trace["cycle"] == "refresh" and trace["error"] is None
+    assert set(trace["stages_ms"]) == {"api.get_data", "http.request", "json.decode", "process_data"}
+    assert tracer.slowest == [trace]
+    assert root.parent_id is None and fetch.parent_id == root.span_id
+    requests = [finished for finished in root.trace.spans if finished.name == "http.request"]
+    assert {finished.parent_id for finished in requests} == {fetch.span_id}
+
+
+@pytest.mark.asyncio
+async def test_cycle_history_is_bounded():
+    """Test that only the most recent and the slowest cycles are kept."""
+    tracer = Tracer(history=2)
+    for _ in range(4):
+        async with tracer.cycle("refresh"):
+            pass
+
+    assert len(tracer.recent) == 2 and len(tracer.slowest) == 2
+    assert tracer.slowest[0]["duration_ms"] >= tracer.slowest[1]["duration_ms"]
+    assert tracer.as_dict()["stages"]["refresh"]["refresh"]["count"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_cycle():
+    """Test that an exception escaping a cycle marks it failed."""
+    tracer = Tracer()
+    with pytest.raises(RuntimeError):
+        async with tracer.cycle("historical_load", days=90):
+            raise RuntimeError("offline")
+
+    assert tracer.recent[-1]["error"] == "RuntimeError: offline"
+
+
+@pytest.mark.asyncio
+async def test_export_otlp_json_lines(tmp_path: Path):
+    """Test that exported cycles are OTLP/JSON trace requests, one per line."""
+    tracer = Tracer(TraceExporter(_hass(tmp_path), "entry_id"))
+    for _ in range(2):
+        async with tracer.cycle("refresh", success=True):
+            with span("http.request", **{"url.path": "/v2/usercollection/sleep", "documents": 2}):
+                pass
+
+    path = tmp_path / TRACE_DIR / "entry_id.jsonl"
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    request = json.loads(lines[0])
+    spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    child, root = spans
+    assert root["name"] == "refresh" and "parentSpanId" not in root
+    assert child["parentSpanId"] == root["spanId"] and child["traceId"] == root["traceId"]
+    assert len(root["traceId"]) == 32 and len(root["spanId"]) == 16
+    assert int(root["startTimeUnixNano"]) <= int(child["startTimeUnixNano"])
+    assert int(child["endTimeUnixNano"]) <= int(root["endTimeUnixNano"])
+    assert {"key": "documents", "value": {"intValue": "2"}} in child["attributes"]
+    assert root["attributes"] == [{"key": "success", "value": {"boolValue": True}}]
+    assert root["status"] == {"code": 1}
+    assert tracer.as_dict()["export_path"] == str(path)
+
+
+@pytest.mark.asyncio
+async def test_export_rotates_the_file(tmp_path: Path):
+    """Test that a full trace file is rotated."""
+    tracer = Tracer(TraceExporter(_hass(tmp_path), "entry_id", max_bytes=1))
+    for _ in range(3):
+        async with tracer.cycle("refresh"):
+            pass
+
+    directory = tmp_path / TRACE_DIR
+    assert sorted(path.name for path in directory.iterdir()) == ["entry_id.jsonl", "entry_id.jsonl.1"]
+    assert len((directory / "entry_id.jsonl").read_text().splitlines()) == 1
+
+
+@pytest.mark.asyncio
+async def test_api_client_stages():
+    """Test that the API client traces token validation, requests and decoding."""
+    oauth = MagicMock()
+    oauth.async_ensure_token_valid = AsyncMock()
+    oauth.valid_token = True
+    oauth.token = {"access_token": "token"}
+    tracer = Tracer()
+
+    async with MockOuraServer() as server, ClientSession() as client_session:
+        entry = SimpleNamespace(data={CONF_API_BASE_URL: server.base_url}, options={})
+        client = OuraApiClient(MagicMock(), oauth, entry)
+        client._client_session = client_session
+        async with tracer.cycle("refresh"):
+            await client.async_get_data(days_back=1)
+
+    stages = tracer.as_dict()["stages"]["refresh"]
+    assert stages["http.request"]["count"] == 11
+    assert stages["json.decode"]["count"] == 11
+    assert stages["oauth.token"]["count"] == 11
@@ -0,0 +1,206 @@
+"""Tests for the record and replay transports of the API client."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from datetime import date
+import gzip
+from pathlib import Path
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from aiohttp import ClientResponseError, ClientSession
+import pytest
+import pytest_asyncio
+
+from benchmarks.mock_server import ALL_SCOPES, MockOuraServer
+from benchmarks.replay import recorded_calls
+from custom_components.oura.api import OuraApiClient
+from custom_components.oura.const import CONF_API_BASE_URL
+from custom_components.oura.transport import (
+    Anonymizer,
+    HttpTransport,
+    RecordingTransport,
+    ReplayTransport,
+    async_create_transport,
+    read_cassette,
+    request_key,
+    shift_dates,
+)
+
+ACCESS_TOKEN = "secret_access_token"
+END_DATE = date(2024, 3, 1)
+
+
+@pytest_asyncio.fixture
+async def client_session() -> AsyncIterator[ClientSession]:
+    """Return an aiohttp client session."""
+    async with ClientSession() as session:
+        yield session
+
+
+def _client(base_url: str = "http://replay.invalid/v2/usercollection") -> OuraApiClient:
+    """Return an API client holding a valid token."""
+    oauth = MagicMock()
+    oauth.async_ensure_token_valid = AsyncMock()
+    oauth.valid_token = True
+    oauth.token = {"access_token": ACCESS_TOKEN}
+    entry = SimpleNamespace(data={CONF_API_BASE_URL: base_url}, options={})
+    return OuraApiClient(MagicMock(), oauth, entry)
+
+
+async def _async_record(
+    path: Path, client_session: ClientSession, anonymize: bool = False, **server_options
+) -> dict:
+    """Record one async_get_data call against the mock API."""
+    async with MockOuraServer(**server_options) as server:
+        client = _client(server.base_url)
+        client.transport = RecordingTransport(
+            HttpTransport(client_session), path, anonymize=anonymize
+        )
+        return await client.async_get_data(days_back=3, end_date=END_DATE)
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_recorded_data(tmp_path: Path, client_session: ClientSession):
+    """Test that a replayed call returns what was recorded, without a server."""
+    cassette = tmp_path / "oura.jsonl.gz"
+    recorded = await _async_record(cassette, client_session, page_size=2)
+
+    client = _client()
+    client.transport = ReplayTransport.from_file(cassette)
+    replayed = await client.async_get_data(days_back=3, end_date=END_DATE)
+
+    assert replayed == recorded
+    assert len(replayed["sleep"]["data"]) == 4
+    _, interactions = read_cassette(cassette)
+    assert client.transport.replayed == len(interactions)
+    assert recorded_calls(interactions) == [(3, END_DATE)]
+
+
+@pytest.mark.asyncio
+async def test_replay_on_a_later_day(tmp_path: Path, client_session: ClientSession):
+    """Test that a refresh asking for dates relative to today replays a cassette."""
+    cassette = tmp_path / "oura.jsonl.gz"
+    recorded = await _async_record(cassette, client_session)
+
+    client = _client()
+    client.transport = ReplayTransport.from_file(cassette)
+    assert client.transport.recorded_day == END_DATE
+
+    # Without an end date the client asks for a range ending today
+    assert (await client.async_get_data(days_back=3)) == recorded
+    assert shift_dates(
+        {"start_datetime": "2024-02-27T00:00:00", "end_date": "2024-03-01", "next_token": "a"}, 2
+    ) == {"start_datetime": "2024-02-29T00:00:00", "end_date": "2024-03-03", "next_token": "a"}
+
+
+@pytest.mark.asyncio
+async def test_cassette_redacts_tokens(tmp_path: Path, client_session: ClientSession):
+    """Test that credentials never reach the cassette."""
+    cassette = tmp_path / "oura.jsonl.gz"
+    await _async_record(cassette, client_session)
+    async with MockOuraServer() as server:
+        client = _client(server.base_url)
+        client.transport = RecordingTransport(HttpTransport(client_session), cassette)
+        await client._async_get(f"{server.base_url}/daily_sleep", {"access_token": ACCESS_TOKEN})
+
+    with gzip.open(cassette, "rt") as file:
+        assert ACCESS_TOKEN not in file.read()
+    _, interactions = read_cassette(cassette)
+    assert interactions[-1]["params"] == {"access_token": "REDACTED"}
+    # The recording continued the existing cassette
+    assert len(recorded_calls(interactions)) == 1 and len(interactions) > 2
+
+
+@pytest.mark.asyncio
+async def test_anonymized_recording(tmp_path: Path, client_session: ClientSession):
+    """Test that identifiers are replaced consistently within a cassette."""
+    cassette = tmp_path / "oura.jsonl.gz"
+    recorded = await _async_record(cassette, client_session, anonymize=True)
+
+    header, interactions = read_cassette(cassette)
+    replayed = {
+        document["day"]: document["id"]
+        for interaction in interactions
+        if interaction["url"].endswith("/daily_sleep")
+        for document in interaction["body"]["data"]
+    }
+    assert header["anonymized"]
+    assert set(replayed) == {document["day"] for document in recorded["sleep"]["data"]}
+    assert not set(replayed.values()) & {document["id"] for document in recorded["sleep"]["data"]}
+
+    anonymizer = Anonymizer(b"salt")
+    document = {"id": "a", "sleep_id": "a", "email": "me@example.org", "items": [{"id": "a"}], "score": 80}
+    anonymized = anonymizer.anonymize(document)
+    assert anonymized["id"] == anonymized["sleep_id"] == anonymized["items"][0]["id"] != "a"
+    assert anonymized["email"].endswith("@example.com") and "me" not in anonymized["email"]
+    assert anonymized["score"] == 80
+    assert Anonymizer(b"other").pseudonym("a") != anonymized["id"]
+
+
+@pytest.mark.asyncio
+async def test_replay_errors(tmp_path: Path, client_session: ClientSession):
+    """Test that recorded errors are raised again, and unknown requests fail."""
+    cassette = tmp_path / "oura.jsonl.gz"
+    data = await _async_record(cassette, client_session, scopes=ALL_SCOPES - {"heart_health"})
+
+    client = _client()
+    client.transport = ReplayTransport.from_file(cassette)
+    assert (await client.async_get_data(days_back=3, end_date=END_DATE)) == data
+    assert data["vo2_max"] == {"data": []}
+
+    with pytest.raises(ClientResponseError) as err:
+        await client._async_get(
+            f"{client.base_url}/vO2_max", {"start_date": "2024-02-27", "end_date": "2024-03-01"}
+        )
+    assert err.value.status == 401
+    with pytest.raises(LookupError):
+        await client._async_get(f"{client.base_url}/daily_sleep", {"start_date": "2020-01-01"})
+
+
+@pytest.mark.asyncio
+async def test_replay_timing():
+    """Test that realtime replay keeps the recorded duration of responses."""
+    interactions = [
+        {"url": "/v2/usercollection/daily_sleep", "params": {}, "status": 200, "headers": {},
+         "body": {"data": [1]}, "offset": 0.0, "duration": 0.05},
+        {"url": "/v2/usercollection/daily_sleep", "params": {}, "status": 200, "headers": {},
+         "body": {"data": [2]}, "offset": 0.1, "duration": 0.05},
+    ]
+    url = "http://replay.invalid/v2/usercollection/daily_sleep"
+
+    fast = ReplayTransport(interactions)
+    started = time.perf_counter()
+    # Responses come in recording order, then the last one repeats
+    assert [(await fast.async_get(url, {})).body["data"] for _ in range(3)] == [[1], [2], [2]]
+    assert time.perf_counter() - started < 0.05
+
+    realtime = ReplayTransport(interactions, realtime=True)
+    started = time.perf_counter()
+    await realtime.async_get(url, {})
+    assert time.perf_counter() - started >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_create_transport_from_config(tmp_path: Path, client_session: ClientSession):
+    """Test that a cassette configuration selects the transport."""
+    http = HttpTransport(client_session)
+    recording = await async_create_transport(
+        {"mode": "record", "path": "oura.jsonl.gz", "anonymize": True}, http, tmp_path
+    )
+    assert isinstance(recording, RecordingTransport)
+    assert recording.path == tmp_path / "oura.jsonl.gz" and recording.anonymizer
+
+    await _async_record(tmp_path / "oura.jsonl.gz", client_session)
+    replay = await async_create_transport({"mode": "replay", "path": str(tmp_path / "oura.jsonl.gz")}, http)
+    assert isinstance(replay, ReplayTransport) and replay.recorded_at
+    with pytest.raises(ValueError):
+        await async_create_transport({"mode": "rewind", "path": "oura.jsonl.gz"}, http)
+
+
+def test_request_key():
+    """Test that requests match regardless of host and parameter order."""
+    assert request_key("https://api.ouraring.com/v2/usercollection/sleep", {"b": 1, "a": 2}) == (
+        request_key("http://127.0.0.1:8765/v2/usercollection/sleep", {"a": 2, "b": 1})
+    )